@@ -122,6 +122,8 @@ _hide_console_window()
 
 ROOT = _find_project_root(os.path.dirname(os.path.abspath(__file__)))
 SERVER_APP = os.path.join(ROOT, "server", "app.py")
+# Production entry point: fixed pool of request threads with timeouts.
+SERVER_SERVE = os.path.join(ROOT, "server", "serve.py")
 LOG_DIR = os.path.join(ROOT, "logs")
 LOG_FILE = os.path.join(LOG_DIR, "server.log")
 PID_FILE = os.path.join(LOG_DIR, "server.pid")
@@ -278,7 +280,7 @@ def _find_server_pids():
                 "wmic",
                 "process",
                 "where",
-                "CommandLine like '%\\\\server\\\\app.py%'",
+                "CommandLine like '%\\\\server\\\\app.py%' or CommandLine like '%\\\\server\\\\serve.py%'",
                 "get",
                 "ProcessId",
             ],
@@ -339,8 +341,11 @@ def start_server():
         if stopped_pid:
             _clear_pid()
 
-    if not os.path.exists(SERVER_APP):
-        messagebox.showerror("Error", "server/app.py를 찾을 수 없습니다.")
+    server_script = SERVER_SERVE if production_var.get() else SERVER_APP
+    if not os.path.exists(server_script):
+        messagebox.showerror(
+            "Error", f"server/{os.path.basename(server_script)}를 찾을 수 없습니다."
+        )
         return
 
     python_cmd = _find_python_cmd(ROOT)
@@ -363,7 +368,7 @@ def start_server():
     startupinfo.dwFlags |= STARTF_USESHOWWINDOW
     startupinfo.wShowWindow = SW_HIDE
     proc = subprocess.Popen(
-        [python_cmd, SERVER_APP],
+        [python_cmd, server_script],
         cwd=ROOT,
         stdout=log_handle,
         stderr=log_handle,
@@ -371,7 +376,7 @@ def start_server():
         startupinfo=startupinfo
     )
     _write_pid(proc.pid)
-    _write_cmdline(" ".join([python_cmd, SERVER_APP]))
+    _write_cmdline(" ".join([python_cmd, server_script]))
     _update_status()
     if not log_following:
         _load_log_initial()
@@ -507,6 +512,9 @@ root.title("Server Manager")
 root.geometry("640x520")
 
 status_var = tk.StringVar(value="Status: Stopped")
+production_var = tk.BooleanVar(
+    value=os.environ.get("SERVER_MODE", "").lower() == "production"
+)
 
 lbl = tk.Label(root, textvariable=status_var)
 lbl.pack(pady=8)
@@ -516,6 +524,11 @@ tk.Button(root, text="Stop Server", width=22, command=stop_server).pack(pady=4)
 tk.Button(root, text="Restart Server", width=22, command=restart_server).pack(pady=4)
 tk.Button(root, text="View Log", width=22, command=view_log).pack(pady=4)
 tk.Button(root, text="Open Site", width=22, command=open_site).pack(pady=4)
+tk.Checkbutton(
+    root,
+    text="Production server (serve.py, applies on start)",
+    variable=production_var,
+).pack(pady=2)
 def _on_close():
     if proc and proc.poll() is None:
         stop_server()
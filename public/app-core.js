@@ -73,6 +73,8 @@ let selectedFileId = null;
 let selectedFeeKey = null;
 let fileCounter = 0;
 let previewUrl = null;
+// Server-issued /uploads URLs carrying a file version (?v=), by name.
+let uploadUrls = {};
 let previewZoom = 1;
 let draggedFileId = null;
 let draggedFeeKey = null;
@@ -564,7 +566,9 @@ const addFiles = (incoming, options = {}) => {
 
   files = files.concat(newRecords);
   assignGroupKeys();
-  regroupFiles();
+  if (!options.skipRegroup) {
+    regroupFiles();
+  }
   if (!options.skipUpload && typeof uploadIncomingFiles === "function") {
     uploadIncomingFiles(processed.map((entry) => entry.file));
   }
@@ -639,10 +643,15 @@ const setSelectedFile = (fileId) => {
     URL.revokeObjectURL(previewUrl);
     previewUrl = null;
   }
+  // Stored files open as the server's short preview (/preview/...); the
+  // full original is only fetched when asked for.
+  let fullUrl = null;
   if (file.file) {
     previewUrl = URL.createObjectURL(file.file);
   } else if (file.uploadName) {
-    previewUrl = `/uploads/${encodeURIComponent(file.uploadName)}`;
+    fullUrl =
+      uploadUrls[file.uploadName] || `/uploads/${encodeURIComponent(file.uploadName)}`;
+    previewUrl = fullUrl.replace(/^\/uploads\//, "/preview/");
   } else {
     previewUrl = null;
   }
@@ -654,11 +663,20 @@ const setSelectedFile = (fileId) => {
     <div class="preview-header">
       <div>${file.name}</div>
       <div class="preview-meta">용량 ${formatBytes(file.size)} · 접두어 ${file.prefix} · 수입신고번호 ${file.customs || "미확인"} · BL ${file.bl || "미확인"}</div>
+      ${fullUrl ? '<button type="button" class="ghost preview-full">전체 페이지 보기</button>' : ""}
     </div>
     <div class="preview-body">
       <iframe class="preview-frame" src="${previewUrl}#toolbar=0&navpanes=0&view=FitH" title="PDF 미리보기"></iframe>
     </div>
   `;
+  const fullButton = fileDetail.querySelector(".preview-full");
+  if (fullButton) {
+    fullButton.addEventListener("click", () => {
+      const frame = fileDetail.querySelector(".preview-frame");
+      if (frame) frame.src = `${fullUrl}#toolbar=0&navpanes=0&view=FitH`;
+      fullButton.remove();
+    });
+  }
   applyPreviewZoom();
 };
 
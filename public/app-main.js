@@ -72,8 +72,12 @@ const clearAll = () => {
 };
 
 let mergedFiles = [];
+let mergedUrls = {};
 let mergedTokens = [];
 let mergedFiltered = [];
+// Batch id of the last merge-all that left failed groups; sent with the next
+// run so the server records the retry as the same batch.
+let retryBatchId = null;
 const pcInfoCache = new Map();
 const pendingPcInfo = new Set();
 const refreshedPcInfo = new Set();
@@ -124,6 +128,55 @@ const requestPcInfoForFilename = async (filename, options = {}) => {
   updateUI();
 };
 
+const requestPcInfoBatch = async (names) => {
+  const targets = Array.from(new Set(names)).filter(
+    (name) =>
+      isPcFilename(name) &&
+      !pendingPcInfo.has(name) &&
+      !pcInfoCache.has(`${name}::${PC_INFO_VERSION}`)
+  );
+  if (!targets.length) return;
+  targets.forEach((name) => pendingPcInfo.add(name));
+  const applyLine = (line) => {
+    if (!line.trim()) return false;
+    try {
+      const entry = JSON.parse(line);
+      if (!entry || !entry.name || !entry.info) return false;
+      pcInfoCache.set(`${entry.name}::${PC_INFO_VERSION}`, entry.info);
+      applyPcInfoToRecords(entry.name, entry.info);
+      return true;
+    } catch (err) {
+      return false;
+    }
+  };
+  try {
+    const response = await fetch("/pc-info/batch", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ names: targets, stream: true }),
+    });
+    if (!response.ok || !response.body) return;
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split("\n");
+      buffer = lines.pop();
+      const applied = lines.map(applyLine).some(Boolean);
+      if (applied) updateUI();
+    }
+    buffer += decoder.decode();
+    if (applyLine(buffer)) updateUI();
+  } catch (err) {
+    // Ignore batch failures; single requests will retry on demand.
+  } finally {
+    targets.forEach((name) => pendingPcInfo.delete(name));
+  }
+};
+
 window.requestPcInfoForFilename = requestPcInfoForFilename;
 window.isPcFilename = isPcFilename;
 
@@ -281,6 +334,11 @@ const regroupFiles = () => {
   insertIntoGroupOrder(sorted);
 };
 
+const getUploadNames = (records) => {
+  const names = records.map((item) => item?.uploadName || null);
+  return names.length && names.every(Boolean) ? names : null;
+};
+
 const mergeSelected = async () => {
   if (!selectedGroupKey) return;
   const groupFiles = getGroupFiles(selectedGroupKey);
@@ -296,15 +354,33 @@ const mergeSelected = async () => {
   mergeBtn.disabled = true;
   setStatus("병합 중...");
 
-  const formData = new FormData();
-  groupFiles.forEach((item) => formData.append("files", item.file));
+  const uploadNames = getUploadNames(groupFiles);
+  let requestInit;
+  if (uploadNames) {
+    requestInit = {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ names: uploadNames }),
+    };
+  } else {
+    const formData = new FormData();
+    groupFiles.forEach((item) => formData.append("files", item.file));
+    requestInit = { method: "POST", body: formData };
+  }
 
   try {
-    const response = await fetch("/merge", {
-      method: "POST",
-      body: formData,
-    });
+    // Runs as a background job so no server request thread waits on the merge.
+    const jobResponse = await fetch("/jobs/merge", requestInit);
+    const job = await jobResponse.json().catch(() => ({}));
+    if (!jobResponse.ok) {
+      throw new Error(describeJobError(job));
+    }
+    const finished = await waitForMergeJob(job);
+    if (finished.status !== "done") {
+      throw new Error("병합 중 오류가 발생했습니다.");
+    }
 
+    const response = await fetch(`/jobs/${encodeURIComponent(job.id)}/download`);
     if (!response.ok) {
       const data = await response.json().catch(() => ({}));
       throw new Error(data.error || "병합 실패");
@@ -357,7 +433,11 @@ const mergeSelected = async () => {
 };
 
 const deleteUploadsOnServer = async (names) => {
-  if (!Array.isArray(names) || !names.length) return;
+  if (!Array.isArray(names)) return;
+  // Identical uploads share one server file, so keep names another record uses.
+  const inUse = new Set(files.map((item) => item.uploadName || item.name));
+  names = names.filter((name) => !inUse.has(name));
+  if (!names.length) return;
   try {
     await fetch("/uploads/delete", {
       method: "POST",
@@ -369,6 +449,33 @@ const deleteUploadsOnServer = async (names) => {
   }
 };
 
+const MERGE_JOB_POLL_MS = 1000;
+const MERGE_JOB_FIRST_POLL_MS = 100;
+
+const describeJobError = (data) => {
+  // 422 responses name the uploads the server already knows it cannot open.
+  const invalid = Array.isArray(data.invalid) ? data.invalid.map((item) => item.name) : [];
+  const message = data.error || "병합 실패";
+  return invalid.length ? `${message} (${invalid.join(", ")})` : message;
+};
+
+const waitForMergeJob = async (job, onProgress) => {
+  let current = job;
+  // Short merges finish within a few fast polls; long ones settle at 1s.
+  let delay = MERGE_JOB_FIRST_POLL_MS;
+  while (current.status !== "done" && current.status !== "failed") {
+    await new Promise((resolve) => setTimeout(resolve, delay));
+    delay = Math.min(delay * 2, MERGE_JOB_POLL_MS);
+    const response = await fetch(`/jobs/${encodeURIComponent(job.id)}`);
+    if (!response.ok) {
+      throw new Error("병합 상태를 확인하지 못했습니다.");
+    }
+    current = await response.json();
+    if (onProgress) onProgress(current);
+  }
+  return current;
+};
+
 const mergeAll = async () => {
   if (!files.length) return;
   const completedKeys = Object.keys(completedGroups).filter(
@@ -407,29 +514,64 @@ const mergeAll = async () => {
     return a.localeCompare(b);
   });
 
-  const fileIds = files
-    .filter((file) => keys.includes(file.groupKey))
-    .map((file) => file.id);
-  const manifest = {
-    fileIds,
-    groups: keys.map((key) => ({
-      name: key,
-      fileIds: getGroupIds(key),
-    })),
-  };
-
-  const formData = new FormData();
-  files
-    .filter((item) => fileIds.includes(item.id))
-    .forEach((item) => formData.append("files", item.file));
-  formData.append("manifest", JSON.stringify(manifest));
+  const manifestGroups = keys.map((key) => ({
+    name: key,
+    fileIds: getGroupIds(key),
+  }));
+  // Files go out group by group so the server can start merging each group
+  // as soon as its last file has arrived.
+  const fileIds = [...new Set(manifestGroups.flatMap((group) => group.fileIds))];
+  const manifest = { fileIds, groups: manifestGroups };
+  if (retryBatchId) manifest.batchId = retryBatchId;
+
+  const fileById = new Map(files.map((item) => [item.id, item]));
+  const batchFiles = fileIds.map((id) => fileById.get(id));
+  let requestInit;
+  if (getUploadNames(batchFiles)) {
+    const byId = new Map(batchFiles.map((item) => [item.id, item]));
+    requestInit = {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        batchId: manifest.batchId,
+        groups: manifest.groups.map((group) => ({
+          name: group.name,
+          names: group.fileIds
+            .filter((id) => byId.has(id))
+            .map((id) => byId.get(id).uploadName),
+        })),
+      }),
+    };
+  } else {
+    const formData = new FormData();
+    formData.append("manifest", JSON.stringify(manifest));
+    batchFiles.forEach((item) => formData.append("files", item.file));
+    requestInit = { method: "POST", body: formData };
+  }
 
   try {
-    const response = await fetch("/merge-batch", {
-      method: "POST",
-      body: formData,
+    const jobResponse = await fetch("/jobs/merge-batch", requestInit);
+    const job = await jobResponse.json().catch(() => ({}));
+    if (!jobResponse.ok) {
+      throw new Error(describeJobError(job));
+    }
+    const finished = await waitForMergeJob(job, (current) => {
+      setStatus(`전체 병합 중... (${current.completed}/${current.total})`);
     });
+    if (finished.status !== "done") {
+      throw new Error("일괄 병합 중 오류가 발생했습니다.");
+    }
+    // Failed groups stay in the list (and on the server) for another run;
+    // the ZIP holds the other groups plus an error report.
+    const failedKeys = (finished.groups || [])
+      .filter((group) => group.status === "failed")
+      .map((group) => group.name);
+    retryBatchId = failedKeys.length ? finished.batchId : null;
+    if (failedKeys.length && !finished.completed) {
+      throw new Error(`일괄 병합에 실패했습니다. (${failedKeys.join(", ")})`);
+    }
 
+    const response = await fetch(`/jobs/${encodeURIComponent(job.id)}/download`);
     if (!response.ok) {
       const data = await response.json().catch(() => ({}));
       throw new Error(data.error || "병합 실패");
@@ -448,12 +590,12 @@ const mergeAll = async () => {
       URL.revokeObjectURL(url);
     }
 
-    const completedKeySet = new Set(keys);
+    const completedKeySet = new Set(keys.filter((key) => !failedKeys.includes(key)));
     const toDelete = files
       .filter((item) => completedKeySet.has(item.groupKey))
       .map((item) => item.uploadName || item.name);
     files = files.filter((item) => !completedKeySet.has(item.groupKey));
-    keys.forEach((key) => {
+    completedKeySet.forEach((key) => {
       delete completedGroups[key];
     });
     persistCompletedGroups();
@@ -476,7 +618,11 @@ const mergeAll = async () => {
     updateUI();
     deleteUploadsOnServer(toDelete);
 
-    setStatus("전체 병합이 완료되었습니다.");
+    setStatus(
+      failedKeys.length
+        ? `${failedKeys.length}개 그룹은 병합하지 못했습니다: ${failedKeys.join(", ")} (다시 실행하면 실패한 그룹만 병합합니다)`
+        : "전체 병합이 완료되었습니다."
+    );
   } catch (err) {
     setStatus(err.message);
   } finally {
@@ -515,7 +661,7 @@ const renderMergedList = () => {
     const row = document.createElement("div");
     row.className = "merged-item";
     const link = document.createElement("a");
-    link.href = `/merged/${encodeURIComponent(name)}`;
+    link.href = mergedUrls[name] || `/merged/${encodeURIComponent(name)}`;
     link.textContent = name;
     link.setAttribute("download", name);
     link.rel = "noopener";
@@ -588,6 +734,10 @@ const loadMergedFiles = async () => {
     if (!response.ok) return;
     const data = await response.json();
     mergedFiles = Array.isArray(data.merged) ? data.merged : [];
+    mergedUrls = {};
+    (Array.isArray(data.items) ? data.items : []).forEach((item) => {
+      if (item && item.url) mergedUrls[item.name] = item.url;
+    });
     renderMergedList();
   } catch (err) {
     // Ignore load failures to keep settings responsive.
@@ -619,8 +769,16 @@ const uploadIncomingFiles = async (pdfs) => {
     });
     if (!response.ok) return;
     const data = await response.json();
+    (Array.isArray(data.files) ? data.files : []).forEach((item) => {
+      if (item && item.url) uploadUrls[item.name] = item.url;
+    });
     if (Array.isArray(data.saved) && data.saved.length) {
-      setStatus(`서버에 ${data.saved.length}개 저장했습니다.`);
+      const duplicateCount = Array.isArray(data.duplicates) ? data.duplicates.length : 0;
+      setStatus(
+        duplicateCount
+          ? `서버에 ${data.saved.length - duplicateCount}개 저장했습니다. (동일 파일 ${duplicateCount}개는 기존 파일 사용)`
+          : `서버에 ${data.saved.length}개 저장했습니다.`
+      );
       data.saved.forEach((savedName, index) => {
         const file = pdfs[index];
         const record = files.find((item) => item.file === file);
@@ -655,32 +813,43 @@ const uploadIncomingFiles = async (pdfs) => {
 const loadStoredUploads = async () => {
   if (files.length) return;
   try {
-    const response = await fetch("/uploads");
+    const response = await fetch("/groups");
     if (!response.ok) return;
     const data = await response.json();
-    const names = Array.isArray(data.uploads) ? data.uploads : [];
+    const groups = Array.isArray(data.groups) ? data.groups : [];
+    if (data.urls && typeof data.urls === "object") {
+      Object.assign(uploadUrls, data.urls);
+    }
+    const names = groups.flatMap((group) =>
+      Array.isArray(group.names) ? group.names : []
+    );
     if (!names.length) return;
 
     const placeholders = names.map(
       (name) => new File([new Blob()], name, { type: "application/pdf" })
     );
-    addFiles(placeholders, {
+    // The server already returns names grouped and in merge order, so the
+    // group order map is filled directly instead of re-sorting every group.
+    const records = addFiles(placeholders, {
       skipUpload: true,
       savedNames: names,
       releaseFiles: true,
+      skipRegroup: true,
     });
-    names.forEach((name) => {
-      if (isPcFilename(name)) {
-        requestPcInfoForFilename(name);
-      }
-    });
+    if (Array.isArray(records)) {
+      records.forEach((record) => {
+        if (!groupOrderMap[record.groupKey]) groupOrderMap[record.groupKey] = [];
+        groupOrderMap[record.groupKey].push(record.id);
+      });
+    }
+    requestPcInfoBatch(names);
     const keys = getSortedGroupKeys();
     if (keys.length) {
       selectedGroupKey = keys[0];
       selectedFileId = null;
       updateUI();
     }
-    setStatus(`저장된 파일 ${restored.length}개를 불러왔습니다.`);
+    setStatus(`저장된 파일 ${names.length}개를 불러왔습니다.`);
   } catch (err) {
     // Ignore restore failures to keep initial load smooth.
   }
@@ -1083,47 +1252,167 @@ if (customsOnlyFirstToggle) {
 resetOrder.addEventListener("click", resetPrefixOrder);
 saveOrder.addEventListener("click", savePrefixOrder);
 
+// Dict-valued settings are saved per entry; everything else is replaced whole.
+const SETTINGS_MAP_KEYS = [
+  "completedGroups",
+  "feeOrderMap",
+  "feeHiddenMap",
+  "feeManualMap",
+  "feeOverrideMap",
+  "listOrderMap",
+  "feeAttachmentMap",
+];
+let savedSettingsSnapshot = null;
+let settingsEtag = null;
+let settingsSaveChain = Promise.resolve();
+const SETTINGS_SAVE_ATTEMPTS = 3;
+
+const collectSharedSettings = () => {
+  const feeHiddenSerialized = {};
+  Object.entries(feeHiddenMap || {}).forEach(([key, value]) => {
+    if (value instanceof Set) {
+      feeHiddenSerialized[key] = Array.from(value);
+    } else if (Array.isArray(value)) {
+      feeHiddenSerialized[key] = value;
+    }
+  });
+  return {
+    prefixOrder,
+    customsOnlyFirst,
+    completedGroups,
+    feeOrderMap,
+    feeHiddenMap: feeHiddenSerialized,
+    feeManualMap,
+    feeOverrideMap,
+    listOrderMap,
+    feeAttachmentMap,
+  };
+};
+
+const snapshotSharedSettings = (settings) => {
+  const snapshot = {};
+  Object.entries(settings).forEach(([key, value]) => {
+    if (!SETTINGS_MAP_KEYS.includes(key)) {
+      snapshot[key] = JSON.stringify(value);
+      return;
+    }
+    const entries = {};
+    Object.entries(value || {}).forEach(([entryKey, entryValue]) => {
+      if (entryValue !== undefined) entries[entryKey] = JSON.stringify(entryValue);
+    });
+    snapshot[key] = entries;
+  });
+  return snapshot;
+};
+
+const diffSharedSettings = (previous, next, settings) => {
+  const delta = {};
+  Object.keys(next).forEach((key) => {
+    if (!SETTINGS_MAP_KEYS.includes(key)) {
+      if (previous[key] !== next[key]) delta[key] = settings[key];
+      return;
+    }
+    const before = previous[key] || {};
+    const after = next[key];
+    const changes = {};
+    Object.keys(after).forEach((entryKey) => {
+      if (before[entryKey] !== after[entryKey]) changes[entryKey] = settings[key][entryKey];
+    });
+    Object.keys(before).forEach((entryKey) => {
+      if (!(entryKey in after)) changes[entryKey] = null;
+    });
+    if (Object.keys(changes).length) delta[key] = changes;
+  });
+  return delta;
+};
+
+const applySettingsDelta = (data, delta) => {
+  const merged = { ...data };
+  Object.entries(delta).forEach(([key, value]) => {
+    if (!SETTINGS_MAP_KEYS.includes(key)) {
+      merged[key] = value;
+      return;
+    }
+    const entries = { ...(merged[key] || {}) };
+    Object.entries(value).forEach(([entryKey, entryValue]) => {
+      if (entryValue === null) {
+        delete entries[entryKey];
+      } else {
+        entries[entryKey] = entryValue;
+      }
+    });
+    merged[key] = entries;
+  });
+  return merged;
+};
+
+const fetchSharedSettings = async () => {
+  const response = await fetch("/settings");
+  if (!response.ok) return null;
+  settingsEtag = response.headers.get("ETag");
+  return response.json();
+};
+
 const loadSharedSettings = async () => {
   try {
-    const response = await fetch("/settings");
-    if (!response.ok) return;
-    const data = await response.json();
+    const data = await fetchSharedSettings();
+    if (!data) return;
     applySharedSettings(data);
+    savedSettingsSnapshot = snapshotSharedSettings(data);
   } catch (err) {
     // Ignore load failures to keep UI responsive.
   }
 };
 
-const saveSharedSettings = async () => {
+const sendSharedSettings = (method, body) => {
+  const headers = { "Content-Type": "application/json" };
+  if (settingsEtag) headers["If-Match"] = settingsEtag;
+  return fetch("/settings", { method, headers, body: JSON.stringify(body) });
+};
+
+// Another browser saved first: take its settings, put our unsaved changes on
+// top and let the caller retry against the new ETag.
+const rebaseSharedSettings = async (delta) => {
+  const latest = await fetchSharedSettings();
+  if (!latest) return false;
+  applySharedSettings(applySettingsDelta(latest, delta));
+  savedSettingsSnapshot = snapshotSharedSettings(latest);
+  updateUI();
+  return true;
+};
+
+const flushSharedSettings = async () => {
   try {
-    const feeHiddenSerialized = {};
-    Object.entries(feeHiddenMap || {}).forEach(([key, value]) => {
-      if (value instanceof Set) {
-        feeHiddenSerialized[key] = Array.from(value);
-      } else if (Array.isArray(value)) {
-        feeHiddenSerialized[key] = value;
+    for (let attempt = 0; attempt < SETTINGS_SAVE_ATTEMPTS; attempt += 1) {
+      const settings = collectSharedSettings();
+      const snapshot = snapshotSharedSettings(settings);
+      let response;
+      let delta = null;
+      if (!savedSettingsSnapshot) {
+        response = await sendSharedSettings("POST", settings);
+      } else {
+        delta = diffSharedSettings(savedSettingsSnapshot, snapshot, settings);
+        if (!Object.keys(delta).length) return;
+        response = await sendSharedSettings("PATCH", delta);
       }
-    });
-    await fetch("/settings", {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({
-        prefixOrder,
-        customsOnlyFirst,
-        completedGroups,
-        feeOrderMap,
-        feeHiddenMap: feeHiddenSerialized,
-        feeManualMap,
-        feeOverrideMap,
-        listOrderMap,
-        feeAttachmentMap,
-      }),
-    });
+      if (response.ok) {
+        settingsEtag = response.headers.get("ETag") || settingsEtag;
+        savedSettingsSnapshot = snapshot;
+        return;
+      }
+      if (response.status !== 412 || !(await rebaseSharedSettings(delta || settings))) return;
+    }
   } catch (err) {
     // Ignore save failures to avoid blocking UI.
   }
 };
 
+// Saves run one at a time so an older delta can never land after a newer one.
+const saveSharedSettings = () => {
+  settingsSaveChain = settingsSaveChain.then(flushSharedSettings);
+  return settingsSaveChain;
+};
+
 const requestSaveSharedSettings = (() => {
   let timer = null;
   return () => {
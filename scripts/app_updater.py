@@ -45,6 +45,7 @@ def main() -> int:
     parser.add_argument("root", help="App root directory")
     parser.add_argument("zip_path", help="Update zip path")
     parser.add_argument("pid", nargs="?", default=None, help="Optional parent pid")
+    parser.add_argument("--entry", default="app.py", help="Server script in server/ to relaunch")
     args = parser.parse_args()
 
     root = Path(args.root).resolve()
@@ -61,9 +62,11 @@ def main() -> int:
         "venv",
         "uploads",
         "merged",
+        "cache",
         "logs",
         "wheels",
         "settings.json",
+        "settings.journal",
         "update.zip",
     }
 
@@ -74,20 +77,21 @@ def main() -> int:
         src_root = _find_extract_root(tmp_path)
         _copy_tree(src_root, root, preserve)
 
-    # Relaunch app
+    # Relaunch app with the entry point it was running under
+    entry = args.entry if args.entry in ("app.py", "serve.py") else "app.py"
     try:
         if os.name == "nt":
             creationflags = 0x08000000 | 0x00000008
             subprocess = __import__("subprocess")
             subprocess.Popen(
-                [sys.executable, str(root / "server" / "app.py")],
+                [sys.executable, str(root / "server" / entry)],
                 cwd=str(root),
                 creationflags=creationflags,
             )
         else:
             subprocess = __import__("subprocess")
             subprocess.Popen(
-                [sys.executable, str(root / "server" / "app.py")],
+                [sys.executable, str(root / "server" / entry)],
                 cwd=str(root),
                 start_new_session=True,
             )
@@ -0,0 +1,113 @@
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR / "server"))
+
+from pypdf import PdfReader  # noqa: E402
+
+from file_catalog import CatalogEntry  # noqa: E402
+from grouping import build_groups  # noqa: E402
+from naming import parse_filename  # noqa: E402
+from pdf_copy import copy_merge_to_file  # noqa: E402
+from pdf_merge import MERGE_ENGINES, merge_to_file  # noqa: E402
+
+
+def _groups(source: Path, whole: bool) -> list[list[Path]]:
+    paths = sorted(p for p in source.iterdir() if p.is_file() and p.suffix.lower() == ".pdf")
+    if whole:
+        return [paths] if paths else []
+    entries = []
+    for path in paths:
+        stat = path.stat()
+        entries.append(CatalogEntry(path.name, stat.st_size, stat.st_mtime, **parse_filename(path.name)._asdict()))
+    groups = build_groups(entries, ["JS", "NB", "VT", "IMP"], True)
+    return [[source / name for name in group["names"]] for group in groups if len(group["names"]) > 1]
+
+
+def _merge(engine: str, paths: list[Path], target: Path) -> bool:
+    # Calls the copy engine directly so a silent fallback to pypdf shows up.
+    if engine == "copy":
+        try:
+            copy_merge_to_file([str(p) for p in paths], str(target))
+            return True
+        except Exception:
+            pass
+    merge_to_file([str(p) for p in paths], str(target))
+    return engine != "copy"
+
+
+def _page_signature(path: Path) -> list:
+    return [
+        (page.get_contents().get_data() if page.get_contents() else b"", tuple(page.mediabox))
+        for page in PdfReader(str(path)).pages
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare PDF merge engines on output size and wall time.")
+    parser.add_argument("source", nargs="?", default=str(ROOT_DIR / "uploads"), help="Directory of PDFs")
+    parser.add_argument("--whole", action="store_true", help="Merge every file into one PDF instead of per group")
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable output")
+    args = parser.parse_args()
+
+    groups = _groups(Path(args.source), args.whole)
+    if not groups:
+        print("병합할 PDF 그룹이 없습니다.", file=sys.stderr)
+        return 1
+    input_bytes = sum(p.stat().st_size for group in groups for p in group)
+
+    results = []
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        outputs = {}
+        for engine in MERGE_ENGINES:
+            timings = []
+            fallbacks = 0
+            for _ in range(args.repeat):
+                fallbacks = 0
+                start = time.perf_counter()
+                for index, group in enumerate(groups):
+                    target = Path(tmp) / f"{engine}_{index}.pdf"
+                    if not _merge(engine, group, target):
+                        fallbacks += 1
+                timings.append(time.perf_counter() - start)
+            outputs[engine] = [Path(tmp) / f"{engine}_{index}.pdf" for index in range(len(groups))]
+            results.append({
+                "engine": engine,
+                "seconds": min(timings),
+                "bytes": sum(p.stat().st_size for p in outputs[engine]),
+                "fallbacks": fallbacks,
+            })
+        baseline = outputs[MERGE_ENGINES[0]]
+        for engine in MERGE_ENGINES[1:]:
+            for expected, actual in zip(baseline, outputs[engine]):
+                if _page_signature(expected) != _page_signature(actual):
+                    mismatches += 1
+
+    if args.json:
+        print(json.dumps({
+            "groups": len(groups),
+            "input_bytes": input_bytes,
+            "results": results,
+            "mismatches": mismatches,
+        }))
+        return 0 if not mismatches else 1
+    print(f"{len(groups)} merges, {input_bytes / 1024 / 1024:.1f} MiB input")
+    for result in results:
+        print(
+            f"{result['engine']:>6}: {result['seconds'] * 1000:8.1f} ms"
+            f"  {result['bytes'] / 1024 / 1024:7.2f} MiB ({result['bytes'] / input_bytes:.1%})"
+            f"  fallbacks {result['fallbacks']}"
+        )
+    print(f"page mismatches: {mismatches}")
+    return 0 if not mismatches else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
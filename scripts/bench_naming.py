@@ -0,0 +1,147 @@
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR / "server"))
+
+import naming  # noqa: E402
+
+# Reference copies of the extractors as they were before parse_filename, kept
+# here to check that the single-pass parser returns identical results.
+CUSTOMS_WITH_HYPHEN = re.compile(r"(\d{5})-(\d{2})-(\d{6})M(?!\d)", re.I)
+CUSTOMS_PLAIN = re.compile(r"(\d{13})M(?!\d)", re.I)
+BL_PREFIX = re.compile(r"(?:^|[ _-])BL[ _-]?([A-Z0-9]{6,20})(?=$|[ _-])", re.I)
+
+
+def legacy_extract_customs(name: str) -> str | None:
+    match_hyphen = CUSTOMS_WITH_HYPHEN.search(name)
+    if match_hyphen:
+        return f"{match_hyphen[1]}-{match_hyphen[2]}-{match_hyphen[3]}M"
+    match_plain = CUSTOMS_PLAIN.search(name)
+    if match_plain:
+        digits = match_plain[1]
+        return f"{digits[:5]}-{digits[5:7]}-{digits[7:13]}M"
+    return None
+
+
+def legacy_extract_bl(name: str) -> str | None:
+    trimmed = re.sub(r"\.[^.]+$", "", name)
+    match = BL_PREFIX.search(trimmed)
+    if match:
+        return match.group(1).upper()
+    cleaned = CUSTOMS_WITH_HYPHEN.sub("", trimmed)
+    cleaned = CUSTOMS_PLAIN.sub("", cleaned)
+    tokens = [token for token in re.split(r"[ _-]+", cleaned) if token]
+    alnum = [
+        token
+        for token in tokens
+        if 6 <= len(token) <= 20
+        and re.search(r"[A-Z]", token, re.I)
+        and re.search(r"\d", token)
+    ]
+    if alnum:
+        alnum.sort(key=len, reverse=True)
+        return alnum[0].upper()
+    numeric = [token for token in tokens if re.fullmatch(r"\d{6,20}", token)]
+    if numeric:
+        numeric.sort(key=len, reverse=True)
+        return numeric[0]
+    return None
+
+
+def legacy_extract_prefix(name: str) -> str:
+    match = re.match(r"([A-Z]{2,3})[ _-]?", re.sub(r"\.[^.]+$", "", name))
+    return match.group(1) if match else "기타"
+
+
+def legacy_parse(name: str):
+    return (legacy_extract_prefix(name), legacy_extract_customs(name), legacy_extract_bl(name))
+
+
+PREFIXES = ["", "JS_", "NB_", "VT_", "IMP_", "PC_", "CK_", "add_", "js-"]
+BL_SHAPES = [
+    lambda rnd: rnd.choice(["SHSF", "COAU", "ONEYGOAF", "HSTXKI", "STVN", "POS", "TB"]) + str(rnd.randrange(10**5, 10**10)),
+    lambda rnd: str(rnd.randrange(10**11, 10**12)),
+    lambda rnd: "BL_" + "".join(rnd.choice("ABCDEFGHJKLMNPQRSTUVWXYZ0123456789") for _ in range(rnd.randint(8, 14))),
+    lambda rnd: "",
+    lambda rnd: "2",
+]
+
+
+def synthetic_names(count: int, seed: int) -> list[str]:
+    # Shapes seen in uploads/: PREFIX_<13 digits>M_<BL>.PDF, IMP_<customs>_2.pdf,
+    # hyphenated customs numbers, "BL_" markers, browser " (n)" duplicates.
+    rnd = random.Random(seed)
+    names = []
+    for _ in range(count):
+        digits = f"{rnd.randrange(10000, 99999)}{rnd.randrange(20, 27)}{rnd.randrange(10**5, 10**6)}"
+        customs = digits + "M" if rnd.random() < 0.7 else f"{digits[:5]}-{digits[5:7]}-{digits[7:]}M"
+        parts = [rnd.choice(PREFIXES) + customs]
+        bl = rnd.choice(BL_SHAPES)(rnd)
+        if bl:
+            parts.append(bl)
+        name = "_".join(parts)
+        if rnd.random() < 0.1:
+            name += f" ({rnd.randint(1, 3)})"
+        names.append(name + rnd.choice([".PDF", ".pdf"]))
+    return names
+
+
+def _time(fn, names: list[str]) -> float:
+    start = time.perf_counter()
+    for name in names:
+        fn(name)
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare the single-pass filename parser with the legacy extractors.")
+    parser.add_argument("--count", type=int, default=200_000, help="Synthetic names to generate")
+    parser.add_argument("--unique", type=int, default=5_000, help="Distinct names (the rest are repeats)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable output")
+    args = parser.parse_args()
+
+    uploads = ROOT_DIR / "uploads"
+    real = [p.name for p in uploads.iterdir()] if uploads.exists() else []
+    distinct = real + synthetic_names(args.unique, args.seed)
+    rnd = random.Random(args.seed)
+    corpus = [rnd.choice(distinct) for _ in range(args.count)]
+
+    mismatches = [name for name in distinct if tuple(naming.parse_filename(name)) != legacy_parse(name)]
+
+    legacy = _time(legacy_parse, corpus)
+    uncached = _time(naming.parse_filename.__wrapped__, corpus)
+    naming.parse_filename.cache_clear()
+    memoized = _time(naming.parse_filename, corpus)
+
+    result = {
+        "names": len(corpus),
+        "distinct": len(distinct),
+        "legacy_seconds": legacy,
+        "uncached_seconds": uncached,
+        "memoized_seconds": memoized,
+        "speedup": legacy / memoized if memoized else None,
+        "mismatches": mismatches[:20],
+        "mismatch_count": len(mismatches),
+    }
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False))
+        return 0 if not mismatches else 1
+    print(f"{len(corpus)} lookups over {len(distinct)} distinct names")
+    print(f"  legacy extractors : {legacy * 1000:8.1f} ms")
+    print(f"  single pass       : {uncached * 1000:8.1f} ms  (x{legacy / uncached:.1f}, no memo)")
+    print(f"  parse_filename    : {memoized * 1000:8.1f} ms  (x{result['speedup']:.1f})")
+    print(f"  mismatches        : {len(mismatches)}")
+    for name in mismatches[:20]:
+        print(f"    {name}: {tuple(naming.parse_filename(name))} != {legacy_parse(name)}")
+    return 0 if not mismatches else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,101 @@
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from pypdf import PdfReader, PdfWriter
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR / "server"))
+
+import pc_info  # noqa: E402
+
+
+def _extract_full_text(path: Path) -> dict:
+    # The pre-incremental path: extract every page, then parse.
+    reader = PdfReader(str(path))
+    text = "\n".join(page.extract_text() or "" for page in reader.pages)
+    lines = [line for line in (pc_info._normalize_line(raw) for raw in text.splitlines()) if line]
+    return {
+        "importer": pc_info._extract_importer(lines),
+        "fees": pc_info._extract_fee_items(lines),
+    }
+
+
+def _pad(statement: Path, filler: Path, pages: int, target: Path) -> Path:
+    writer = PdfWriter()
+    for page in PdfReader(str(statement)).pages:
+        writer.add_page(page)
+    filler_pages = PdfReader(str(filler)).pages
+    for index in range(pages):
+        writer.add_page(filler_pages[index % len(filler_pages)])
+    with target.open("wb") as f:
+        writer.write(f)
+    return target
+
+
+def _time(fn, paths: list[Path], repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in paths:
+            fn(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare incremental and full-text PC statement parsing.")
+    parser.add_argument("source", nargs="?", default=str(ROOT_DIR / "uploads"), help="Directory with PC_*.pdf")
+    parser.add_argument("--pad", type=int, default=10, help="Trailing pages appended for the long-statement case")
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable output")
+    args = parser.parse_args()
+
+    source = Path(args.source)
+    statements = sorted(p for p in source.iterdir() if p.is_file() and p.name.upper().startswith("PC_"))
+    fillers = sorted(p for p in source.iterdir() if p.is_file() and p.name.upper().startswith("IMP_"))
+    if not statements:
+        print("PC_ 파일이 없습니다.", file=sys.stderr)
+        return 1
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = {"as-is": statements}
+        if args.pad and fillers:
+            cases[f"+{args.pad} pages"] = [
+                _pad(path, fillers[0], args.pad, Path(tmp) / path.name) for path in statements
+            ]
+        for label, paths in cases.items():
+            mismatches = [p.name for p in paths if pc_info.extract_pc_info(p) != _extract_full_text(p)]
+            full = _time(_extract_full_text, paths, args.repeat)
+            incremental = _time(pc_info.extract_pc_info, paths, args.repeat)
+            results.append(
+                {
+                    "case": label,
+                    "files": len(paths),
+                    "full_seconds": full,
+                    "incremental_seconds": incremental,
+                    "speedup": full / incremental if incremental else None,
+                    "mismatches": mismatches,
+                }
+            )
+
+    if args.json:
+        print(json.dumps({"results": results}, ensure_ascii=False))
+        return 0
+    for result in results:
+        print(
+            f"{result['case']:>10} ({result['files']} files): "
+            f"full {result['full_seconds'] * 1000:8.1f} ms  "
+            f"incremental {result['incremental_seconds'] * 1000:8.1f} ms  "
+            f"x{result['speedup']:.2f}  mismatches {len(result['mismatches'])}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
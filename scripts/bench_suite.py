@@ -0,0 +1,431 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from pypdf import PdfWriter
+from pypdf.generic import (
+    ArrayObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    NameObject,
+    NumberObject,
+    StreamObject,
+    TextStringObject,
+)
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+# End-to-end benchmark of the HTTP paths through the Flask test client.
+#
+# The server package is copied into a scratch directory next to a generated
+# corpus, so app.py's uploads/merged/cache dirs resolve there and the real
+# ones are never touched. The corpus is generated from --seed, so two runs
+# with the same arguments measure the same files; compare their --out JSON.
+
+FEE_NAMES = ["통관수수료", "검 역 료", "운송료", "창고료", "보험료", "하역료", "관세", "부가가치세", "서류발급비"]
+VENDORS = ["", "", "관세사", "대한통운", "한진", "보세창고"]
+DOCUMENTS = ["JS", "NB", "VT", "IMP"]
+
+
+def _text_pdf(path: Path, pages: list[list[str]]) -> None:
+    # Type0 font without a font program: nothing renders, but pypdf extracts
+    # the Korean text through the ToUnicode map, which is all pc-info needs.
+    chars = sorted({ch for lines in pages for line in lines for ch in line})
+    codes = {ch: index + 1 for index, ch in enumerate(chars)}
+    cmap = [
+        "/CIDInit /ProcSet findresource begin",
+        "12 dict begin",
+        "begincmap",
+        "/CMapName /Bench-UCS def",
+        "/CMapType 2 def",
+        "1 begincodespacerange <0000> <FFFF> endcodespacerange",
+    ]
+    entries = [f"<{codes[ch]:04X}> <{ord(ch):04X}>" for ch in chars]
+    for start in range(0, len(entries), 100):
+        chunk = entries[start : start + 100]
+        cmap += [f"{len(chunk)} beginbfchar", *chunk, "endbfchar"]
+    cmap += ["endcmap", "CMapName currentdict /CMap defineresource pop", "end", "end"]
+
+    writer = PdfWriter()
+    to_unicode = DecodedStreamObject()
+    to_unicode.set_data("\n".join(cmap).encode("ascii"))
+    descriptor = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/FontDescriptor"),
+            NameObject("/FontName"): NameObject("/BenchSans"),
+            NameObject("/Flags"): NumberObject(32),
+            NameObject("/FontBBox"): ArrayObject([NumberObject(0)] * 4),
+            NameObject("/ItalicAngle"): NumberObject(0),
+            NameObject("/Ascent"): NumberObject(800),
+            NameObject("/Descent"): NumberObject(-200),
+            NameObject("/CapHeight"): NumberObject(700),
+            NameObject("/StemV"): NumberObject(80),
+        }
+    )
+    descendant = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/CIDFontType2"),
+            NameObject("/BaseFont"): NameObject("/BenchSans"),
+            NameObject("/CIDSystemInfo"): DictionaryObject(
+                {
+                    NameObject("/Registry"): TextStringObject("Adobe"),
+                    NameObject("/Ordering"): TextStringObject("Identity"),
+                    NameObject("/Supplement"): NumberObject(0),
+                }
+            ),
+            NameObject("/FontDescriptor"): writer._add_object(descriptor),
+            NameObject("/DW"): NumberObject(1000),
+        }
+    )
+    font = writer._add_object(
+        DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type0"),
+                NameObject("/BaseFont"): NameObject("/BenchSans"),
+                NameObject("/Encoding"): NameObject("/Identity-H"),
+                NameObject("/DescendantFonts"): ArrayObject([writer._add_object(descendant)]),
+                NameObject("/ToUnicode"): writer._add_object(to_unicode),
+            }
+        )
+    )
+    for lines in pages:
+        page = writer.add_blank_page(595, 842)
+        ops = ["BT", "/F1 10 Tf", "12 TL", "40 800 Td"]
+        ops += ["<" + "".join(f"{codes[ch]:04X}" for ch in line) + "> Tj T*" for line in lines]
+        ops.append("ET")
+        content = DecodedStreamObject()
+        content.set_data("\n".join(ops).encode("ascii"))
+        page[NameObject("/Contents")] = writer._add_object(content)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+        )
+    with path.open("wb") as f:
+        writer.write(f)
+
+
+def _scan_pdf(path: Path, pages: int, side: int, rng: random.Random) -> None:
+    # One uncompressible grayscale "scan" per page, like a photographed form.
+    writer = PdfWriter()
+    for _ in range(pages):
+        page = writer.add_blank_page(595, 842)
+        image = StreamObject()
+        image._data = rng.randbytes(side * side)
+        image.update(
+            {
+                NameObject("/Type"): NameObject("/XObject"),
+                NameObject("/Subtype"): NameObject("/Image"),
+                NameObject("/Width"): NumberObject(side),
+                NameObject("/Height"): NumberObject(side),
+                NameObject("/ColorSpace"): NameObject("/DeviceGray"),
+                NameObject("/BitsPerComponent"): NumberObject(8),
+            }
+        )
+        content = DecodedStreamObject()
+        content.set_data(b"q 595 0 0 842 0 0 cm /Im0 Do Q")
+        page[NameObject("/Contents")] = writer._add_object(content)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/XObject"): DictionaryObject({NameObject("/Im0"): writer._add_object(image)})}
+        )
+    with path.open("wb") as f:
+        writer.write(f)
+
+
+def _shipment(rng: random.Random) -> tuple[str, str]:
+    customs = "".join(rng.choice("0123456789") for _ in range(13)) + "M"
+    bl = "".join(rng.choice("ABCDEFGHJKLMNPRSTUVWXYZ") for _ in range(4)) + str(rng.randrange(10**6, 10**7))
+    return customs, bl
+
+
+def _statement_pages(rng: random.Random, index: int) -> list[list[str]]:
+    fees = []
+    for name in rng.sample(FEE_NAMES, rng.randint(3, len(FEE_NAMES))):
+        vendor = rng.choice(VENDORS)
+        fees.append(f"{name} {rng.randrange(1, 500) * 1000:,} {vendor}".rstrip())
+    first = ["정산서", f"주식회사 벤치{index} 귀하", "청구 내역", "소 계", *fees, "미 수 금 0", "예상비용", "합계"]
+    return [first, ["비고", "본 정산서는 벤치마크용 합성 문서입니다."]]
+
+
+def build_corpus(upload_dir: Path, args) -> dict:
+    """Write the synthetic uploads and return the groups each scenario uses."""
+    rng = random.Random(args.seed)
+    small_groups = []
+    for _ in range(args.groups * 2):
+        customs, bl = _shipment(rng)
+        names = []
+        for prefix in DOCUMENTS:
+            name = f"{prefix}_{customs}_{bl}.PDF"
+            lines = [f"{prefix} {customs} {bl}", *(f"LINE {n} {rng.random():.6f}" for n in range(30))]
+            _text_pdf(upload_dir / name, [lines] * rng.randint(1, 2))
+            names.append(name)
+        small_groups.append({"name": customs, "names": names})
+    scanned_groups = []
+    for _ in range(math.ceil(args.scans / 2)):
+        customs, bl = _shipment(rng)
+        names = []
+        for part in range(2):
+            name = f"IMP_{customs}_{bl}_{part + 1}.pdf"
+            _scan_pdf(upload_dir / name, args.scan_pages, args.scan_side, rng)
+            names.append(name)
+        scanned_groups.append({"name": customs, "names": names})
+    statements = []
+    for index in range(args.statements):
+        customs, bl = _shipment(rng)
+        name = f"PC_{customs}_{bl}.PDF"
+        _text_pdf(upload_dir / name, _statement_pages(rng, index))
+        statements.append(name)
+    return {
+        "merge": small_groups[: args.groups],
+        "batch": small_groups[args.groups :],
+        "scanned": scanned_groups,
+        "statements": statements,
+    }
+
+
+def _percentile(values: list[float], fraction: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def _peak_rss() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        return _windows_peak_rss()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _windows_peak_rss() -> int | None:
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = Counters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None
+        return counters.PeakWorkingSetSize
+    except (AttributeError, OSError):
+        return None
+
+
+def _worker_peak_rss() -> int | None:
+    # Largest high-water mark among the live merge worker processes (Linux only).
+    peaks = []
+    for child in multiprocessing.active_children():
+        try:
+            status = Path(f"/proc/{child.pid}/status").read_text()
+        except OSError:
+            continue
+        for line in status.splitlines():
+            if line.startswith("VmHWM:"):
+                peaks.append(int(line.split()[1]) * 1024)
+    return max(peaks, default=None)
+
+
+def _measure(name: str, calls) -> dict:
+    """Run (method, path, kwargs, input_bytes) calls one after another."""
+    latencies = []
+    errors = 0
+    bytes_in = 0
+    bytes_out = 0
+    started = time.perf_counter()
+    for send, path, kwargs, input_bytes in calls:
+        request_started = time.perf_counter()
+        response = send(path, **kwargs)
+        body = response.get_data()
+        response.close()
+        latencies.append(time.perf_counter() - request_started)
+        if response.status_code >= 400:
+            errors += 1
+        bytes_in += input_bytes
+        bytes_out += len(body)
+    seconds = time.perf_counter() - started
+    return {
+        "name": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": seconds,
+        "requests_per_second": len(latencies) / seconds if seconds else None,
+        "input_bytes": bytes_in,
+        "input_mib_per_second": bytes_in / seconds / 1024 / 1024 if seconds else None,
+        "output_bytes": bytes_out,
+        "p50_ms": _percentile(latencies, 0.5) * 1000 if latencies else None,
+        "p95_ms": _percentile(latencies, 0.95) * 1000 if latencies else None,
+        "max_ms": max(latencies) * 1000 if latencies else None,
+        "peak_rss_bytes": _peak_rss(),
+        "worker_peak_rss_bytes": _worker_peak_rss(),
+    }
+
+
+def run_scenarios(server_app, services, corpus: dict, args) -> list[dict]:
+    client = server_app.app.test_client()
+    upload_dir = services.UPLOAD_DIR
+
+    def size(names) -> int:
+        return sum((upload_dir / name).stat().st_size for name in names)
+
+    def merges(groups):
+        return [
+            (client.post, "/merge", {"json": {"names": group["names"], "engine": args.engine}}, size(group["names"]))
+            for group in groups
+        ]
+
+    batch_body = {"groups": corpus["batch"], "engine": args.engine}
+    batch_call = [(client.post, "/merge-batch", {"json": batch_body}, size(n for g in corpus["batch"] for n in g["names"]))]
+    pc_calls = [(client.get, f"/pc-info/{name}", {}, size([name])) for name in corpus["statements"]]
+
+    results = [
+        _measure("merge", merges(corpus["merge"])),
+        # Same inputs again: answered from the merge cache.
+        _measure("merge_cached", merges(corpus["merge"])),
+        _measure("merge_scanned", merges(corpus["scanned"])),
+        _measure("merge_batch", batch_call),
+        _measure("merge_batch_cached", batch_call),
+        _measure("pc_info", pc_calls),
+        _measure("pc_info_cached", pc_calls),
+    ]
+    listing = [(client.get, "/uploads", {}, 0)] * args.requests
+    results.append(_measure("uploads", listing))
+    results.append(_measure("uploads_page", [(client.get, "/uploads?limit=50", {}, 0)] * args.requests))
+    results.append(_measure("merged", [(client.get, "/merged", {}, 0)] * args.requests))
+    merged_names = client.get("/merged").get_json()["merged"]
+    merged_bytes = sum((services.MERGED_DIR / name).stat().st_size for name in merged_names)
+    download = (client.post, "/merged/download", {"json": {"names": merged_names}}, merged_bytes)
+    results.append(_measure("merged_download", [download] * args.downloads))
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the merge, pc-info, listing and ZIP endpoints on a generated corpus."
+    )
+    parser.add_argument("--seed", type=int, default=1, help="Corpus seed; same seed, same files")
+    parser.add_argument("--groups", type=int, default=40, help="Small-file groups per merge scenario (4 files each)")
+    parser.add_argument("--scans", type=int, default=4, help="Large scanned files (merged in pairs)")
+    parser.add_argument("--scan-pages", type=int, default=12, help="Pages per scanned file")
+    parser.add_argument("--scan-side", type=int, default=1024, help="Scan image width/height in pixels")
+    parser.add_argument("--statements", type=int, default=30, help="PC statements with fee tables")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per listing scenario")
+    parser.add_argument("--downloads", type=int, default=3, help="Requests for /merged/download")
+    parser.add_argument("--engine", default="pypdf", help="Merge engine sent with every merge request")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable output")
+    parser.add_argument("--out", help="Also write the JSON result to this file")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="pdf_bench_"))
+    try:
+        shutil.copytree(ROOT_DIR / "server", workdir / "server", ignore=shutil.ignore_patterns("__pycache__"))
+        upload_dir = workdir / "uploads"
+        upload_dir.mkdir()
+        started = time.perf_counter()
+        corpus = build_corpus(upload_dir, args)
+        corpus_seconds = time.perf_counter() - started
+
+        sys.path.insert(0, str(workdir / "server"))
+        import app as server_app
+        import services
+        import worker_pool
+
+        server_app.prepare_server()
+        # Start every worker process up front so the first merges do not pay for it.
+        pool = worker_pool.get_pool()
+        for future in [pool.submit(time.sleep, 0.05) for _ in range(worker_pool.worker_count())]:
+            future.result()
+        try:
+            results = run_scenarios(server_app, services, corpus, args)
+        finally:
+            worker_pool.get_pool().shutdown()
+
+        files = [path for path in upload_dir.iterdir() if path.is_file()]
+        report = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "merge_workers": worker_pool.worker_count(),
+            "engine": args.engine,
+            "corpus": {
+                "seed": args.seed,
+                "files": len(files),
+                "bytes": sum(path.stat().st_size for path in files),
+                "merge_groups": len(corpus["merge"]),
+                "batch_groups": len(corpus["batch"]),
+                "scanned_files": sum(len(group["names"]) for group in corpus["scanned"]),
+                "statements": len(corpus["statements"]),
+                "build_seconds": corpus_seconds,
+            },
+            "results": results,
+        }
+    finally:
+        if args.keep:
+            print(f"scratch: {workdir}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    failed = sum(result["errors"] for result in results)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+        return 0 if not failed else 1
+    corpus_info = report["corpus"]
+    print(
+        f"{corpus_info['files']} files, {corpus_info['bytes'] / 1024 / 1024:.1f} MiB "
+        f"(seed {args.seed}, engine {args.engine}, {report['merge_workers']} workers)"
+    )
+    for result in results:
+        rss = result["peak_rss_bytes"]
+        print(
+            f"{result['name']:>20}: {result['requests']:4d} req  {result['requests_per_second']:8.1f} req/s"
+            f"  p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms"
+            f"  {result['input_mib_per_second'] or 0:7.1f} MiB/s in"
+            f"  rss {rss / 1024 / 1024 if rss else 0:6.1f} MiB  errors {result['errors']}"
+        )
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
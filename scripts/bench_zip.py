@@ -0,0 +1,58 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR / "server"))
+
+from zip_stream import ZIP_STRATEGIES, iter_zip  # noqa: E402
+
+
+def _collect(source: Path, limit: int) -> list[Path]:
+    paths = sorted(p for p in source.iterdir() if p.is_file() and p.suffix.lower() == ".pdf")
+    return paths[:limit] if limit else paths
+
+
+def _run(paths: list[Path], strategy: str, repeat: int) -> dict:
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in iter_zip(((p.name, p) for p in paths), strategy))
+        timings.append(time.perf_counter() - start)
+    return {"strategy": strategy, "seconds": min(timings), "bytes": size}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare ZIP strategies for PDF archives.")
+    parser.add_argument("source", nargs="?", default=str(ROOT_DIR / "uploads"), help="Directory of PDFs")
+    parser.add_argument("--limit", type=int, default=0, help="Use at most N files")
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable output")
+    args = parser.parse_args()
+
+    paths = _collect(Path(args.source), args.limit)
+    if not paths:
+        print("PDF 파일이 없습니다.", file=sys.stderr)
+        return 1
+    input_bytes = sum(p.stat().st_size for p in paths)
+    results = [_run(paths, strategy, args.repeat) for strategy in ZIP_STRATEGIES]
+
+    if args.json:
+        print(json.dumps({"files": len(paths), "input_bytes": input_bytes, "results": results}))
+        return 0
+    print(f"{len(paths)} files, {input_bytes / 1024 / 1024:.1f} MiB input")
+    for result in results:
+        ratio = result["bytes"] / input_bytes
+        throughput = input_bytes / result["seconds"] / 1024 / 1024
+        print(
+            f"{result['strategy']:>8}: {result['seconds'] * 1000:8.1f} ms"
+            f"  {result['bytes'] / 1024 / 1024:7.2f} MiB ({ratio:.1%})  {throughput:7.1f} MiB/s"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -37,7 +37,7 @@ function Start-Server {
   }
 
   $python = Resolve-Python
-  $args = @("server\app.py")
+  $args = @("server\serve.py")
   $proc = Start-Process -FilePath $python -ArgumentList $args -WorkingDirectory $ProjectRoot `
     -NoNewWindow -RedirectStandardOutput $LogFile -RedirectStandardError $ErrLogFile -PassThru
 
@@ -36,10 +36,12 @@ function Install-Service {
   Ensure-LogDir
   $existing = Get-Service -Name $ServiceName -ErrorAction SilentlyContinue
   if ($existing) {
-    Write-Host "Service already installed: $ServiceName"
+    # Older installs ran server\app.py (the development server).
+    & $NssmExe set $ServiceName AppParameters "server\\serve.py"
+    Write-Host "Service already installed: $ServiceName (entry point set to server\serve.py, restart to apply)"
     return
   }
-  & $NssmExe install $ServiceName $python "server\\app.py"
+  & $NssmExe install $ServiceName $python "server\\serve.py"
   & $NssmExe set $ServiceName AppDirectory $ProjectRoot
   & $NssmExe set $ServiceName DisplayName $DisplayName
   & $NssmExe set $ServiceName AppStdout $LogFile
@@ -0,0 +1,68 @@
+import json
+
+
+class BatchManifest:
+    """Pairs the files of a multipart /merge-batch body with manifest groups.
+
+    Files are matched by position with manifest["fileIds"]. Groups are
+    released in manifest order as soon as all of their files have arrived,
+    so when the manifest is sent before the files, a group can start merging
+    while the next one is still uploading.
+    """
+
+    def __init__(self):
+        self.files: list[tuple[str, object]] = []
+        self.batch_id = None
+        self._manifest = None
+        self._invalid = False
+        self._positions: dict = {}
+        self._next_group = 0
+
+    def set_manifest(self, raw: str) -> None:
+        try:
+            manifest = json.loads(raw) if raw else {}
+        except json.JSONDecodeError:
+            self._invalid = True
+            return
+        if not isinstance(manifest, dict):
+            self._invalid = True
+            return
+        self.batch_id = manifest.get("batchId")
+        file_ids = manifest.get("fileIds") or []
+        groups = manifest.get("groups") or []
+        self._manifest = {
+            "fileIds": file_ids if isinstance(file_ids, list) else [],
+            "groups": [group for group in groups if isinstance(group, dict)] if isinstance(groups, list) else [],
+        }
+        self._positions = {file_id: index for index, file_id in enumerate(self._manifest["fileIds"])}
+
+    def add_file(self, filename: str, source) -> None:
+        self.files.append((filename, source))
+
+    def ready_groups(self, final: bool = False) -> list[tuple[str, list]]:
+        if self._manifest is None:
+            return []
+        groups = self._manifest["groups"]
+        ready = []
+        while self._next_group < len(groups):
+            group = groups[self._next_group]
+            file_ids = group.get("fileIds", [])
+            positions = [self._positions[file_id] for file_id in file_ids if file_id in self._positions]
+            if not final and any(position >= len(self.files) for position in positions):
+                break
+            sources = [self.files[position] for position in positions if position < len(self.files)]
+            ready.append((group.get("name", "merged"), sources))
+            self._next_group += 1
+        return ready
+
+    def error(self) -> str | None:
+        # The same checks as the buffered form, which can only run once the
+        # whole body has been read.
+        if not self.files:
+            return "PDF 파일을 선택해주세요."
+        if self._invalid:
+            return "요청 형식이 올바르지 않습니다."
+        manifest = self._manifest or {"fileIds": [], "groups": []}
+        if not manifest["fileIds"] or len(manifest["fileIds"]) != len(self.files) or not manifest["groups"]:
+            return "요청 데이터가 부족합니다."
+        return None
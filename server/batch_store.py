@@ -0,0 +1,56 @@
+from pathlib import Path
+import json
+import re
+import threading
+import time
+
+BATCH_RETENTION_SECONDS = 7 * 24 * 60 * 60
+BATCH_ID = re.compile(r"[0-9a-f]{32}")
+
+
+class BatchStore:
+    """Outcome of the last run of each batch, one JSON file per batch id.
+
+    A record keeps the groups of the batch with their status, output and
+    error, and for batches built from stored uploads the upload names of
+    every group, so the batch can be run again by id alone. Records older
+    than BATCH_RETENTION_SECONDS are dropped whenever one is saved.
+    """
+
+    def __init__(self, directory: Path):
+        self._dir = directory
+        self._lock = threading.Lock()
+        self._dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def valid_id(batch_id) -> bool:
+        return isinstance(batch_id, str) and BATCH_ID.fullmatch(batch_id) is not None
+
+    def load(self, batch_id: str) -> dict | None:
+        if not self.valid_id(batch_id):
+            return None
+        try:
+            record = json.loads((self._dir / f"{batch_id}.json").read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        return record if isinstance(record, dict) else None
+
+    def save(self, record: dict) -> None:
+        target = self._dir / f"{record['batchId']}.json"
+        tmp_path = target.with_suffix(".json.tmp")
+        with self._lock:
+            try:
+                tmp_path.write_text(json.dumps(record, ensure_ascii=False), encoding="utf-8")
+                tmp_path.replace(target)
+            except OSError:
+                pass
+            self._prune()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - BATCH_RETENTION_SECONDS
+        for path in self._dir.glob("*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
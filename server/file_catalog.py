@@ -0,0 +1,207 @@
+from dataclasses import asdict, dataclass
+from pathlib import Path
+import threading
+import time
+
+from file_hash import file_sha256
+
+# Safety net for changes the write paths never see (files copied in by hand,
+# coarse directory mtimes on some filesystems).
+RECONCILE_INTERVAL_SECONDS = 60
+
+
+@dataclass
+class CatalogEntry:
+    name: str
+    size: int
+    mtime: float
+    customs: str | None = None
+    bl: str | None = None
+    prefix: str | None = None
+    # Filled in on demand by find_by_content/digest, or by whoever added the file.
+    sha256: str | None = None
+    mtime_ns: int = 0
+
+    @property
+    def version(self) -> str:
+        return stat_version(self.size, self.mtime_ns)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def stat_version(size: int, mtime_ns: int) -> str:
+    # Changes whenever the file is rewritten, without reading its content.
+    return f"{mtime_ns:x}-{size:x}"
+
+
+class FileCatalog:
+    """In-memory index of the PDFs in one directory.
+
+    The upload/merge/delete code paths keep it current through add/remove;
+    a full directory scan only happens at startup, when the directory mtime
+    changes behind our back, or every RECONCILE_INTERVAL_SECONDS.
+    """
+
+    def __init__(self, directory: Path, classify):
+        self._dir = directory
+        self._classify = classify
+        self._entries: dict[str, CatalogEntry] = {}
+        self._ordered: list[CatalogEntry] | None = None
+        self._dir_mtime_ns = None
+        self._reconciled_at = 0.0
+        self._version = 0
+        self._lock = threading.RLock()
+
+    def reconcile(self) -> None:
+        with self._lock:
+            entries = {}
+            for path in self._dir.iterdir():
+                if not path.is_file() or path.suffix.lower() != ".pdf":
+                    continue
+                previous = self._entries.get(path.name)
+                entry = self._describe(path, previous)
+                if entry is not None:
+                    entries[path.name] = entry
+            if entries != self._entries:
+                self._version += 1
+            self._entries = entries
+            self._ordered = None
+            self._dir_mtime_ns = self._current_dir_mtime()
+            self._reconciled_at = time.monotonic()
+
+    def refresh(self) -> None:
+        with self._lock:
+            stale = (
+                self._dir_mtime_ns is None
+                or self._current_dir_mtime() != self._dir_mtime_ns
+                or time.monotonic() - self._reconciled_at > RECONCILE_INTERVAL_SECONDS
+            )
+            if stale:
+                self.reconcile()
+
+    def add(self, path: Path, **meta) -> CatalogEntry | None:
+        with self._lock:
+            entry = self._describe(path, None)
+            if entry is None:
+                return None
+            for key, value in meta.items():
+                if value is not None:
+                    setattr(entry, key, value)
+            self._entries[entry.name] = entry
+            self._ordered = None
+            self._version += 1
+            self._dir_mtime_ns = self._current_dir_mtime()
+            return entry
+
+    def remove(self, name: str) -> None:
+        with self._lock:
+            if self._entries.pop(name, None) is not None:
+                self._ordered = None
+                self._version += 1
+            self._dir_mtime_ns = self._current_dir_mtime()
+
+    @property
+    def version(self) -> int:
+        # Bumped on every change, so callers can memoize views of the catalog.
+        self.refresh()
+        with self._lock:
+            return self._version
+
+    def get(self, name: str) -> CatalogEntry | None:
+        with self._lock:
+            return self._entries.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return name in self._entries
+
+    def find_by_content(self, size: int, digest: str, accept=None) -> CatalogEntry | None:
+        """Return an entry whose file has this size and sha256.
+
+        Only entries of the same size are hashed, once each; accept can narrow
+        the candidates further.
+        """
+        self.refresh()
+        with self._lock:
+            candidates = [
+                entry
+                for entry in self._entries.values()
+                if entry.size == size and (accept is None or accept(entry))
+            ]
+        for entry in candidates:
+            if self._hash(entry) == digest:
+                return entry
+        return None
+
+    def digest(self, name: str, verify: bool = True) -> str | None:
+        """Return the sha256 of an indexed file, hashing it at most once.
+
+        With verify, the file is stat'ed first and re-indexed if it changed
+        since it was described, so the digest always matches what is on disk.
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is None:
+            return None
+        if verify:
+            with self._lock:
+                current = self._describe(self._dir / name, entry)
+                if current is None:
+                    return None
+                if current is not entry:
+                    self._entries[name] = current
+                    self._ordered = None
+                    self._version += 1
+            entry = current
+        return self._hash(entry)
+
+    def unique_name(self, name: str, taken=()) -> str:
+        """First of name, "stem (1).ext", "stem (2).ext"... not in the index or taken."""
+        path = Path(name)
+        candidate = name
+        counter = 0
+        with self._lock:
+            while candidate in self._entries or candidate in taken:
+                counter += 1
+                candidate = f"{path.stem} ({counter}){path.suffix}"
+        return candidate
+
+    def list(self, since: float | None = None, offset: int = 0, limit: int | None = None):
+        """Return (entries, total) ordered by mtime, oldest first."""
+        self.refresh()
+        with self._lock:
+            if self._ordered is None:
+                self._ordered = sorted(self._entries.values(), key=lambda e: (e.mtime, e.name))
+            ordered = self._ordered
+        if since is not None:
+            ordered = [entry for entry in ordered if entry.mtime > since]
+        total = len(ordered)
+        end = None if limit is None else offset + limit
+        return ordered[offset:end], total
+
+    def _hash(self, entry: CatalogEntry) -> str | None:
+        if entry.sha256 is None:
+            try:
+                entry.sha256 = file_sha256(self._dir / entry.name)
+            except OSError:
+                return None
+        return entry.sha256
+
+    def _describe(self, path: Path, previous: CatalogEntry | None) -> CatalogEntry | None:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        if previous and previous.size == stat.st_size and previous.mtime_ns == stat.st_mtime_ns:
+            return previous
+        fields = self._classify(path.name)
+        if previous and not fields.get("bl"):
+            fields["bl"] = previous.bl
+        return CatalogEntry(path.name, stat.st_size, stat.st_mtime, mtime_ns=stat.st_mtime_ns, **fields)
+
+    def _current_dir_mtime(self):
+        try:
+            return self._dir.stat().st_mtime_ns
+        except OSError:
+            return None
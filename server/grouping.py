@@ -0,0 +1,89 @@
+import re
+
+CUSTOMS_ONLY_WITH_HYPHEN = re.compile(r"(\d{5})-(\d{2})-(\d{6})M", re.I)
+CUSTOMS_ONLY_PLAIN = re.compile(r"(\d{13})M", re.I)
+UNCLASSIFIED = "미분류"
+
+# Mirrors getFileOrderRank / assignGroupKeys in public/app-core.js
+# so server-built groups line up with what the browser would compute.
+
+
+def _strip_extension(name: str) -> str:
+    return re.sub(r"\.[^/.]+$", "", name)
+
+
+def is_customs_only_name(name: str) -> bool:
+    trimmed = _strip_extension(name).strip()
+    if not trimmed:
+        return False
+    return bool(CUSTOMS_ONLY_WITH_HYPHEN.fullmatch(trimmed) or CUSTOMS_ONLY_PLAIN.fullmatch(trimmed))
+
+
+def _prefix_list(prefix_order) -> list[str]:
+    prefixes = []
+    for item in prefix_order or []:
+        if isinstance(item, str):
+            prefix = item
+        elif isinstance(item, dict):
+            prefix = str(item.get("prefix") or "")
+        else:
+            continue
+        prefix = prefix.strip().upper()
+        if prefix:
+            prefixes.append(prefix)
+    return prefixes
+
+
+def build_groups(entries, prefix_order, customs_only_first: bool) -> list[dict]:
+    """Group catalog entries by customs number, falling back to an unambiguous BL.
+
+    entries must be in upload order; that order breaks ties inside a group
+    the same way addedIndex does in the browser.
+    """
+    bl_map = {}
+    for entry in entries:
+        if entry.customs and entry.bl:
+            if entry.bl not in bl_map:
+                bl_map[entry.bl] = entry.customs
+            elif bl_map[entry.bl] != entry.customs:
+                bl_map[entry.bl] = None
+
+    prefixes = _prefix_list(prefix_order)
+    ranks = {prefix: index for index, prefix in enumerate(prefixes)}
+
+    def rank(entry) -> int:
+        if customs_only_first and is_customs_only_name(entry.name):
+            return -1
+        return ranks.get(entry.prefix, len(prefixes))
+
+    grouped: dict[str, list] = {}
+    for added_index, entry in enumerate(entries):
+        if entry.customs:
+            key = entry.customs
+        elif entry.bl and bl_map.get(entry.bl):
+            key = bl_map[entry.bl]
+        else:
+            key = UNCLASSIFIED
+        grouped.setdefault(key, []).append((rank(entry), added_index, entry))
+
+    keys = sorted(key for key in grouped if key != UNCLASSIFIED)
+    if UNCLASSIFIED in grouped:
+        keys.append(UNCLASSIFIED)
+
+    groups = []
+    for key in keys:
+        members = [entry for _, _, entry in sorted(grouped[key], key=lambda item: item[:2])]
+        bl_values = {entry.bl for entry in members if entry.bl}
+        groups.append(
+            {
+                "name": key,
+                "customs": key if key != UNCLASSIFIED else None,
+                "bl": bl_values.pop() if len(bl_values) == 1 else None,
+                "names": [entry.name for entry in members],
+                "files": [
+                    {"name": entry.name, "prefix": entry.prefix, "size": entry.size, "bl": entry.bl}
+                    for entry in members
+                ],
+            }
+        )
+    return groups
@@ -0,0 +1,492 @@
+from flask import Blueprint, current_app, jsonify, request, send_file
+from pathlib import Path
+import shutil
+import tempfile
+import threading
+import uuid
+
+from batch_manifest import BatchManifest
+from merge_jobs import MergeJob, MergeTask
+from multipart_stream import FormField, RequestSpool
+from naming import build_merged_name, extract_bl, extract_customs, timestamp
+from pdf_merge import MERGE_ENGINES
+from route_helpers import multipart_parts, open_request_spool, zip_response
+from services import (
+    MERGED_DIR,
+    UPLOAD_DIR,
+    batch_store,
+    job_manager,
+    merged_catalog,
+    known_invalid_uploads,
+    resolve_upload_sources,
+)
+
+bp = Blueprint("jobs", __name__)
+
+BATCH_REPORT_NAME = "병합오류.txt"
+_reserved_outputs: dict = {}
+_reserved_lock = threading.Lock()
+
+
+@bp.post("/merge")
+def merge_pdfs():
+    merge_request, error = _merge_request()
+    if error:
+        return error
+    job = _submit_merge_job(*merge_request)
+    job.wait()
+    if job.status != "done":
+        return jsonify({"error": "병합 중 오류가 발생했습니다."}), 500
+    response = send_file(
+        job.tasks[0].target,
+        mimetype="application/pdf",
+        as_attachment=True,
+        download_name=job.download_name,
+    )
+    job.downloaded = True
+    return response
+
+
+@bp.post("/jobs/merge")
+def create_merge_job():
+    merge_request, error = _merge_request()
+    if error:
+        return error
+    job = _submit_merge_job(*merge_request)
+    return jsonify(job.to_dict()), 202
+
+
+def _merge_request():
+    # Returns ((sources, engine, spool), error); spool holds the files of a
+    # multipart body and is None for JSON requests naming stored uploads.
+    spool = None
+    form = None
+    if request.is_json:
+        data = request.get_json(silent=True) or {}
+        names = data.get("names", []) if isinstance(data, dict) else None
+        if not isinstance(names, list):
+            return None, (jsonify({"error": "요청 형식이 올바르지 않습니다."}), 400)
+        sources, missing = resolve_upload_sources(names)
+        if missing:
+            return None, (jsonify({"error": "파일을 찾을 수 없습니다.", "missing": missing}), 404)
+        invalid = known_invalid_uploads(sources)
+        if invalid:
+            return None, _invalid_uploads_error(invalid)
+    else:
+        spool, error = open_request_spool()
+        if error:
+            return None, error
+        form = {}
+        sources = []
+        try:
+            for part in multipart_parts():
+                if isinstance(part, FormField):
+                    form.setdefault(part.name, part.value)
+                elif part.name == "files":
+                    sources.append((part.filename or "", spool.add(part)))
+        except ValueError:
+            sources = []
+        except BaseException:
+            spool.discard()
+            raise
+
+    if len(sources) < 2:
+        engine, error = None, (jsonify({"error": "PDF 파일을 2개 이상 선택해주세요."}), 400)
+    else:
+        engine, error = _merge_engine(form)
+    if error:
+        if spool is not None:
+            spool.discard()
+        return None, error
+    return (sources, engine, spool), None
+
+
+def _merge_engine(form=None):
+    # Per-request override of MERGE_ENGINE, as "engine" in the JSON body or
+    # in the fields of a streamed multipart body.
+    if request.is_json:
+        data = request.get_json(silent=True)
+        engine = data.get("engine") if isinstance(data, dict) else None
+    else:
+        engine = (form or {}).get("engine")
+    engine = (engine or current_app.config["MERGE_ENGINE"]).lower()
+    if engine not in MERGE_ENGINES:
+        return None, (jsonify({"error": "지원하지 않는 병합 방식입니다.", "engines": list(MERGE_ENGINES)}), 400)
+    return engine, None
+
+
+def _submit_merge_job(sources, engine: str, spool: RequestSpool | None = None) -> MergeJob:
+    group_customs = None
+    customs_mismatch = False
+    group_bl = None
+    bl_mismatch = False
+
+    for filename, _ in sources:
+        customs = extract_customs(filename)
+        bl = extract_bl(filename)
+        if customs:
+            if group_customs is None:
+                group_customs = customs
+            elif customs != group_customs:
+                customs_mismatch = True
+        if bl:
+            if group_bl is None:
+                group_bl = bl
+            elif bl != group_bl:
+                bl_mismatch = True
+
+    merged_customs = "미분류" if customs_mismatch or not group_customs else group_customs
+    merged_bl = "미확인" if bl_mismatch or not group_bl else group_bl
+    target = _reserve_output(merged_customs, merged_bl)
+    spool_dirs = list(spool.dirs) if spool else []
+    task = MergeTask(merged_customs, _spool_sources(sources, spool_dirs), target, merged_bl, engine)
+    return job_manager.submit(
+        "merge", [task], target.name, spool_dirs, on_cleanup=spool.release if spool else None
+    )
+
+
+def _reserve_output(customs: str, bl: str) -> Path:
+    # Output names carry the second they were made in, so two groups of the
+    # same name (or a merge and a batch) started in the same second would
+    # share a file. Each task reserves its name when its job is created, in
+    # group order; a taken name becomes "name (1).pdf" as uploads do.
+    with _reserved_lock:
+        stamp = timestamp()
+        if _reserved_outputs.get("timestamp") != stamp:
+            _reserved_outputs["timestamp"] = stamp
+            _reserved_outputs["names"] = set()
+        taken = _reserved_outputs["names"]
+        name = merged_catalog.unique_name(build_merged_name(customs, bl, stamp), taken)
+        taken.add(name)
+    return MERGED_DIR / name
+
+
+def _invalid_uploads_error(invalid: list[dict]):
+    return jsonify({"error": "열 수 없는 PDF 파일이 있습니다.", "invalid": invalid}), 422
+
+def _resolve_group_bl(filenames) -> str:
+    bl_values = []
+    for filename in filenames:
+        bl = extract_bl(filename)
+        if bl:
+            bl_values.append(bl)
+    unique = set(bl_values)
+    if len(unique) == 1:
+        return list(unique)[0]
+    return "미확인"
+
+
+@bp.post("/merge-batch")
+def merge_batch():
+    job, error = _batch_job()
+    if error:
+        return error
+    return zip_response(_batch_members(job), job.download_name, "일괄 병합 중 오류가 발생했습니다.")
+
+
+@bp.post("/jobs/merge-batch")
+def create_batch_job():
+    job, error = _batch_job()
+    if error:
+        return error
+    return jsonify(job.to_dict()), 202
+
+
+@bp.get("/jobs/<job_id>")
+def get_job(job_id):
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({"error": "작업을 찾을 수 없습니다."}), 404
+    return jsonify(job.to_dict())
+
+
+@bp.get("/jobs/<job_id>/download")
+def download_job(job_id):
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({"error": "작업을 찾을 수 없습니다."}), 404
+    if job.status != "done":
+        return jsonify({"error": "작업이 아직 완료되지 않았습니다.", "status": job.status}), 409
+    outputs = [path for path in job.outputs() if path.exists()]
+    if job.kind == "merge":
+        if not outputs:
+            return jsonify({"error": "파일을 찾을 수 없습니다."}), 404
+        response = send_file(
+            outputs[0],
+            mimetype="application/pdf",
+            as_attachment=True,
+            download_name=job.download_name,
+        )
+        job.downloaded = True
+        return response
+
+    def members():
+        yield from ((path.name, path) for path in outputs)
+        report = _batch_report(job)
+        if report:
+            yield BATCH_REPORT_NAME, report
+        job.downloaded = True
+
+    return zip_response(members(), job.download_name, "다운로드 중 오류가 발생했습니다.")
+
+
+@bp.get("/batches/<batch_id>")
+def get_batch(batch_id):
+    record = batch_store.load(batch_id)
+    if record is None:
+        return jsonify({"error": "일괄 병합 기록을 찾을 수 없습니다."}), 404
+    return jsonify(record)
+
+
+def _batch_job():
+    if not request.is_json:
+        return _stream_batch_job()
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        data = {}
+    batch_id = data.get("batchId")
+    if batch_id is not None and not batch_store.valid_id(batch_id):
+        return None, (jsonify({"error": "요청 형식이 올바르지 않습니다."}), 400)
+    groups = data.get("groups", [])
+    if not groups and batch_id:
+        return _rerun_batch(batch_id)
+    if not isinstance(groups, list) or not groups:
+        return None, (jsonify({"error": "요청 데이터가 부족합니다."}), 400)
+    group_sources, missing = _resolve_batch_by_names(groups)
+    if missing:
+        return None, (jsonify({"error": "파일을 찾을 수 없습니다.", "missing": missing}), 404)
+    engine, error = _merge_engine()
+    if error:
+        return None, error
+    return _submit_batch_job(group_sources, engine, batch_id), None
+
+
+def _rerun_batch(batch_id: str):
+    # Re-run of an earlier batch by id. Groups recorded as done keep their
+    # output while it is still in merged/, even if the page has deleted
+    # their uploads since; only failed groups and lost outputs go back to
+    # the uploads and are merged again.
+    record = batch_store.load(batch_id)
+    if record is None:
+        return None, (jsonify({"error": "일괄 병합 기록을 찾을 수 없습니다."}), 404)
+    if not record.get("resumable"):
+        return None, (jsonify({"error": "파일을 다시 올려야 하는 일괄 병합입니다."}), 409)
+    groups = [group for group in record.get("groups", []) if isinstance(group, dict)]
+    outputs = [_recorded_output(group) for group in groups]
+    redo = [group for group, output in zip(groups, outputs) if output is None]
+    group_sources, missing = _resolve_batch_by_names(redo)
+    if missing:
+        return None, (jsonify({"error": "파일을 찾을 수 없습니다.", "missing": missing}), 404)
+    engine, error = _merge_engine()
+    if error:
+        return None, error
+    redone = iter(group_sources)
+    spool_dirs = []
+    tasks = []
+    for group, output in zip(groups, outputs):
+        if output is None:
+            group_name, sources = next(redone)
+            tasks.append(_batch_task(group_name, sources, engine, spool_dirs))
+            continue
+        names = group["names"]
+        tasks.append(
+            MergeTask(group["name"], [], output, _resolve_group_bl(names), engine, source_names=names, prebuilt=True)
+        )
+    return job_manager.submit(
+        "batch", tasks, f"{timestamp()}.zip", spool_dirs, isolate_failures=True, batch_id=batch_id
+    ), None
+
+
+def _recorded_output(group: dict) -> Path | None:
+    if group.get("status") != "done" or not isinstance(group.get("output"), str):
+        return None
+    target = (MERGED_DIR / group["output"]).resolve()
+    if target.parent != MERGED_DIR or not target.is_file():
+        return None
+    return target
+
+
+def _stream_batch_job():
+    # Each manifest group is handed to the workers as soon as its files are
+    # spooled, so merging overlaps the rest of the upload. The page sends the
+    # manifest first; with the manifest last every group starts at the end.
+    spool, error = open_request_spool()
+    if error:
+        return None, error
+    batch = BatchManifest()
+    form = {}
+    job = None
+    engine = None
+    try:
+        for part in multipart_parts():
+            if isinstance(part, FormField):
+                if part.name == "manifest" and "manifest" not in form:
+                    batch.set_manifest(part.value)
+                form.setdefault(part.name, part.value)
+                continue
+            if part.name != "files":
+                continue
+            batch.add_file(part.filename or "", spool.add(part))
+            ready = batch.ready_groups()
+            if not ready:
+                continue
+            if job is None:
+                engine, error = _merge_engine(form)
+                if error:
+                    break
+                error = _manifest_batch_id_error(batch)
+                if error:
+                    break
+                job = _open_batch_job(spool, batch.batch_id)
+            _add_batch_tasks(job, ready, engine, spool)
+            if job.finished:
+                # A merge already failed; the job reports it.
+                job.close()
+                return job, None
+    except ValueError:
+        if batch.files:
+            error = (jsonify({"error": "요청 형식이 올바르지 않습니다."}), 400)
+    except BaseException:
+        _abandon_batch(job, spool, "request aborted")
+        raise
+
+    message = None if error else batch.error()
+    if message:
+        error = (jsonify({"error": message}), 400)
+    if error is None and job is None:
+        engine, error = _merge_engine(form)
+        if error is None:
+            error = _manifest_batch_id_error(batch)
+    if error:
+        _abandon_batch(job, spool, "invalid request")
+        return None, error
+    if job is None:
+        job = _open_batch_job(spool, batch.batch_id)
+    _add_batch_tasks(job, batch.ready_groups(final=True), engine, spool)
+    job.close()
+    return job, None
+
+
+def _manifest_batch_id_error(batch: BatchManifest):
+    if batch.batch_id is not None and not batch_store.valid_id(batch.batch_id):
+        return jsonify({"error": "요청 형식이 올바르지 않습니다."}), 400
+    return None
+
+
+def _open_batch_job(spool: RequestSpool, batch_id: str | None = None) -> MergeJob:
+    return job_manager.submit(
+        "batch",
+        [],
+        f"{timestamp()}.zip",
+        spool.dirs,
+        receiving=True,
+        on_cleanup=spool.release,
+        isolate_failures=True,
+        batch_id=batch_id,
+    )
+
+
+def _add_batch_tasks(job: MergeJob, group_sources, engine: str, spool: RequestSpool) -> None:
+    for group_name, sources in group_sources:
+        if sources:
+            job.add_task(_batch_task(group_name, sources, engine, spool.dirs))
+
+
+def _abandon_batch(job: MergeJob | None, spool: RequestSpool, reason: str) -> None:
+    if job is None:
+        spool.discard()
+    else:
+        job.close(reason)
+
+
+def _submit_batch_job(group_sources, engine: str, batch_id: str | None = None) -> MergeJob:
+    # Output names are fixed here, before any worker runs, so they do not depend
+    # on the order in which groups finish.
+    batch_timestamp = timestamp()
+    spool_dirs = []
+    tasks = [
+        _batch_task(group_name, sources, engine, spool_dirs)
+        for group_name, sources in group_sources
+        if sources
+    ]
+    return job_manager.submit(
+        "batch", tasks, f"{batch_timestamp}.zip", spool_dirs, isolate_failures=True, batch_id=batch_id
+    )
+
+
+def _batch_task(group_name: str, sources, engine: str, spool_dirs: list) -> MergeTask:
+    group_bl = _resolve_group_bl([filename for filename, _ in sources])
+    target = _reserve_output(group_name, group_bl)
+    task = MergeTask(group_name, _spool_sources(sources, spool_dirs), target, group_bl, engine)
+    if all(isinstance(path, Path) and path.parent == UPLOAD_DIR for _, path in sources):
+        task.source_names = [filename for filename, _ in sources]
+        invalid = known_invalid_uploads(sources)
+        if invalid:
+            # Reported as a failed group without a worker ever opening it.
+            task.error = "열 수 없는 PDF 파일: " + ", ".join(
+                f"{item['name']} ({item['error']})" for item in invalid
+            )
+    return task
+
+
+def _batch_members(job: MergeJob):
+    # The outputs stay safe from MERGED_MAX_MB eviction until the whole
+    # ZIP has been produced.
+    for target in job.iter_outputs():
+        yield target.name, target
+    report = _batch_report(job)
+    if report:
+        yield BATCH_REPORT_NAME, report
+    job.downloaded = True
+
+
+def _batch_report(job: MergeJob) -> bytes | None:
+    # Text file added to a batch ZIP that is missing groups.
+    failures = job.failures()
+    if not failures:
+        return None
+    lines = [
+        f"일괄 병합 {job.batch_id}: 전체 {len(job.tasks)}개 그룹 중 {len(failures)}개 실패",
+        "같은 일괄 병합을 다시 실행하면 실패한 그룹만 다시 병합합니다.",
+        "",
+    ]
+    for task in failures:
+        lines.append(f"[{task.name}]")
+        lines.append(f"오류: {task.error or '알 수 없는 오류'}")
+        if task.source_names:
+            lines.append(f"파일: {', '.join(task.source_names)}")
+        lines.append("")
+    return "\r\n".join(lines).encode("utf-8-sig")
+
+
+def _spool_sources(sources, spool_dirs: list) -> list[str]:
+    # Jobs outlive the request, so uploaded streams are copied to a private
+    # temp dir; stored uploads are passed to the workers by path.
+    paths = []
+    for _, source in sources:
+        if isinstance(source, Path):
+            paths.append(str(source))
+            continue
+        if not spool_dirs:
+            spool_dirs.append(tempfile.mkdtemp(prefix="pdf_merge_"))
+        target = Path(spool_dirs[0]) / f"{uuid.uuid4().hex}.pdf"
+        source.seek(0)
+        with target.open("wb") as f:
+            shutil.copyfileobj(source, f)
+        paths.append(str(target))
+    return paths
+
+
+def _resolve_batch_by_names(groups) -> tuple[list[tuple[str, list]], list[str]]:
+    group_sources = []
+    missing = []
+    for group in groups:
+        if not isinstance(group, dict):
+            continue
+        names = group.get("names", [])
+        if not isinstance(names, list):
+            names = []
+        sources, group_missing = resolve_upload_sources(names)
+        missing.extend(group_missing)
+        group_sources.append((group.get("name", "merged"), sources))
+    return group_sources, missing
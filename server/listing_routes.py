@@ -0,0 +1,185 @@
+from flask import Blueprint, jsonify, redirect, request, send_file, url_for
+from pathlib import Path
+import json
+import threading
+
+from file_catalog import FileCatalog, stat_version
+from grouping import build_groups
+from naming import timestamp
+from route_helpers import zip_response
+from services import (
+    MERGED_DIR,
+    UPLOAD_DIR,
+    merged_catalog,
+    pdf_info_index,
+    preview_cache,
+    settings_store,
+    upload_catalog,
+)
+
+bp = Blueprint("listings", __name__)
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+_groups_memo: dict = {}
+_groups_lock = threading.Lock()
+
+
+@bp.get("/uploads")
+def list_uploads():
+    listing = _catalog_listing("uploads", upload_catalog)
+    for item in listing["items"]:
+        # Page count, version, encryption and parse error; null until the
+        # background inspection of the file has finished. Files not hashed
+        # yet (the first listing after a restart) are hashed there too.
+        item["pdf"] = pdf_info_index.get(item["sha256"])
+        if item["pdf"] is None:
+            pdf_info_index.enqueue(UPLOAD_DIR / item["name"], item["sha256"])
+    return jsonify(listing)
+
+
+def _catalog_listing(key: str, catalog: FileCatalog) -> dict:
+    since = request.args.get("since", type=float)
+    offset = max(0, request.args.get("offset", default=0, type=int))
+    limit = request.args.get("limit", type=int)
+    if limit is not None and limit <= 0:
+        limit = None
+    entries, total = catalog.list(since=since, offset=offset, limit=limit)
+    return {
+        key: [entry.name for entry in entries],
+        "items": [{**entry.to_dict(), "url": versioned_url(key, entry.name, entry.version)} for entry in entries],
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "latestMtime": max((entry.mtime for entry in entries), default=since),
+    }
+
+
+def versioned_url(key: str, name: str, version: str | None) -> str:
+    # ?v= is the file's mtime and size, which change whenever it is
+    # rewritten, so the URL is safe to cache forever and no listing has to
+    # read the files to build it.
+    endpoint = "listings.get_upload" if key == "uploads" else "listings.get_merged"
+    if not version:
+        return url_for(endpoint, filename=name)
+    return url_for(endpoint, filename=name, v=version)
+
+
+def _current_version(target: Path) -> str | None:
+    try:
+        stat = target.stat()
+    except OSError:
+        return None
+    return stat_version(stat.st_size, stat.st_mtime_ns)
+
+
+def _send_catalog_pdf(key: str, directory: Path, filename: str):
+    target = (directory / filename).resolve()
+    if directory not in target.parents or not target.exists() or not target.is_file():
+        return jsonify({"error": "파일을 찾을 수 없습니다."}), 404
+    version = request.args.get("v")
+    if not version or target.parent != directory:
+        return send_file(target, mimetype="application/pdf")
+    current = _current_version(target)
+    if current is None:
+        return send_file(target, mimetype="application/pdf")
+    if current != version:
+        # Link to an older version of the file: point at the current one.
+        return redirect(versioned_url(key, target.name, current))
+    response = send_file(target, mimetype="application/pdf", max_age=IMMUTABLE_MAX_AGE)
+    response.cache_control.immutable = True
+    return response
+
+
+@bp.get("/groups")
+def list_groups():
+    prefix_order = settings_store.get("prefixOrder")
+    key = (
+        upload_catalog.version,
+        json.dumps(prefix_order, sort_keys=True, ensure_ascii=False),
+        bool(settings_store.get("customsOnlyFirst")),
+    )
+    with _groups_lock:
+        if _groups_memo.get("key") != key:
+            entries, _ = upload_catalog.list()
+            _groups_memo["key"] = key
+            _groups_memo["groups"] = build_groups(entries, prefix_order, key[2])
+        groups = _groups_memo["groups"]
+    urls = {}
+    for group in groups:
+        for name in group["names"]:
+            entry = upload_catalog.get(name)
+            digest = entry.sha256 if entry else None
+            if pdf_info_index.get(digest) is None:
+                pdf_info_index.enqueue(UPLOAD_DIR / name, digest)
+            urls[name] = versioned_url("uploads", name, entry.version if entry else None)
+    return jsonify(
+        {"groups": groups, "total": sum(len(group["names"]) for group in groups), "urls": urls}
+    )
+
+
+@bp.get("/uploads/<path:filename>")
+def get_upload(filename):
+    return _send_catalog_pdf("uploads", UPLOAD_DIR, filename)
+
+
+@bp.get("/preview/<path:filename>")
+def get_preview(filename):
+    # The first PREVIEW_PAGES pages of an upload, for the preview pane. Files
+    # the cut would not shrink redirect to the original. The preview cache is
+    # keyed by content, so the file is hashed here the first time it is
+    # previewed.
+    target = (UPLOAD_DIR / filename).resolve()
+    if target.parent != UPLOAD_DIR or not target.is_file():
+        return jsonify({"error": "파일을 찾을 수 없습니다."}), 404
+    digest = upload_catalog.digest(target.name)
+    entry = upload_catalog.get(target.name)
+    if not digest or entry is None:
+        return redirect(url_for("listings.get_upload", filename=target.name))
+    version = request.args.get("v")
+    if version and entry.version != version:
+        return redirect(url_for("listings.get_preview", filename=target.name, v=entry.version))
+    preview = preview_cache.get(target, digest)
+    if preview is None:
+        # Not built yet (or the build failed): show the original this time.
+        return redirect(versioned_url("uploads", entry.name, entry.version))
+    if preview == target:
+        response = redirect(versioned_url("uploads", entry.name, entry.version))
+    else:
+        response = send_file(preview, mimetype="application/pdf")
+    if version:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+
+@bp.get("/merged")
+def list_merged():
+    return jsonify(_catalog_listing("merged", merged_catalog))
+
+
+@bp.get("/merged/<path:filename>")
+def get_merged(filename):
+    return _send_catalog_pdf("merged", MERGED_DIR, filename)
+
+
+@bp.post("/merged/download")
+def download_merged_selection():
+    data = request.get_json(silent=True) or {}
+    names = data.get("names", [])
+    if not isinstance(names, list) or not names:
+        return jsonify({"error": "다운로드할 파일이 없습니다."}), 400
+
+    def members():
+        for name in names:
+            target = (MERGED_DIR / name).resolve()
+            if MERGED_DIR not in target.parents or not target.exists() or not target.is_file():
+                continue
+            yield target.name, target
+
+    return zip_response(
+        members(),
+        f"merged_search_{timestamp()}.zip",
+        "다운로드 중 오류가 발생했습니다.",
+    )
@@ -0,0 +1,219 @@
+from pathlib import Path
+import hashlib
+import json
+import os
+import threading
+import time
+
+from file_hash import file_sha256
+
+# Bump when merge output for the same inputs changes, so older files are not
+# handed out as cache hits.
+MERGE_CACHE_VERSION = 1
+SOURCE_HASH_MEMO_SIZE = 4096
+
+
+class MergeCache:
+    """Maps a merge fingerprint to a PDF already produced in the merged directory.
+
+    The fingerprint is a hash over the ordered input file hashes and the merge
+    engine, so re-running a batch only re-merges the groups whose files
+    changed. Entries are checked against the file's size and mtime on lookup;
+    a merged PDF that was removed or replaced is simply a miss.
+
+    With max_bytes set (MERGED_MAX_MB), the least recently used PDFs in the
+    merged directory are deleted once it grows past that size; files that
+    predate the cache count by their mtime. Sizes come from one scan of the
+    directory, kept current by store/track afterwards, and hard links count
+    once. in_use returns the names that must not be deleted (outputs of jobs
+    not finished or not downloaded yet). Without max_bytes nothing is deleted.
+    """
+
+    def __init__(
+        self,
+        index_path: Path,
+        merged_dir: Path,
+        max_bytes: int | None = None,
+        on_evict=None,
+        in_use=None,
+    ):
+        if max_bytes is None:
+            try:
+                max_bytes = int(float(os.environ.get("MERGED_MAX_MB", "0")) * 1024 * 1024)
+            except ValueError:
+                max_bytes = 0
+        self._index_path = index_path
+        self._merged_dir = merged_dir
+        self._max_bytes = max(0, max_bytes)
+        self._on_evict = on_evict
+        self._in_use = in_use
+        self._entries: dict[str, dict] | None = None
+        # name -> [last used, inode] and inode -> [size, names]; None until
+        # the first scan.
+        self._files: dict[str, list] | None = None
+        self._inodes: dict[int, list] = {}
+        self._total = 0
+        self._hashes: dict[str, tuple[int, int, str]] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evicted = 0
+        self._lock = threading.Lock()
+
+    def key(self, sources: list, engine: str) -> str:
+        digest = hashlib.sha256(f"v{MERGE_CACHE_VERSION}:{engine}".encode())
+        for source in sources:
+            digest.update(b"\0" + self._source_hash(Path(source)).encode())
+        return digest.hexdigest()
+
+    def lookup(self, key: str) -> Path | None:
+        with self._lock:
+            entries = self._index()
+            entry = entries.get(key)
+            path = self._merged_dir / entry["name"] if entry else None
+            if path is None or not self._matches(path, entry):
+                if entry:
+                    del entries[key]
+                    self._save()
+                self._misses += 1
+                return None
+            # Persisted with the next store; a restart only loses recency.
+            entry["lastUsed"] = time.time()
+            if self._files is not None and path.name in self._files:
+                self._files[path.name][0] = entry["lastUsed"]
+            self._hits += 1
+            return path
+
+    def store(self, key: str, path: Path) -> None:
+        try:
+            stat = path.stat()
+        except OSError:
+            return
+        with self._lock:
+            self._index()[key] = {
+                "name": path.name,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "lastUsed": time.time(),
+            }
+            if self._max_bytes:
+                self._ledger()
+                self._add_file(path, time.time())
+                self._evict(keep=path.name)
+            self._save()
+
+    def track(self, path: Path) -> None:
+        """Count a new name for an output, such as the hard link of a cache hit, as just used."""
+        if not self._max_bytes:
+            return
+        with self._lock:
+            self._ledger()
+            self._add_file(path, time.time())
+            self._evict(keep=path.name)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._index()),
+                "hits": self._hits,
+                "misses": self._misses,
+                "evicted": self._evicted,
+                "maxBytes": self._max_bytes,
+            }
+
+    def _source_hash(self, path: Path) -> str:
+        # Stored uploads are hashed once per (size, mtime); spooled request
+        # files get a fresh path every time and are simply hashed.
+        stat = path.stat()
+        with self._lock:
+            cached = self._hashes.get(str(path))
+        if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached[2]
+        digest = file_sha256(path)
+        with self._lock:
+            if len(self._hashes) >= SOURCE_HASH_MEMO_SIZE:
+                self._hashes.clear()
+            self._hashes[str(path)] = (stat.st_size, stat.st_mtime_ns, digest)
+        return digest
+
+    def _matches(self, path: Path, entry: dict) -> bool:
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        return stat.st_size == entry.get("size") and stat.st_mtime_ns == entry.get("mtime_ns")
+
+    def _ledger(self) -> dict:
+        # Files the cache never stored (older outputs) rank by their mtime.
+        if self._files is None:
+            self._files = {}
+            used = {entry["name"]: entry["lastUsed"] for entry in self._index().values()}
+            for path in self._merged_dir.iterdir():
+                if path.is_file() and path.suffix.lower() == ".pdf":
+                    self._add_file(path, used.get(path.name))
+        return self._files
+
+    def _add_file(self, path: Path, last_used: float | None = None) -> None:
+        try:
+            stat = path.stat()
+        except OSError:
+            return
+        self._forget_file(path.name)
+        self._files[path.name] = [stat.st_mtime if last_used is None else last_used, stat.st_ino]
+        inode = self._inodes.setdefault(stat.st_ino, [stat.st_size, 0])
+        inode[1] += 1
+        if inode[1] == 1:
+            self._total += stat.st_size
+
+    def _forget_file(self, name: str) -> None:
+        entry = self._files.pop(name, None)
+        if entry is None:
+            return
+        inode = self._inodes[entry[1]]
+        inode[1] -= 1
+        if inode[1] == 0:
+            # The last name of a hard-linked file: its bytes are freed.
+            del self._inodes[entry[1]]
+            self._total -= inode[0]
+
+    def _evict(self, keep: str) -> None:
+        if self._total <= self._max_bytes:
+            return
+        protected = {keep, *(self._in_use() if self._in_use is not None else ())}
+        for name, _ in sorted(self._files.items(), key=lambda item: item[1][0]):
+            if self._total <= self._max_bytes:
+                break
+            if name in protected:
+                continue
+            path = self._merged_dir / name
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                # Deleted behind our back; it no longer counts.
+                self._forget_file(name)
+                continue
+            except OSError:
+                continue
+            self._forget_file(name)
+            self._evicted += 1
+            for key in [key for key, entry in self._entries.items() if entry["name"] == name]:
+                del self._entries[key]
+            if self._on_evict is not None:
+                self._on_evict(path)
+
+    def _index(self) -> dict:
+        if self._entries is None:
+            try:
+                data = json.loads(self._index_path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                data = {}
+            self._entries = data if isinstance(data, dict) else {}
+        return self._entries
+
+    def _save(self) -> None:
+        tmp_path = self._index_path.with_suffix(".json.tmp")
+        try:
+            self._index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(self._entries, ensure_ascii=False), encoding="utf-8")
+            tmp_path.replace(self._index_path)
+        except OSError:
+            pass
@@ -0,0 +1,391 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from pdf_merge import merge_to_file
+import worker_pool
+
+JOB_RETENTION_SECONDS = 24 * 60 * 60
+
+
+class MergeJobError(Exception):
+    pass
+
+
+@dataclass
+class MergeTask:
+    name: str
+    sources: list
+    target: Path
+    bl: str | None = None
+    engine: str = "pypdf"
+    cached: bool = False
+    # Upload names of the inputs when they are stored uploads, so the group
+    # can be run again from its batch record.
+    source_names: list | None = None
+    # Set when the group failed; a task created with an error is never run.
+    error: str | None = None
+    # The target was made by an earlier run of the same batch and is
+    # reported done as it is, without its sources being opened.
+    prebuilt: bool = False
+
+
+class MergeJob:
+    """A set of merge tasks run on the worker pool.
+
+    A job created with receiving=True is still being fed by its request:
+    tasks are appended with add_task as their files arrive and close() marks
+    the end, so the first groups merge while later ones are still uploading.
+
+    With isolate_failures, a group whose merge fails is marked failed with
+    its error and the other groups carry on; the job still ends "done".
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        tasks: list[MergeTask],
+        download_name: str,
+        cleanup_dirs=(),
+        receiving: bool = False,
+        on_cleanup=None,
+        isolate_failures: bool = False,
+        batch_id: str | None = None,
+    ):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.batch_id = batch_id or (self.id if kind == "batch" else None)
+        self.isolate_failures = isolate_failures
+        self.tasks = tasks
+        self.download_name = download_name
+        self.status = "queued"
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.group_status = ["queued"] * len(tasks)
+        self.receiving = receiving
+        # Set once the outputs have been sent; until then MERGED_MAX_MB
+        # eviction leaves them alone.
+        self.downloaded = False
+        self._abort_error = None
+        self._cleanup_dirs = list(cleanup_dirs)
+        self._on_cleanup = on_cleanup
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def to_dict(self) -> dict:
+        with self._cond:
+            groups = [
+                {
+                    "name": task.name,
+                    "status": status,
+                    "output": task.target.name if status == "done" else None,
+                    "cached": task.cached,
+                    "error": task.error,
+                }
+                for task, status in zip(self.tasks, self.group_status)
+            ]
+            return {
+                "id": self.id,
+                "batchId": self.batch_id,
+                "type": self.kind,
+                "status": self.status,
+                "error": self.error,
+                "total": len(self.tasks),
+                "receiving": self.receiving,
+                "completed": sum(1 for status in self.group_status if status == "done"),
+                "failed": sum(1 for status in self.group_status if status == "failed"),
+                "groups": groups,
+                "downloadName": self.download_name,
+                "createdAt": self.created_at,
+                "finishedAt": self.finished_at,
+            }
+
+    def wait(self, timeout: float | None = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self.finished, timeout)
+
+    def outputs(self) -> list[Path]:
+        with self._cond:
+            return [
+                task.target
+                for task, status in zip(self.tasks, self.group_status)
+                if status == "done"
+            ]
+
+    def failures(self) -> list[MergeTask]:
+        with self._cond:
+            return [task for task, status in zip(self.tasks, self.group_status) if status == "failed"]
+
+    def iter_outputs(self):
+        # Yields outputs in task order as soon as each one is ready, independent of
+        # the order in which the worker pool finishes them. Failed groups are
+        # skipped when failures are isolated.
+        index = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: (index < len(self.tasks) and self.group_status[index] in ("done", "failed"))
+                    or self.status == "failed"
+                    or (self.finished and index >= len(self.tasks))
+                )
+                if index >= len(self.tasks):
+                    if self.status == "done":
+                        return
+                    raise MergeJobError(self.error or "merge failed")
+                status = self.group_status[index]
+                if status != "done" and not (status == "failed" and self.isolate_failures):
+                    raise MergeJobError(self.error or "merge failed")
+                target = self.tasks[index].target if status == "done" else None
+            index += 1
+            if target is not None:
+                yield target
+
+    def add_task(self, task: MergeTask) -> None:
+        with self._cond:
+            if not self.receiving:
+                raise MergeJobError("job is no longer receiving tasks")
+            self.tasks.append(task)
+            self.group_status.append("queued")
+            self._cond.notify_all()
+
+    def close(self, error: str | None = None) -> None:
+        """Stop receiving tasks; with an error the job fails instead of finishing."""
+        with self._cond:
+            if not self.receiving:
+                return
+            self.receiving = False
+            self._abort_error = error
+            self._cond.notify_all()
+            finished = self.finished
+        if finished:
+            # The run already ended (a merge failed) and left cleanup to us.
+            self._cleanup()
+
+    def _notify(self, *_) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+    def _set_group(self, index: int, status: str, error: str | None = None) -> None:
+        with self._cond:
+            self.group_status[index] = status
+            if error is not None:
+                self.tasks[index].error = error
+            self._cond.notify_all()
+
+    def _set_status(self, status: str, error: str | None = None) -> None:
+        with self._cond:
+            self.status = status
+            self.error = error
+            if self.finished:
+                self.finished_at = time.time()
+            self._cond.notify_all()
+
+    def _cleanup(self) -> None:
+        with self._cond:
+            if self.receiving:
+                # The request is still spooling into these dirs; it cleans up
+                # through close() once it stops.
+                return
+            dirs, self._cleanup_dirs = self._cleanup_dirs, []
+            on_cleanup, self._on_cleanup = self._on_cleanup, None
+        for path in dirs:
+            shutil.rmtree(path, ignore_errors=True)
+        if on_cleanup is not None:
+            on_cleanup()
+
+
+def run_job(job: MergeJob, on_output=None, cache=None, on_finish=None) -> None:
+    job._set_status("running")
+    pending = {}
+    next_index = 0
+    max_pending = worker_pool.worker_count() * 2
+    try:
+        while True:
+            while len(pending) < max_pending:
+                with job._cond:
+                    if next_index >= len(job.tasks):
+                        break
+                    task = job.tasks[next_index]
+                index = next_index
+                next_index += 1
+                if task.error is not None:
+                    job._set_group(index, "failed")
+                    continue
+                if task.prebuilt:
+                    task.cached = True
+                    job._set_group(index, "done")
+                    _emit_output(on_output, task)
+                    continue
+                try:
+                    key = cache.key(task.sources, task.engine) if cache is not None else None
+                except OSError as exc:
+                    # An input vanished before the merge started.
+                    if not job.isolate_failures:
+                        raise
+                    job._set_group(index, "failed", _error_text(exc))
+                    continue
+                cached = cache.lookup(key) if key else None
+                if cached is not None and _reuse_output(cached, task.target):
+                    # Same inputs in the same order were merged before: that
+                    # file is linked under this task's name instead.
+                    cache.track(task.target)
+                    task.cached = True
+                    job._set_group(index, "done")
+                    _emit_output(on_output, task)
+                    continue
+                future = worker_pool.submit(merge_to_file, task.sources, str(task.target), task.engine)
+                pending[future] = (index, key)
+                job._set_group(index, "running")
+                future.add_done_callback(job._notify)
+            with job._cond:
+                # Sleep until a merge finishes, a task arrives or the request ends.
+                job._cond.wait_for(
+                    lambda: any(future.done() for future in pending)
+                    or job._abort_error is not None
+                    or (len(pending) < max_pending and next_index < len(job.tasks))
+                    or (not pending and not job.receiving)
+                )
+                if job._abort_error is not None:
+                    raise MergeJobError(job._abort_error)
+                if not pending and not job.receiving and next_index >= len(job.tasks):
+                    break
+            for future in [future for future in pending if future.done()]:
+                index, key = pending.pop(future)
+                try:
+                    future.result()
+                except Exception as exc:
+                    job._set_group(index, "failed", _error_text(exc))
+                    if job.isolate_failures:
+                        continue
+                    raise
+                if key:
+                    cache.store(key, job.tasks[index].target)
+                job._set_group(index, "done")
+                _emit_output(on_output, job.tasks[index])
+        job._set_status("done")
+    except Exception as exc:
+        for future in pending:
+            future.cancel()
+        job._set_status("failed", _error_text(exc))
+    finally:
+        if on_finish is not None:
+            try:
+                on_finish(job)
+            except Exception:
+                pass
+        job._cleanup()
+
+
+def _reuse_output(cached: Path, target: Path) -> bool:
+    # A hard link costs no space or copy time; filesystems without them get
+    # a copy. On failure the task is simply merged again.
+    if cached == target:
+        return True
+    try:
+        os.link(cached, target)
+    except FileExistsError:
+        return False
+    except OSError:
+        try:
+            shutil.copyfile(cached, target)
+        except OSError:
+            return False
+    return True
+
+
+def _error_text(exc: Exception) -> str:
+    return str(exc) or exc.__class__.__name__
+
+
+def _emit_output(on_output, task: MergeTask) -> None:
+    if on_output is None:
+        return
+    try:
+        on_output(task)
+    except Exception:
+        pass
+
+
+class JobManager:
+    def __init__(
+        self,
+        runners: int | None = None,
+        retention: float = JOB_RETENTION_SECONDS,
+        on_output=None,
+        cache=None,
+        on_finish=None,
+    ):
+        if runners is None:
+            try:
+                runners = int(os.environ.get("JOB_RUNNERS", "2"))
+            except ValueError:
+                runners = 2
+        self._executor = ThreadPoolExecutor(max_workers=max(1, runners), thread_name_prefix="merge-job")
+        self._retention = retention
+        self._on_output = on_output
+        self._cache = cache
+        self._on_finish = on_finish
+        self._jobs: dict[str, MergeJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        kind: str,
+        tasks: list[MergeTask],
+        download_name: str,
+        cleanup_dirs=(),
+        receiving: bool = False,
+        on_cleanup=None,
+        isolate_failures: bool = False,
+        batch_id: str | None = None,
+    ) -> MergeJob:
+        job = MergeJob(
+            kind, tasks, download_name, cleanup_dirs, receiving, on_cleanup, isolate_failures, batch_id
+        )
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        args = (job, self._on_output, self._cache, self._on_finish)
+        if receiving:
+            # A job still fed by its request mostly waits for the upload, so it
+            # gets its own thread instead of holding one of the JOB_RUNNERS
+            # for the whole body. Request threads and UPLOAD_INFLIGHT_MB
+            # bound how many exist; their merges share the worker pool.
+            threading.Thread(target=run_job, args=args, name=f"merge-job-{job.id[:8]}", daemon=True).start()
+        else:
+            self._executor.submit(run_job, *args)
+        return job
+
+    def get(self, job_id: str) -> MergeJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def outputs_in_use(self) -> set[str]:
+        # Output names of jobs still running or not downloaded yet.
+        with self._lock:
+            jobs = list(self._jobs.values())
+        names = set()
+        for job in jobs:
+            with job._cond:
+                if not job.finished or not job.downloaded:
+                    names.update(task.target.name for task in job.tasks)
+        return names
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self._retention
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,199 @@
+from pathlib import Path
+from typing import NamedTuple
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import NEED_DATA, Epilogue, Field, File, MultipartDecoder
+
+READ_SIZE = 64 * 1024
+
+
+class FormField(NamedTuple):
+    name: str
+    value: str
+
+
+class FilePart:
+    """One file of a multipart body, readable like a stream while it arrives.
+
+    Must be consumed before the reader moves on; whatever is left unread is
+    skipped when the next part is requested.
+    """
+
+    def __init__(self, reader: "MultipartReader", name: str, filename: str):
+        self.name = name
+        self.filename = filename
+        self._reader = reader
+        self._buffer = b""
+        self._more = True
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = [self._buffer]
+        have = len(self._buffer)
+        while self._more and (size < 0 or have < size):
+            event = self._reader._next_event()
+            chunks.append(event.data)
+            have += len(event.data)
+            self._more = event.more_data
+        data = b"".join(chunks)
+        if 0 <= size < len(data):
+            data, self._buffer = data[:size], data[size:]
+        else:
+            self._buffer = b""
+        return data
+
+    def _skip(self) -> None:
+        self._buffer = b""
+        while self._more:
+            self._more = self._reader._next_event().more_data
+
+
+class MultipartReader:
+    """Pull parser over a multipart/form-data request body.
+
+    Unlike request.files, nothing is buffered or spooled up front: iterating
+    yields FormField and FilePart objects in body order while the body is
+    read in READ_SIZE chunks, so a caller can act on the first files before
+    the last ones have been sent.
+    """
+
+    def __init__(
+        self,
+        stream,
+        content_type: str,
+        max_form_memory_size: int | None = None,
+        max_parts: int | None = None,
+    ):
+        mimetype, options = parse_options_header(content_type)
+        boundary = options.get("boundary", "").encode("latin-1")
+        if mimetype != "multipart/form-data" or not boundary:
+            raise ValueError("not a multipart/form-data body")
+        self._stream = stream
+        self._decoder = MultipartDecoder(boundary, max_form_memory_size, max_parts=max_parts)
+        self._max_field = max_form_memory_size
+        self._eof = False
+
+    def __iter__(self):
+        current = None
+        while True:
+            if current is not None:
+                current._skip()
+                current = None
+            event = self._next_event()
+            if isinstance(event, Field):
+                yield FormField(event.name, self._field_value(event))
+            elif isinstance(event, File):
+                current = FilePart(self, event.name, event.filename)
+                yield current
+            elif isinstance(event, Epilogue):
+                return
+
+    def _field_value(self, field: Field) -> str:
+        chunks = []
+        size = 0
+        while True:
+            event = self._next_event()
+            size += len(event.data)
+            if self._max_field is not None and size > self._max_field:
+                raise RequestEntityTooLarge()
+            chunks.append(event.data)
+            if not event.more_data:
+                break
+        _, options = parse_options_header(field.headers.get("content-type", ""))
+        return b"".join(chunks).decode(options.get("charset", "utf-8"), "replace")
+
+    def _next_event(self):
+        while True:
+            event = self._decoder.next_event()
+            if event is not NEED_DATA:
+                return event
+            if self._eof:
+                raise ValueError("multipart body ended early")
+            chunk = self._stream.read(READ_SIZE)
+            if chunk:
+                self._decoder.receive_data(chunk)
+            else:
+                self._eof = True
+                self._decoder.receive_data(None)
+
+
+class InflightBudget:
+    """Caps the request bytes being received or waiting to be merged at once.
+
+    A request reserves its Content-Length before its body is read and gives
+    it back once its spooled files are gone. Requests that do not fit wait
+    for others to finish; one request larger than the whole budget is still
+    admitted when nothing else is in flight.
+    """
+
+    def __init__(self, max_bytes: int | None = None, wait_seconds: float = 60):
+        if max_bytes is None:
+            try:
+                max_bytes = int(float(os.environ.get("UPLOAD_INFLIGHT_MB", "1024")) * 1024 * 1024)
+            except ValueError:
+                max_bytes = 1024 * 1024 * 1024
+        self._max_bytes = max(0, max_bytes)
+        self._wait_seconds = wait_seconds
+        self._used = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+
+    def reserve(self, size: int | None):
+        """Return a release callable, or None if the budget stayed full too long."""
+        size = max(0, size or 0)
+        if not self._max_bytes:
+            return lambda: None
+        with self._cond:
+            self._waiting += 1
+            try:
+                admitted = self._cond.wait_for(
+                    lambda: self._used == 0 or self._used + size <= self._max_bytes,
+                    self._wait_seconds,
+                )
+            finally:
+                self._waiting -= 1
+            if not admitted:
+                return None
+            self._used += size
+        held = [size]
+
+        def release():
+            with self._cond:
+                self._used -= held.pop() if held else 0
+                self._cond.notify_all()
+
+        return release
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"maxBytes": self._max_bytes, "usedBytes": self._used, "waiting": self._waiting}
+
+
+class RequestSpool:
+    """Private temp dir for the file parts of one request.
+
+    Parts are written straight to disk as they are read, so the merge
+    workers get paths and nothing is copied a second time. The dir and the
+    budget reservation live until the job using them is cleaned up, or
+    until discard() when the request fails before a job exists.
+    """
+
+    def __init__(self, release):
+        self.dirs = [tempfile.mkdtemp(prefix="pdf_merge_")]
+        self.release = release
+
+    def add(self, part) -> Path:
+        target = Path(self.dirs[0]) / f"{uuid.uuid4().hex}.pdf"
+        with target.open("wb") as f:
+            shutil.copyfileobj(part, f, READ_SIZE)
+        return target
+
+    def discard(self) -> None:
+        for path in self.dirs:
+            shutil.rmtree(path, ignore_errors=True)
+        self.release()
@@ -0,0 +1,106 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import NamedTuple
+import re
+
+CUSTOMS_WITH_HYPHEN = re.compile(r"(\d{5})-(\d{2})-(\d{6})M(?!\d)", re.I)
+CUSTOMS_PLAIN = re.compile(r"(\d{13})M(?!\d)", re.I)
+BL_PREFIX = re.compile(r"(?:^|[ _-])BL[ _-]?([A-Z0-9]{6,20})(?=$|[ _-])", re.I)
+PREFIX = re.compile(r"([A-Z]{2,3})[ _-]?")
+EXTENSION = re.compile(r"\.[^.]+$")
+TOKEN_SEPARATOR = re.compile(r"[ _-]+")
+HAS_ALPHA = re.compile(r"[A-Z]", re.I)
+HAS_DIGIT = re.compile(r"\d")
+ALL_DIGITS = re.compile(r"\d{6,20}")
+
+
+class FileNameInfo(NamedTuple):
+    prefix: str
+    customs: str | None
+    bl: str | None
+
+
+def normalize_customs(digits: str) -> str:
+    return f"{digits[:5]}-{digits[5:7]}-{digits[7:13]}M"
+
+
+@lru_cache(maxsize=65536)
+def parse_filename(name: str) -> FileNameInfo:
+    """Classify an upload name into document prefix, customs number and BL.
+
+    Equivalent to the former separate extractors, but each name is scanned
+    once and the result is memoized: the same names are classified again
+    for every listing, group and merge.
+    """
+    trimmed = EXTENSION.sub("", name)
+
+    prefix_match = PREFIX.match(trimmed)
+    prefix = prefix_match.group(1) if prefix_match else "기타"
+
+    customs = None
+    match_hyphen = CUSTOMS_WITH_HYPHEN.search(name)
+    if match_hyphen:
+        customs = f"{match_hyphen[1]}-{match_hyphen[2]}-{match_hyphen[3]}M"
+    else:
+        match_plain = CUSTOMS_PLAIN.search(name)
+        if match_plain:
+            customs = normalize_customs(match_plain[1])
+
+    return FileNameInfo(prefix, customs, _parse_bl(trimmed))
+
+
+def _parse_bl(trimmed: str) -> str | None:
+    match = BL_PREFIX.search(trimmed)
+    if match:
+        return match.group(1).upper()
+    # Hyphenated numbers are removed before plain ones, exactly as two
+    # successive substitutions would.
+    cleaned = CUSTOMS_PLAIN.sub("", CUSTOMS_WITH_HYPHEN.sub("", trimmed))
+    best_alnum = None
+    best_numeric = None
+    for token in TOKEN_SEPARATOR.split(cleaned):
+        length = len(token)
+        if length < 6 or length > 20:
+            continue
+        if HAS_ALPHA.search(token):
+            if HAS_DIGIT.search(token) and (best_alnum is None or length > len(best_alnum)):
+                best_alnum = token
+        elif best_alnum is None and ALL_DIGITS.fullmatch(token):
+            if best_numeric is None or length > len(best_numeric):
+                best_numeric = token
+    if best_alnum is not None:
+        return best_alnum.upper()
+    return best_numeric
+
+
+def extract_customs(name: str) -> str | None:
+    return parse_filename(name).customs
+
+
+def extract_bl(name: str) -> str | None:
+    return parse_filename(name).bl
+
+
+def extract_prefix(name: str) -> str:
+    return parse_filename(name).prefix
+
+
+def timestamp() -> str:
+    return datetime.now().strftime("%y%m%d_%H%M%S")
+
+
+def safe_filename(name: str) -> str:
+    if not name:
+        return "merged"
+    cleaned = re.sub(r"[\\\\/:*?\"<>|]", "_", name)
+    return cleaned.strip() or "merged"
+
+
+def build_merged_name(customs: str, bl: str, timestamp: str) -> str:
+    safe_customs = safe_filename(customs).replace("-", "_")
+    return f"{safe_customs}_{timestamp}.pdf"
+
+
+def extract_merged_customs(name: str) -> str | None:
+    # Merged outputs spell the customs number with underscores (see build_merged_name).
+    return extract_customs(name.replace("_", "-"))
@@ -0,0 +1,281 @@
+from concurrent.futures import Future
+from pypdf import PdfReader
+from pathlib import Path
+import hashlib
+import json
+import queue
+import re
+import threading
+import time
+
+from file_hash import file_sha256
+
+FEE_SECTION_START = re.compile(r"소\s*계|소계")
+FEE_SECTION_END = re.compile(r"예\s*상\s*비\s*용|예상비용")
+IMPORTER_LINE = re.compile(r"(.+?)\s*귀하")
+
+# Bump whenever the parsing below changes so cached results are re-parsed.
+PARSER_VERSION = 1
+
+
+def _normalize_line(line: str) -> str:
+    return re.sub(r"\s+", " ", line).strip()
+
+def _normalize_fee_name(name: str) -> str:
+    if not name:
+        return name
+    name = re.sub(r"\s+", " ", name).strip()
+    # Collapse spaces between Hangul syllables: "검 역 료" -> "검역료"
+    name = re.sub(r"(?<=[가-힣])\s+(?=[가-힣])", "", name)
+    return name
+
+def _iter_pdf_lines(path: Path):
+    # Pages are extracted one at a time so callers can stop before the
+    # trailing pages of long statements are ever decoded.
+    reader = PdfReader(str(path))
+    for page in reader.pages:
+        for raw in (page.extract_text() or "").splitlines():
+            cleaned = _normalize_line(raw)
+            if cleaned:
+                yield cleaned
+
+def _extract_importer(lines: list[str]) -> str | None:
+    for line in lines:
+        match = IMPORTER_LINE.search(line)
+        if match:
+            return match.group(1).strip()
+    return None
+
+def _extract_fee_items(lines: list[str]) -> list[dict]:
+    start_idx = None
+    end_idx = None
+    for i, line in enumerate(lines):
+        if start_idx is None and FEE_SECTION_START.search(line):
+            start_idx = i + 1
+            continue
+        if start_idx is not None and FEE_SECTION_END.search(line):
+            end_idx = i
+            break
+    if start_idx is None:
+        return []
+    if end_idx is None:
+        end_idx = len(lines)
+
+    items = []
+    for raw in lines[start_idx:end_idx]:
+        line = _normalize_line(raw)
+        if not line:
+            continue
+        if re.search(r"미\s*수\s*금", line):
+            continue
+        match = re.match(r"(.+?)\s+([0-9,]+)(.*)$", line)
+        if match:
+            name = _normalize_fee_name(match.group(1))
+            amount = match.group(2).strip()
+            vendor = re.sub(r"\s+", "", match.group(3))
+            item = {"name": name, "amount": amount}
+            if vendor:
+                item["vendor"] = vendor
+            items.append(item)
+        else:
+            items.append({"raw": line})
+    return items
+
+def extract_pc_info(path: Path) -> dict:
+    lines = []
+    importer_found = False
+    in_fee_section = False
+    for line in _iter_pdf_lines(path):
+        lines.append(line)
+        if not importer_found and IMPORTER_LINE.search(line):
+            importer_found = True
+        if not in_fee_section:
+            in_fee_section = bool(FEE_SECTION_START.search(line))
+        elif importer_found and FEE_SECTION_END.search(line):
+            # Everything _extract_importer and _extract_fee_items look at has
+            # been seen; later pages cannot change the result.
+            break
+    return {
+        "importer": _extract_importer(lines),
+        "fees": _extract_fee_items(lines),
+    }
+
+
+class PcInfoCache:
+    """On-disk cache of extract_pc_info results, one JSON entry per upload name.
+
+    An entry is reused while the file size and mtime match; if only the mtime
+    changed, the content hash decides. Entries from another PARSER_VERSION are
+    ignored.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self._dir = cache_dir
+        self._memory: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, path: Path) -> dict:
+        info = self.lookup(path)
+        if info is None:
+            info = extract_pc_info(path)
+            self.put(path, info)
+        return info
+
+    def lookup(self, path: Path) -> dict | None:
+        stat = path.stat()
+        entry = self._lookup(path.name)
+        if not entry or entry.get("version") != PARSER_VERSION or entry.get("size") != stat.st_size:
+            return None
+        if entry.get("mtime_ns") == stat.st_mtime_ns:
+            return entry["info"]
+        if file_sha256(path) != entry.get("sha256"):
+            return None
+        self._store(path.name, {**entry, "mtime_ns": stat.st_mtime_ns})
+        return entry["info"]
+
+    def put(self, path: Path, info: dict) -> None:
+        stat = path.stat()
+        self._store(
+            path.name,
+            {
+                "name": path.name,
+                "version": PARSER_VERSION,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": file_sha256(path),
+                "info": info,
+            },
+        )
+
+    def discard(self, name: str) -> None:
+        with self._lock:
+            self._memory.pop(name, None)
+            try:
+                self._entry_path(name).unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            for path in self._dir.glob("*.json"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def _entry_path(self, name: str) -> Path:
+        return self._dir / f"{hashlib.sha1(name.encode('utf-8')).hexdigest()}.json"
+
+    def _lookup(self, name: str) -> dict | None:
+        with self._lock:
+            entry = self._memory.get(name)
+            if entry is not None:
+                return entry
+            try:
+                entry = json.loads(self._entry_path(name).read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                return None
+            if not isinstance(entry, dict) or entry.get("name") != name:
+                return None
+            self._memory[name] = entry
+            return entry
+
+    def _store(self, name: str, entry: dict) -> None:
+        target = self._entry_path(name)
+        tmp_path = target.with_suffix(".json.tmp")
+        with self._lock:
+            self._memory[name] = entry
+            try:
+                tmp_path.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+                tmp_path.replace(target)
+            except OSError:
+                pass
+
+
+class PcInfoPrefetcher:
+    """Fills a PcInfoCache in the background for freshly uploaded statements.
+
+    Parsing itself runs through submit_parse (normally the worker pool), so
+    the prefetch thread only waits and never competes with request threads
+    for the GIL.
+    """
+
+    def __init__(self, cache: PcInfoCache, submit_parse):
+        self._cache = cache
+        self._submit_parse = submit_parse
+        self._queue: queue.Queue = queue.Queue()
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._parsed = 0
+        self._hits = 0
+        self._failed = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+        self._last_seconds = None
+
+    def enqueue(self, path: Path) -> None:
+        with self._lock:
+            if path.name in self._inflight:
+                return
+            self._inflight[path.name] = Future()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="pc-info-prefetch", daemon=True)
+                self._thread.start()
+        self._queue.put(path)
+
+    def wait(self, name: str, timeout: float | None = None) -> None:
+        with self._lock:
+            future = self._inflight.get(name)
+        if future is None:
+            return
+        try:
+            future.exception(timeout=timeout)
+        except Exception:
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queueDepth": self._queue.qsize(),
+                "inflight": len(self._inflight),
+                "parsed": self._parsed,
+                "cacheHits": self._hits,
+                "failed": self._failed,
+                "lastSeconds": self._last_seconds,
+                "avgSeconds": self._total_seconds / self._parsed if self._parsed else None,
+                "maxSeconds": self._max_seconds,
+            }
+
+    def _run(self) -> None:
+        while True:
+            path = self._queue.get()
+            started = time.perf_counter()
+            outcome = "failed"
+            try:
+                if self._cache.lookup(path) is not None:
+                    outcome = "hit"
+                else:
+                    info = self._submit_parse(path).result()
+                    self._cache.put(path, info)
+                    outcome = "parsed"
+            except Exception:
+                pass
+            self._finish(path.name, outcome, time.perf_counter() - started)
+
+    def _finish(self, name: str, outcome: str, elapsed: float) -> None:
+        with self._lock:
+            if outcome == "parsed":
+                self._parsed += 1
+                self._total_seconds += elapsed
+                self._max_seconds = max(self._max_seconds, elapsed)
+                self._last_seconds = elapsed
+            elif outcome == "hit":
+                self._hits += 1
+            else:
+                self._failed += 1
+            future = self._inflight.pop(name, None)
+        if future is not None:
+            future.set_result(None)
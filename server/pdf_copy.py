@@ -0,0 +1,343 @@
+from hashlib import sha1
+from pathlib import Path
+import io
+import re
+
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject
+
+# Merge engine that copies every object reachable from the input pages as raw
+# bytes. Only object numbers in "N G R" references are rewritten; strings,
+# fonts and stream data are never parsed or re-encoded, and identical objects
+# (the same font program or letterhead image in several inputs) are written
+# once. pypdf is only used to read the xref tables and the page list.
+
+OBJECT_HEADER = re.compile(rb"[\x00\t\n\x0c\r ]*(\d+)[\x00\t\n\x0c\r ]+(\d+)[\x00\t\n\x0c\r ]+obj")
+TOKEN = re.compile(
+    rb"[\x00\t\n\x0c\r ]+"
+    rb"|%[^\r\n]*"
+    rb"|<<|>>"
+    rb"|<[^<>]*>"
+    rb"|[\[\]{}]"
+    rb"|/[^\x00\t\n\x0c\r ()<>\[\]{}/%]*"
+    rb"|\("
+    rb"|[^\x00\t\n\x0c\r ()<>\[\]{}/%]+"
+)
+STRING_SPECIAL = re.compile(rb"[\\()]")
+STREAM_LENGTH = re.compile(rb"/Length[\x00\t\n\x0c\r ]+(\d+)(?:[\x00\t\n\x0c\r ]+(\d+)[\x00\t\n\x0c\r ]+R)?")
+ENDSTREAM = re.compile(rb"(?:\r\n|\n|\r)?endstream")
+# Annotations and form widgets must stay one object per page, so objects
+# with a /Rect entry are never merged even when their bytes match.
+ANNOTATION = re.compile(rb"/Rect[\x00\t\n\x0c\r \[]")
+# Page attributes not carried over, as in PdfWriter.add_page.
+EXCLUDED_PAGE_KEYS = ("/Parent", "/StructParents")
+
+
+class CopyUnsupported(Exception):
+    pass
+
+
+def copy_merge_to_file(sources: list, target: str) -> str:
+    inputs = [_Input(_read_source(source)) for source in sources]
+    copier = _Copier(inputs)
+    page_count = copier.write(target)
+    # A structurally wrong result must never reach the user; callers fall
+    # back to the pypdf engine on any exception.
+    if len(PdfReader(target).pages) != page_count:
+        raise CopyUnsupported("merged page count mismatch")
+    return target
+
+
+def _read_source(source) -> bytes:
+    if isinstance(source, (str, Path)):
+        return Path(source).read_bytes()
+    if isinstance(source, bytes):
+        return source
+    source.seek(0)
+    return source.read()
+
+
+class _Input:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.reader = PdfReader(io.BytesIO(data))
+        if self.reader.is_encrypted:
+            raise CopyUnsupported("encrypted input")
+        self._object_streams: dict[int, dict[int, bytes]] = {}
+
+    def raw_object(self, num: int, gen: int):
+        """Return (body, stream_data) for an object, or None if it is missing."""
+        location = self.reader.xref_objStm.get(num)
+        if location is not None:
+            return self._from_object_stream(num, location[0]), None
+        offset = self.reader.xref.get(gen, {}).get(num)
+        if offset is None:
+            return None
+        header = OBJECT_HEADER.match(self.data, offset)
+        if not header or int(header[1]) != num:
+            raise CopyUnsupported(f"bad xref offset for object {num}")
+        body_end, stop = _scan(self.data, header.end(), len(self.data))[1:]
+        if stop == b"endobj":
+            return self.data[header.end():body_end], None
+        if stop != b"stream":
+            raise CopyUnsupported(f"unterminated object {num}")
+        body = self.data[header.end():body_end]
+        return body, self._stream_data(body, body_end + len(b"stream"))
+
+    def _stream_data(self, body: bytes, pos: int) -> bytes:
+        if self.data.startswith(b"\r\n", pos):
+            pos += 2
+        elif self.data[pos:pos + 1] in (b"\n", b"\r"):
+            pos += 1
+        length = self._stream_length(body)
+        if length is not None:
+            end = pos + length
+            if ENDSTREAM.match(self.data, end):
+                return self.data[pos:end]
+        # Wrong or missing /Length: cut at the endstream keyword instead.
+        match = ENDSTREAM.search(self.data, pos)
+        if not match:
+            raise CopyUnsupported("stream without endstream")
+        return self.data[pos:match.start()]
+
+    def _stream_length(self, body: bytes) -> int | None:
+        match = STREAM_LENGTH.search(body)
+        if not match:
+            return None
+        if match[2] is None:
+            return int(match[1])
+        raw = self.raw_object(int(match[1]), int(match[2]))
+        try:
+            return int(raw[0].strip()) if raw else None
+        except ValueError:
+            return None
+
+    def _from_object_stream(self, num: int, stream_num: int) -> bytes:
+        objects = self._object_streams.get(stream_num)
+        if objects is None:
+            stream = self.reader.get_object(stream_num)
+            data = stream.get_data()
+            first = int(stream["/First"])
+            header = data[:first].split()
+            pairs = sorted((int(header[i + 1]), int(header[i])) for i in range(0, len(header) - 1, 2))
+            objects = {}
+            for index, (offset, obj_num) in enumerate(pairs):
+                end = pairs[index + 1][0] if index + 1 < len(pairs) else len(data) - first
+                objects[obj_num] = data[first + offset:first + end]
+            self._object_streams[stream_num] = objects
+        if num not in objects:
+            raise CopyUnsupported(f"object {num} missing from object stream {stream_num}")
+        return objects[num]
+
+
+def _scan(data: bytes, pos: int, end: int):
+    """Tokenize one object body.
+
+    Returns (refs, stop_pos, stop_keyword): refs are (start, end, num, gen)
+    spans of indirect references, and scanning stops before a top-level
+    "stream" or "endobj" keyword (stop_keyword is None at end of data).
+    """
+    refs = []
+    ints: list[tuple[int, int]] = []
+    while pos < end:
+        match = TOKEN.match(data, pos, end)
+        if not match:
+            raise CopyUnsupported("unreadable object")
+        token = match[0]
+        first = token[:1]
+        if first in b"\x00\t\n\x0c\r %":
+            pos = match.end()
+            continue
+        if token == b"(":
+            pos = _skip_string(data, match.end(), end)
+            ints.clear()
+            continue
+        if token.isdigit():
+            ints.append((match.start(), int(token)))
+            del ints[:-2]
+        elif token == b"R" and len(ints) == 2:
+            refs.append((ints[0][0], match.end(), ints[0][1], ints[1][1]))
+            ints.clear()
+        elif token in (b"stream", b"endobj"):
+            return refs, match.start(), token
+        else:
+            ints.clear()
+        pos = match.end()
+    return refs, end, None
+
+
+def _skip_string(data: bytes, pos: int, end: int) -> int:
+    depth = 1
+    while depth:
+        match = STRING_SPECIAL.search(data, pos, end)
+        if not match:
+            raise CopyUnsupported("unterminated string")
+        char = match[0]
+        if char == b"\\":
+            pos = match.end() + 1
+            continue
+        depth += 1 if char == b"(" else -1
+        pos = match.end()
+    return pos
+
+
+class _Copier:
+    CATALOG = 1
+    PAGES = 2
+
+    def __init__(self, inputs: list[_Input]):
+        self._inputs = inputs
+        self._objects: list[bytes | None] = [None, None]
+        self._numbers: dict[tuple, int] = {}
+        self._pages: set[tuple] = set()
+        self._done: set[tuple] = set()
+        self._by_digest: dict[bytes, int] = {}
+
+    def write(self, target: str) -> int:
+        pages = []
+        for src, source in enumerate(self._inputs):
+            for page in source.reader.pages:
+                ref = page.indirect_reference
+                key = (src, ref.idnum, ref.generation)
+                if key in self._pages:
+                    # A page listed twice still becomes two output pages.
+                    key = key + (len(pages),)
+                self._numbers[key] = self._reserve()
+                self._pages.add(key)
+                pages.append((key, page))
+        for key, page in pages:
+            self._copy_page(key, page)
+
+        kids = b" ".join(b"%d 0 R" % self._numbers[key] for key, _ in pages)
+        self._objects[self.CATALOG - 1] = b"<</Type/Catalog/Pages %d 0 R>>" % self.PAGES
+        self._objects[self.PAGES - 1] = b"<</Type/Pages/Kids[%s]/Count %d>>" % (kids, len(pages))
+
+        version = max((source.reader.pdf_header for source in self._inputs), default="%PDF-1.4")
+        with open(target, "wb") as f:
+            offset = f.write(version.encode() + b"\n%\xe2\xe3\xcf\xd3\n")
+            offsets = []
+            for num, body in enumerate(self._objects, 1):
+                offsets.append(offset)
+                offset += f.write(b"%d 0 obj\n" % num)
+                offset += f.write(body)
+                offset += f.write(b"\nendobj\n")
+            f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1))
+            f.write(b"".join(b"%010d 00000 n \n" % value for value in offsets))
+            f.write(
+                b"trailer\n<</Size %d/Root %d 0 R>>\nstartxref\n%d\n%%%%EOF\n"
+                % (len(offsets) + 1, self.CATALOG, offset)
+            )
+        return len(pages)
+
+    def _reserve(self) -> int:
+        self._objects.append(None)
+        return len(self._objects)
+
+    def _copy_page(self, key: tuple, page) -> None:
+        out = bytearray(b"<<")
+        refs = []
+        for name, value in page.items():
+            if name in EXCLUDED_PAGE_KEYS:
+                continue
+            _serialize(name, key[0], out, refs)
+            out += b" "
+            _serialize(value, key[0], out, refs)
+        out += b"/Parent %d 0 R>>" % self.PAGES
+        self._copy_tree(key, (bytes(out), refs, None))
+
+    def _copy_tree(self, root: tuple, root_node) -> None:
+        # Iterative post-order walk: an object's bytes are final only once its
+        # children have output numbers, and that lets identical subtrees from
+        # different inputs hash to the same object.
+        stack = [(root, root_node, 0)]
+        while stack:
+            key, node, index = stack.pop()
+            refs = node[1]
+            while index < len(refs):
+                child = refs[index][2]
+                index += 1
+                if child in self._done or child in self._pages:
+                    # Pages are rebuilt by _copy_page; references to them
+                    # (annotation /P, link destinations) use their reserved number.
+                    continue
+                if any(entry[0] == child for entry in stack) or child == key:
+                    # Reference cycle: the child keeps whatever number it gets
+                    # now. Reserve only once; an unused slot would be written
+                    # as an empty object.
+                    if child not in self._numbers:
+                        self._numbers[child] = self._reserve()
+                    continue
+                stack.append((key, node, index))
+                stack.append((child, self._load(child), 0))
+                break
+            else:
+                self._finish(key, node)
+
+    def _load(self, key: tuple):
+        src, num, gen = key[:3]
+        raw = self._inputs[src].raw_object(num, gen)
+        if raw is None:
+            return b"null", [], None
+        body, stream = raw
+        refs = [
+            (start, end, (src, ref_num, ref_gen))
+            for start, end, ref_num, ref_gen in _scan(body, 0, len(body))[0]
+        ]
+        return body, refs, stream
+
+    def _finish(self, key: tuple, node) -> None:
+        body, refs, stream = node
+        parts = []
+        pos = 0
+        for start, end, child in refs:
+            parts.append(body[pos:start])
+            parts.append(b"%d 0 R" % self._numbers[child])
+            pos = end
+        parts.append(body[pos:])
+        if stream is not None:
+            parts.append(b"stream\n")
+            parts.append(stream)
+            parts.append(b"\nendstream")
+        data = b"".join(parts)
+        self._done.add(key)
+        number = self._numbers.get(key)
+        if number is not None:
+            self._objects[number - 1] = data
+            return
+        if ANNOTATION.search(body):
+            number = self._reserve()
+            self._objects[number - 1] = data
+            self._numbers[key] = number
+            return
+        digest = sha1(data).digest()
+        number = self._by_digest.get(digest)
+        if number is None:
+            number = self._reserve()
+            self._objects[number - 1] = data
+            self._by_digest[digest] = number
+        self._numbers[key] = number
+
+
+def _serialize(obj, src: int, out: bytearray, refs: list) -> None:
+    if isinstance(obj, IndirectObject):
+        start = len(out)
+        out += b"0 0 R"
+        refs.append((start, len(out), (src, obj.idnum, obj.generation)))
+    elif isinstance(obj, DictionaryObject):
+        out += b"<<"
+        for name, value in obj.items():
+            _serialize(name, src, out, refs)
+            out += b" "
+            _serialize(value, src, out, refs)
+        out += b">>"
+    elif isinstance(obj, ArrayObject):
+        out += b"["
+        for index, value in enumerate(obj):
+            if index:
+                out += b" "
+            _serialize(value, src, out, refs)
+        out += b"]"
+    else:
+        buffer = io.BytesIO()
+        obj.write_to_stream(buffer)
+        out += buffer.getvalue()
@@ -0,0 +1,213 @@
+from pathlib import Path
+import json
+import queue
+import re
+import threading
+import time
+
+from pypdf import PdfReader
+from pypdf.errors import FileNotDecryptedError
+
+# Bump when inspect_pdf changes so stored results are re-inspected.
+INSPECT_VERSION = 1
+HEADER_VERSION = re.compile(rb"%PDF-(\d+\.\d+)")
+# Changes are written out at most this often, so a burst of inspections
+# costs a few saves instead of one full rewrite per file.
+SAVE_INTERVAL_SECONDS = 2.0
+
+
+def inspect_pdf(path: Path) -> dict:
+    """Page count, PDF version, encryption and readability of one file.
+
+    Runs in a worker process. "error" is "encrypted" for files that need a
+    password to open (an empty user password is tried, as merging does)
+    and "unreadable" when pypdf cannot parse the file at all.
+    """
+    path = Path(path)
+    with path.open("rb") as f:
+        match = HEADER_VERSION.search(f.read(1024))
+    info = {
+        "size": path.stat().st_size,
+        "pages": None,
+        "version": match.group(1).decode("ascii") if match else None,
+        "encrypted": False,
+        "error": None,
+        "detail": None,
+    }
+    try:
+        reader = PdfReader(str(path))
+        info["encrypted"] = reader.is_encrypted
+        info["pages"] = len(reader.pages)
+        # A /Version in the document catalog overrides the header.
+        catalog_version = reader.trailer["/Root"].get("/Version")
+        if catalog_version:
+            info["version"] = str(catalog_version).lstrip("/")
+    except FileNotDecryptedError as exc:
+        info["error"] = "encrypted"
+        info["detail"] = str(exc)
+    except Exception as exc:
+        info["error"] = "unreadable"
+        info["detail"] = f"{type(exc).__name__}: {exc}"[:200]
+    return info
+
+
+class PdfInfoIndex:
+    """inspect_pdf results for uploads, keyed by file sha256 and kept in one JSON file.
+
+    Files are inspected in the background as they are uploaded (or first
+    listed), through submit_inspect (normally the worker pool), so nothing
+    on a request thread parses PDFs. Keying by content means a re-uploaded
+    copy is known immediately and a changed file is never described by the
+    old result. Files queued without a digest are hashed with digest_of on
+    the background thread as well.
+
+    The same thread writes the JSON file, at most every SAVE_INTERVAL_SECONDS
+    and outside the lock that get() takes.
+    """
+
+    def __init__(self, index_path: Path, submit_inspect, digest_of=None):
+        self._index_path = index_path
+        self._submit_inspect = submit_inspect
+        self._digest_of = digest_of
+        self._entries: dict[str, dict] | None = None
+        self._queue: queue.Queue = queue.Queue()
+        self._inflight: set[str] = set()
+        self._thread = None
+        self._inspected = 0
+        self._failed = 0
+        self._dirty = False
+        self._saved_at = 0.0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    def get(self, digest: str | None) -> dict | None:
+        if not digest:
+            return None
+        with self._lock:
+            entry = self._index().get(digest)
+        if not isinstance(entry, dict) or entry.get("inspector") != INSPECT_VERSION:
+            return None
+        return entry.get("info")
+
+    def enqueue(self, path: Path, digest: str | None = None) -> None:
+        if digest is None and self._digest_of is None:
+            return
+        if self.get(digest) is not None:
+            return
+        # Not hashed yet: the file is tracked by path until _run hashes it.
+        key = digest or str(path)
+        with self._lock:
+            if key in self._inflight:
+                return
+            self._inflight.add(key)
+            self._ensure_thread()
+        self._queue.put((path, digest, key))
+
+    def discard(self, digest: str) -> None:
+        with self._lock:
+            if self._index().pop(digest, None) is None:
+                return
+            self._dirty = True
+            self._ensure_thread()
+        # Wakes the thread so the removal is saved.
+        self._queue.put(None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+            self._dirty = True
+            self._ensure_thread()
+        self._queue.put(None)
+
+    def flush(self) -> None:
+        """Write pending changes now."""
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                # A shallow copy: entries are never changed once stored.
+                entries = dict(self._index())
+                self._dirty = False
+                self._saved_at = time.monotonic()
+            self._save(entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._index()
+            return {
+                "entries": len(entries),
+                "invalid": sum(1 for entry in entries.values() if (entry.get("info") or {}).get("error")),
+                "queueDepth": self._queue.qsize(),
+                "inflight": len(self._inflight),
+                "inspected": self._inspected,
+                "failed": self._failed,
+            }
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="pdf-info", daemon=True)
+            self._thread.start()
+
+    def _save_delay(self) -> float | None:
+        with self._lock:
+            if not self._dirty:
+                return None
+            return max(0.0, self._saved_at + SAVE_INTERVAL_SECONDS - time.monotonic())
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=self._save_delay())
+            except queue.Empty:
+                item = None
+            if item is None:
+                if self._save_delay() == 0:
+                    self.flush()
+                continue
+            path, digest, key = item
+            info = None
+            if digest is None:
+                try:
+                    digest = self._digest_of(path)
+                except Exception:
+                    pass
+            if digest is not None and self.get(digest) is not None:
+                # A copy of a file that is already indexed.
+                with self._lock:
+                    self._inflight.discard(key)
+                continue
+            try:
+                if digest is not None:
+                    info = self._submit_inspect(path).result()
+            except Exception:
+                # The file vanished or the worker died; it is simply not
+                # indexed, and a later upload or listing queues it again.
+                pass
+            with self._lock:
+                if info is None:
+                    self._failed += 1
+                else:
+                    self._inspected += 1
+                    self._index()[digest] = {"inspector": INSPECT_VERSION, "info": info}
+                    self._dirty = True
+                self._inflight.discard(key)
+            if self._save_delay() == 0:
+                self.flush()
+
+    def _index(self) -> dict:
+        if self._entries is None:
+            try:
+                data = json.loads(self._index_path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                data = {}
+            self._entries = data if isinstance(data, dict) else {}
+        return self._entries
+
+    def _save(self, entries: dict) -> None:
+        tmp_path = self._index_path.with_suffix(".json.tmp")
+        try:
+            self._index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(entries, ensure_ascii=False), encoding="utf-8")
+            tmp_path.replace(self._index_path)
+        except OSError:
+            pass
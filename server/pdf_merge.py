@@ -0,0 +1,86 @@
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import IndirectObject, NullObject, StreamObject
+from hashlib import sha256
+from pathlib import Path
+import io
+
+from pdf_copy import copy_merge_to_file
+
+# "pypdf" rebuilds every page through PdfWriter.add_page; "copy" copies the
+# page objects byte for byte (see pdf_copy.py) and falls back to pypdf for
+# inputs it cannot handle.
+MERGE_ENGINES = ("pypdf", "copy")
+
+
+def open_reader(source) -> PdfReader:
+    if isinstance(source, (str, Path)):
+        return PdfReader(str(source))
+    if isinstance(source, bytes):
+        return PdfReader(io.BytesIO(source))
+    source.seek(0)
+    return PdfReader(source)
+
+
+def merge_to_file(sources: list, target: str, engine: str = "pypdf") -> str:
+    # Runs inside a worker process: sources must be paths or raw bytes.
+    if engine == "copy":
+        try:
+            return copy_merge_to_file(sources, target)
+        except Exception:
+            pass
+    writer = PdfWriter()
+    for source in sources:
+        reader = open_reader(source)
+        for page in reader.pages:
+            writer.add_page(page)
+    dedupe_streams(writer)
+    with open(target, "wb") as f:
+        writer.write(f)
+    return target
+
+
+def dedupe_streams(writer: PdfWriter) -> int:
+    """Keep one copy of each identical stream object (fonts, logos, stamps).
+
+    add_page clones every input separately, so a font embedded in all four
+    documents of a group would otherwise be written four times. Runs until
+    nothing changes, because merging an /SMask or ICC profile can make the
+    images that use it identical as well. Returns the number of streams
+    dropped; their slots become null objects so object numbers stay valid.
+    """
+    objects = writer._objects
+    dropped = 0
+    while True:
+        canonical: dict[bytes, int] = {}
+        remap: dict[int, int] = {}
+        for index, obj in enumerate(objects):
+            if not isinstance(obj, StreamObject):
+                continue
+            idnum = index + 1
+            first = canonical.setdefault(sha256(obj.hash_value_data()).digest(), idnum)
+            if first != idnum:
+                remap[idnum] = first
+        if not remap:
+            return dropped
+        for obj in objects:
+            _remap_references(obj, remap, writer)
+        for idnum in remap:
+            objects[idnum - 1] = NullObject()
+        dropped += len(remap)
+
+
+def _remap_references(obj, remap: dict[int, int], writer: PdfWriter) -> None:
+    # DictionaryObject/ArrayObject subclass dict/list; checking the builtins
+    # avoids pypdf's Protocol-based isinstance, which dominated this walk.
+    if isinstance(obj, dict):
+        items = obj.items()
+    elif isinstance(obj, list):
+        items = enumerate(obj)
+    else:
+        return
+    for key, value in list(items):
+        if type(value) is IndirectObject:
+            if value.pdf is writer and value.idnum in remap:
+                obj[key] = IndirectObject(remap[value.idnum], 0, writer)
+        elif isinstance(value, (dict, list)):
+            _remap_references(value, remap, writer)
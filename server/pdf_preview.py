@@ -0,0 +1,136 @@
+from concurrent.futures import TimeoutError as FutureTimeout
+from pathlib import Path
+import os
+import threading
+
+from pypdf import PdfReader, PdfWriter
+
+# Bump when build_preview output changes so older derivatives are rebuilt.
+PREVIEW_VERSION = 1
+# A derivative must be at most this fraction of the original to be kept.
+# Pages that share their fonts and images with the rest of the file (typical
+# for generated statements, unlike scans) barely shrink.
+MAX_PREVIEW_RATIO = 0.75
+
+
+def build_preview(source: str, target: str, pages: int) -> int:
+    """Write the first `pages` pages of source to target and return its page count.
+
+    Nothing is written when the source has no more pages than that, or when
+    the cut-down file would not be much smaller; the original is then its
+    own preview.
+    """
+    reader = PdfReader(source)
+    if reader.is_encrypted:
+        reader.decrypt("")
+    total = len(reader.pages)
+    if total <= pages:
+        return total
+    writer = PdfWriter()
+    for index in range(pages):
+        # Only what these pages reference is copied, so the scans of the
+        # remaining pages never reach the derivative.
+        writer.add_page(reader.pages[index])
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        writer.write(f)
+    if os.path.getsize(tmp_path) > os.path.getsize(source) * MAX_PREVIEW_RATIO:
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, target)
+    return total
+
+
+class PreviewCache:
+    """Content-addressed store of upload previews (the first PREVIEW_PAGES pages).
+
+    Previews are keyed by the source's sha256, so a file re-uploaded under
+    another name reuses its preview and a changed file never gets a stale
+    one. Builds run through submit_build (normally the worker pool) and
+    concurrent requests for the same file share one build. A marker file
+    remembers sources that are shown as they are.
+    """
+
+    def __init__(self, cache_dir: Path, submit_build, pages: int | None = None, wait_seconds: float = 10):
+        if pages is None:
+            try:
+                pages = int(os.environ.get("PREVIEW_PAGES", "2"))
+            except ValueError:
+                pages = 2
+        self._dir = cache_dir
+        self._submit = submit_build
+        self._pages = max(0, pages)
+        self._wait_seconds = wait_seconds
+        self._building: dict = {}
+        self._hits = 0
+        self._builds = 0
+        self._lock = threading.Lock()
+        self._dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, source: Path, digest: str) -> Path | None:
+        """Return the file to show for source.
+
+        That is the preview, source itself when it serves as its own preview,
+        or None when no preview could be had right now.
+        """
+        if not self._pages:
+            return source
+        target = self._dir / f"{digest}-v{PREVIEW_VERSION}-p{self._pages}.pdf"
+        marker = target.with_suffix(".full")
+        if target.exists():
+            with self._lock:
+                self._hits += 1
+            return target
+        if marker.exists():
+            return source
+        with self._lock:
+            future = self._building.get(target.name)
+            started = future is None
+            if started:
+                future = self._submit(build_preview, str(source), str(target), self._pages)
+                self._building[target.name] = future
+                self._builds += 1
+        if started:
+            future.add_done_callback(lambda _: self._finished(target.name))
+        try:
+            future.result(timeout=self._wait_seconds)
+        except FutureTimeout:
+            # Still building; this request shows the original and the
+            # next one gets the preview.
+            return None
+        except Exception:
+            return None
+        if target.exists():
+            return target
+        try:
+            marker.touch()
+        except OSError:
+            pass
+        return source
+
+    def discard(self, digest: str) -> None:
+        for path in self._dir.glob(f"{digest}-*"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        for path in self._dir.iterdir():
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pages": self._pages,
+                "hits": self._hits,
+                "builds": self._builds,
+                "building": len(self._building),
+            }
+
+    def _finished(self, name: str) -> None:
+        with self._lock:
+            self._building.pop(name, None)
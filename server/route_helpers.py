@@ -0,0 +1,60 @@
+from flask import Response, current_app, jsonify, request, stream_with_context
+
+from multipart_stream import MultipartReader, RequestSpool
+from services import inflight_budget
+from zip_stream import ZIP_STRATEGIES, iter_zip
+
+# Request and response helpers shared by the routes in app.py and the route
+# modules.
+
+
+def open_request_spool():
+    # The request's Content-Length counts against UPLOAD_INFLIGHT_MB until
+    # the files spooled from it have been merged.
+    release = inflight_budget.reserve(request.content_length)
+    if release is None:
+        return None, inflight_busy()
+    return RequestSpool(release), None
+
+
+def inflight_busy():
+    return jsonify({"error": "처리 중인 업로드가 많습니다. 잠시 후 다시 시도해주세요."}), 503
+
+
+def multipart_parts():
+    # Reads request.stream directly; request.files/request.form must not be
+    # touched on these routes or werkzeug would buffer the whole body first.
+    try:
+        return MultipartReader(
+            request.stream,
+            request.content_type or "",
+            current_app.config["MAX_FORM_MEMORY_SIZE"],
+            request.max_form_parts,
+        )
+    except ValueError:
+        return ()
+
+
+def zip_response(members, download_name: str, error_message: str):
+    strategy = current_app.config["ZIP_STRATEGY"]
+    if strategy not in ZIP_STRATEGIES:
+        strategy = "store"
+    chunks = iter_zip(members, strategy)
+    # Produce the first member before committing to a 200 so that an early
+    # failure can still be reported as a JSON error.
+    try:
+        first = next(chunks)
+    except Exception:
+        chunks.close()
+        return jsonify({"error": error_message}), 500
+
+    def generate():
+        try:
+            yield first
+            yield from chunks
+        finally:
+            chunks.close()
+
+    response = Response(stream_with_context(generate()), mimetype="application/zip")
+    response.headers.set("Content-Disposition", "attachment", filename=download_name)
+    return response
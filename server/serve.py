@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import os
+import sys
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+import app as app_module
+
+# Production entry point: python server/serve.py
+#
+# Runs the app on werkzeug's HTTP server (the only one bundled in wheels/)
+# with a fixed pool of request threads instead of app.run's thread per
+# connection. Everything stays in one process because merge jobs, the merge
+# cache and the catalogs live in memory; merges themselves already run in
+# the job runner threads and the worker process pool (JOB_RUNNERS,
+# MERGE_WORKERS), never on a request thread.
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """werkzeug's WSGI server with at most `threads` requests in progress.
+
+    Further connections wait in the queue instead of each starting a new
+    thread, and a client that stops sending or reading for `timeout`
+    seconds is dropped, so stalled connections cannot pile up threads.
+    """
+
+    multithread = True
+
+    def __init__(self, host: str, port: int, app, threads: int, timeout: float):
+        # werkzeug closes every connection after one response, so the socket
+        # timeout only has to cover a client that stalls mid-request.
+        handler = type("TimedRequestHandler", (WSGIRequestHandler,), {"timeout": timeout})
+        super().__init__(host, port, app, handler)
+        self.threads = threads
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="http")
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the PDF merge server with a pool of request threads.")
+    parser.add_argument("--host", default=os.environ.get("SERVER_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=_env_number("SERVER_PORT", 3100))
+    parser.add_argument(
+        "--threads", type=int, default=_env_number("SERVER_THREADS", 32), help="Concurrent requests (SERVER_THREADS)"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=_env_number("SERVER_TIMEOUT", 120.0, float),
+        help="Seconds a request may stall while being read or written (SERVER_TIMEOUT)",
+    )
+    args = parser.parse_args()
+
+    app_module.prepare_server()
+    server = PooledWSGIServer(
+        args.host, args.port, app_module.app, max(1, args.threads), args.timeout
+    )
+    print(
+        f"Serving on http://{args.host}:{args.port} with {server.threads} request threads",
+        file=sys.stderr,
+        flush=True,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
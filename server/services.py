@@ -0,0 +1,118 @@
+from pathlib import Path
+import os
+
+from batch_store import BatchStore
+from file_catalog import FileCatalog
+from merge_cache import MergeCache
+from merge_jobs import JobManager, MergeJob
+from multipart_stream import InflightBudget
+from naming import extract_merged_customs, parse_filename
+from pdf_info import PdfInfoIndex, inspect_pdf
+from pdf_preview import PreviewCache
+from pc_info import PcInfoCache, PcInfoPrefetcher, extract_pc_info
+from settings_store import SettingsStore
+from upload_store import UploadStore
+import worker_pool
+
+# Directories and the long-lived objects shared by app.py and the route
+# modules (listing_routes, job_routes, settings_routes).
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+# Uploads, merged PDFs, caches and settings; the app folder unless DATA_DIR is set.
+DATA_DIR = Path(os.environ.get("DATA_DIR") or ROOT_DIR).resolve()
+UPLOAD_DIR = DATA_DIR / "uploads"
+MERGED_DIR = DATA_DIR / "merged"
+CACHE_DIR = DATA_DIR / "cache"
+SETTINGS_FILE = DATA_DIR / "settings.json"
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+MERGED_DIR.mkdir(parents=True, exist_ok=True)
+
+DEFAULT_SETTINGS = {
+    "prefixOrder": [
+        {"prefix": "JS", "documentName": "정산서"},
+        {"prefix": "NB", "documentName": "납부영수증"},
+        {"prefix": "VT", "documentName": "수입세금계산서"},
+        {"prefix": "IMP", "documentName": "수입신고필증"},
+    ],
+    "customsOnlyFirst": True,
+    "completedGroups": {},
+    "feeOrderMap": {},
+    "feeHiddenMap": {},
+    "feeManualMap": {},
+    "feeOverrideMap": {},
+    "listOrderMap": {},
+    "feeAttachmentMap": {},
+}
+settings_store = SettingsStore(SETTINGS_FILE, DEFAULT_SETTINGS)
+
+upload_catalog = FileCatalog(
+    UPLOAD_DIR,
+    lambda name: parse_filename(name)._asdict(),
+)
+upload_store = UploadStore(UPLOAD_DIR, upload_catalog, lambda name: parse_filename(name)._asdict())
+merged_catalog = FileCatalog(MERGED_DIR, lambda name: {"customs": extract_merged_customs(name)})
+merge_cache = MergeCache(
+    CACHE_DIR / "merge_index.json",
+    MERGED_DIR,
+    on_evict=lambda path: merged_catalog.remove(path.name),
+    in_use=lambda: job_manager.outputs_in_use(),
+)
+batch_store = BatchStore(CACHE_DIR / "batches")
+
+
+def record_batch(job: MergeJob) -> None:
+    if job.kind != "batch":
+        return
+    record = job.to_dict()
+    for group, task in zip(record["groups"], job.tasks):
+        group["names"] = task.source_names
+    record["resumable"] = bool(job.tasks) and all(task.source_names is not None for task in job.tasks)
+    batch_store.save(record)
+
+
+job_manager = JobManager(
+    on_output=lambda task: merged_catalog.add(task.target, bl=task.bl),
+    cache=merge_cache,
+    on_finish=record_batch,
+)
+inflight_budget = InflightBudget()
+pc_info_cache = PcInfoCache(CACHE_DIR / "pc_info")
+pc_info_prefetcher = PcInfoPrefetcher(
+    pc_info_cache, lambda path: worker_pool.submit(extract_pc_info, path)
+)
+preview_cache = PreviewCache(CACHE_DIR / "preview", worker_pool.submit)
+pdf_info_index = PdfInfoIndex(
+    CACHE_DIR / "pdf_info.json",
+    lambda path: worker_pool.submit(inspect_pdf, path),
+    digest_of=lambda path: upload_catalog.digest(path.name),
+)
+
+
+def resolve_upload(name: str) -> Path | None:
+    target = (UPLOAD_DIR / name).resolve()
+    if UPLOAD_DIR not in target.parents or not target.exists() or not target.is_file():
+        return None
+    return target
+
+
+def resolve_upload_sources(names) -> tuple[list[tuple[str, Path]], list[str]]:
+    sources = []
+    missing = []
+    for name in names:
+        target = resolve_upload(name) if isinstance(name, str) and name else None
+        if target is None:
+            missing.append(name)
+            continue
+        sources.append((target.name, target))
+    return sources, missing
+
+
+def known_invalid_uploads(sources) -> list[dict]:
+    # Uploads the index already found unreadable or password protected are
+    # refused before any worker opens them. Files not inspected yet pass.
+    invalid = []
+    for name, path in sources:
+        info = pdf_info_index.get(upload_catalog.digest(path.name))
+        if info and info.get("error"):
+            invalid.append({"name": name, "error": info["error"]})
+    return invalid
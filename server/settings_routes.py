@@ -0,0 +1,56 @@
+from flask import Blueprint, Response, jsonify, request
+
+from services import settings_store
+from settings_store import SettingsConflict, SettingsError
+
+bp = Blueprint("settings", __name__)
+
+
+@bp.get("/settings")
+def get_settings():
+    body, etag = settings_store.read()
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
+@bp.post("/settings")
+def update_settings():
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "요청 형식이 올바르지 않습니다."}), 400
+    try:
+        settings, etag = settings_store.replace(data, _settings_precondition())
+    except SettingsConflict:
+        return _settings_conflict()
+    response = jsonify(settings)
+    response.set_etag(etag)
+    return response
+
+
+@bp.patch("/settings")
+def patch_settings():
+    try:
+        etag = settings_store.patch(request.get_json(silent=True), _settings_precondition())
+    except SettingsError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except SettingsConflict:
+        return _settings_conflict()
+    response = jsonify({"status": "ok"})
+    response.set_etag(etag)
+    return response
+
+
+def _settings_precondition():
+    # If-Match makes a write conditional on the settings the client last saw.
+    if not request.if_match:
+        return None
+    return lambda etag: request.if_match.contains(etag)
+
+
+def _settings_conflict():
+    response = jsonify({"error": "다른 사용자가 설정을 먼저 변경했습니다. 다시 불러온 뒤 저장하세요."})
+    response.status_code = 412
+    response.set_etag(settings_store.etag)
+    return response
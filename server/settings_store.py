@@ -0,0 +1,224 @@
+from pathlib import Path
+import copy
+import json
+import threading
+
+# The journal is folded back into the snapshot once it grows past this size,
+# so startup replay stays short.
+JOURNAL_COMPACT_BYTES = 256 * 1024
+# Key of the write counter in the snapshot and in every journal line.
+REVISION_KEY = "_revision"
+
+
+class SettingsError(ValueError):
+    pass
+
+
+class SettingsConflict(Exception):
+    pass
+
+
+class SettingsStore:
+    """settings.json plus an append-only journal of per-key deltas.
+
+    A delta maps a setting to either a replacement value (lists, booleans) or,
+    for the dict-valued maps, to {key: value} entries that replace single
+    entries, with null removing one. Only the delta is written per change;
+    the full snapshot is rewritten on compaction and on a full replace.
+
+    The parsed settings stay in memory and are reloaded only when either file
+    changes on disk. The ETag combines a revision counter, bumped by every
+    write and saved with it, with the files' stat, so it changes on every
+    write even within one filesystem timestamp tick, and also when another
+    process or a hand edit touches the files.
+    """
+
+    def __init__(self, path: Path, defaults: dict, compact_bytes: int = JOURNAL_COMPACT_BYTES):
+        self._path = path
+        self._journal_path = path.with_suffix(".journal")
+        self._defaults = defaults
+        self._compact_bytes = compact_bytes
+        self._settings: dict | None = None
+        self._revision = 0
+        self._state = None
+        self._body: bytes | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def etag(self) -> str:
+        with self._lock:
+            self._current()
+            return self._etag()
+
+    def read(self) -> tuple[bytes, str]:
+        """Return the serialized settings and their ETag."""
+        with self._lock:
+            settings = self._current()
+            if self._body is None:
+                self._body = json.dumps(settings, ensure_ascii=False).encode("utf-8")
+            return self._body, self._etag()
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return copy.deepcopy(self._current())
+
+    def get(self, key: str):
+        with self._lock:
+            return copy.deepcopy(self._current()[key])
+
+    def replace(self, data: dict, precondition=None) -> tuple[dict, str]:
+        """Overwrite every known setting present in data (the POST semantics).
+
+        precondition, if given, is called with the current ETag under the lock;
+        SettingsConflict is raised when it returns False.
+        """
+        with self._lock:
+            settings = self._current()
+            self._check(precondition)
+            for key, value in data.items():
+                if self._valid(key, value):
+                    settings[key] = copy.deepcopy(value)
+            self._revision += 1
+            self._compact()
+            self._written()
+            return copy.deepcopy(settings), self._etag()
+
+    def patch(self, delta: dict, precondition=None) -> str:
+        changes = self._validated(delta)
+        with self._lock:
+            settings = self._current()
+            self._check(precondition)
+            if not changes:
+                return self._etag()
+            self._revision += 1
+            line = json.dumps({**changes, REVISION_KEY: self._revision}, ensure_ascii=False) + "\n"
+            with self._journal_path.open("a", encoding="utf-8") as journal:
+                journal.write(line)
+            self._apply(settings, changes)
+            self._written()
+            if self._state[1] > self._compact_bytes:
+                self._compact()
+                self._written()
+            return self._etag()
+
+    def _check(self, precondition) -> None:
+        if precondition is not None and not precondition(self._etag()):
+            raise SettingsConflict(self._etag())
+
+    def _validated(self, delta) -> dict:
+        if not isinstance(delta, dict):
+            raise SettingsError("요청 형식이 올바르지 않습니다.")
+        changes = {}
+        for key, value in delta.items():
+            if key not in self._defaults:
+                continue
+            if isinstance(self._defaults[key], dict):
+                if not isinstance(value, dict):
+                    raise SettingsError(f"{key} 형식이 올바르지 않습니다.")
+            elif value is not None and not self._valid(key, value):
+                raise SettingsError(f"{key} 형식이 올바르지 않습니다.")
+            changes[key] = value
+        return changes
+
+    def _valid(self, key: str, value) -> bool:
+        return key in self._defaults and isinstance(value, type(self._defaults[key]))
+
+    def _apply(self, settings: dict, changes: dict) -> None:
+        for key, value in changes.items():
+            if isinstance(self._defaults[key], dict):
+                target = settings[key]
+                for entry_key, entry_value in value.items():
+                    if entry_value is None:
+                        target.pop(entry_key, None)
+                    else:
+                        target[entry_key] = entry_value
+            elif value is None:
+                settings[key] = copy.deepcopy(self._defaults[key])
+            else:
+                settings[key] = value
+
+    def _current(self) -> dict:
+        state = self._disk_state()
+        if self._settings is None or state != self._state:
+            # Only the first load folds a leftover journal into the snapshot;
+            # later reloads are reads caused by someone else's write.
+            previous = None if self._settings is None else self._revision
+            self._settings = self._load(compact=self._settings is None)
+            if previous is not None and self._revision <= previous:
+                # A hand edit without (or with an older) revision still
+                # counts as a new one.
+                self._revision = previous + 1
+            self._written()
+        return self._settings
+
+    def _written(self) -> None:
+        self._state = self._disk_state()
+        self._body = None
+
+    def _disk_state(self) -> tuple:
+        try:
+            snapshot = self._path.stat()
+            snapshot_state = (snapshot.st_mtime_ns, snapshot.st_size)
+        except OSError:
+            snapshot_state = (0, 0)
+        try:
+            journal_size = self._journal_path.stat().st_size
+        except OSError:
+            journal_size = 0
+        return snapshot_state, journal_size
+
+    def _etag(self) -> str:
+        (mtime_ns, size), journal_size = self._state
+        return f"{self._revision:x}-{mtime_ns:x}-{size:x}-{journal_size:x}"
+
+    def _load(self, compact: bool = True) -> dict:
+        settings = copy.deepcopy(self._defaults)
+        try:
+            data = json.loads(self._path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            data = None
+        revision = 0
+        if isinstance(data, dict):
+            revision = _revision_of(data, 0)
+            for key, value in data.items():
+                if self._valid(key, value):
+                    settings[key] = value
+        replayed = 0
+        try:
+            with self._journal_path.open(encoding="utf-8") as journal:
+                for line in journal:
+                    try:
+                        raw = json.loads(line)
+                        changes = self._validated(raw)
+                    except (json.JSONDecodeError, SettingsError):
+                        # A torn last line from a crash mid-append.
+                        continue
+                    self._apply(settings, changes)
+                    revision = _revision_of(raw, revision + 1)
+                    replayed += 1
+        except OSError:
+            pass
+        self._revision = revision
+        if replayed and compact:
+            self._settings = settings
+            self._compact()
+        return settings
+
+    def _compact(self) -> None:
+        # Replaying a journal over a snapshot that already contains it gives the
+        # same result, so a crash between these two steps loses nothing.
+        tmp_path = self._path.with_suffix(".json.tmp")
+        snapshot = {**self._settings, REVISION_KEY: self._revision}
+        tmp_path.write_text(json.dumps(snapshot, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(self._path)
+        try:
+            self._journal_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _revision_of(data: dict, default: int) -> int:
+    revision = data.get(REVISION_KEY)
+    if isinstance(revision, int) and not isinstance(revision, bool) and revision >= default:
+        return revision
+    return default
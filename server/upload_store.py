@@ -0,0 +1,83 @@
+from pathlib import Path
+from typing import NamedTuple
+import hashlib
+import os
+import threading
+import uuid
+
+from file_catalog import FileCatalog
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadResult(NamedTuple):
+    name: str
+    original: str
+    duplicate: bool
+    size: int
+    sha256: str
+
+
+class UploadStore:
+    """Writes uploads into the upload directory, deduplicating by content.
+
+    Each upload is copied to a temporary ".part" file in chunks while it is
+    hashed. A byte-identical upload that already exists is reused instead of
+    being stored again as "name (1).pdf", as long as its name classifies the
+    same way (prefix, customs number, BL): grouping and merge order come from
+    the name, so identical bytes under a different document name are kept.
+    Free names come from the catalog rather than probing the disk.
+    """
+
+    def __init__(self, directory: Path, catalog: FileCatalog, classify):
+        self._dir = directory
+        self._catalog = catalog
+        self._classify = classify
+        self._lock = threading.Lock()
+
+    def ingest(self, stream, filename: str | None) -> UploadResult:
+        original = Path(filename or "upload.pdf").name
+        part = self._dir / f".{uuid.uuid4().hex}.part"
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with part.open("wb") as f:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            sha256 = digest.hexdigest()
+            fields = self._classify(original)
+            with self._lock:
+                existing = self._catalog.find_by_content(
+                    size,
+                    sha256,
+                    lambda entry: all(getattr(entry, key) == value for key, value in fields.items()),
+                )
+                if existing is not None:
+                    return UploadResult(existing.name, original, True, size, sha256)
+                target = self._claim(part, original)
+            self._catalog.add(target, sha256=sha256)
+            return UploadResult(target.name, original, False, size, sha256)
+        finally:
+            part.unlink(missing_ok=True)
+
+    def _claim(self, part: Path, original: str) -> Path:
+        self._catalog.refresh()
+        taken = set()
+        while True:
+            target = self._dir / self._catalog.unique_name(original, taken)
+            # The index can miss a file copied in by hand a moment ago, so the
+            # final move still refuses to overwrite.
+            try:
+                if os.name == "nt":
+                    os.rename(part, target)
+                else:
+                    os.link(part, target)
+            except FileExistsError:
+                taken.add(target.name)
+                continue
+            return target
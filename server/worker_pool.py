@@ -0,0 +1,43 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import os
+import threading
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def worker_count() -> int:
+    raw = os.environ.get("MERGE_WORKERS", "")
+    try:
+        count = int(raw)
+    except ValueError:
+        count = 0
+    if count <= 0:
+        count = min(4, os.cpu_count() or 1)
+    return count
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=worker_count())
+        return _pool
+
+
+def submit(fn, *args):
+    try:
+        return get_pool().submit(fn, *args)
+    except BrokenProcessPool:
+        # A crashed worker poisons the executor; start a fresh one and retry once.
+        _reset_pool()
+        return get_pool().submit(fn, *args)
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,82 @@
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED, ZIP_STORED
+from pathlib import Path
+import time
+import zlib
+
+CHUNK_SIZE = 256 * 1024
+SAMPLE_SIZE = 64 * 1024
+# Deflate only pays off when the sample shrinks by at least this much.
+AUTO_DEFLATE_RATIO = 0.9
+ZIP_STRATEGIES = ("store", "deflate", "auto")
+
+
+class _ChunkSink:
+    # Write-only sink without tell()/seek(), so ZipFile falls back to data
+    # descriptors and never needs to rewind already-sent bytes.
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def choose_compression(path, strategy: str) -> int:
+    if strategy == "deflate":
+        return ZIP_DEFLATED
+    if strategy != "auto":
+        return ZIP_STORED
+    # Sample from the middle of the file: PDF headers and xref tables are
+    # plain text, while the bulk in between is usually already Flate data.
+    with open(path, "rb") as f:
+        f.seek(0, 2)
+        size = f.tell()
+        f.seek(max(0, size // 2 - SAMPLE_SIZE // 2))
+        sample = f.read(SAMPLE_SIZE)
+    if not sample:
+        return ZIP_STORED
+    ratio = len(zlib.compress(sample, 6)) / len(sample)
+    return ZIP_DEFLATED if ratio < AUTO_DEFLATE_RATIO else ZIP_STORED
+
+
+def iter_zip(members, strategy: str = "store"):
+    """Yield a ZIP archive chunk by chunk from (arcname, path) pairs.
+
+    Members are pulled lazily, so a slow producer (e.g. a merge) only delays
+    its own entry; everything before it has already been sent. A member
+    given as bytes instead of a path (a small generated report) is deflated.
+    """
+    sink = _ChunkSink()
+    with ZipFile(sink, "w", ZIP_STORED) as zip_file:
+        for arcname, path in members:
+            if isinstance(path, bytes):
+                info = ZipInfo(arcname, time.localtime()[:6])
+                info.compress_type = ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                with zip_file.open(info, "w") as dest:
+                    dest.write(path)
+                yield sink.drain()
+                continue
+            info = ZipInfo.from_file(Path(path), arcname=arcname)
+            info.compress_type = choose_compression(path, strategy)
+            with open(path, "rb") as src, zip_file.open(info, "w") as dest:
+                while True:
+                    chunk = src.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    dest.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
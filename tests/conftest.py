@@ -0,0 +1,45 @@
+from pathlib import Path
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+# The server modules import each other by plain name (python server/app.py),
+# and services.py keeps uploads, merged PDFs and caches under DATA_DIR, so
+# both must be set before any test module imports them.
+SERVER_DIR = Path(__file__).resolve().parents[1] / "server"
+DATA_DIR = Path(tempfile.mkdtemp(prefix="pdf_merge_tests_"))
+os.environ["DATA_DIR"] = str(DATA_DIR)
+os.environ.setdefault("MERGE_WORKERS", "2")
+os.environ.setdefault("PREVIEW_PAGES", "2")
+sys.path.insert(0, str(SERVER_DIR))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    import worker_pool
+
+    worker_pool.get_pool().shutdown(cancel_futures=True)
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def server():
+    """The shared server state (services.py), with empty upload and merged directories."""
+    import app as server_app
+    import services
+
+    for directory in (services.UPLOAD_DIR, services.MERGED_DIR):
+        for path in directory.iterdir():
+            if path.is_file():
+                path.unlink()
+    server_app.prepare_server()
+    return services
+
+
+@pytest.fixture
+def client(server):
+    import app as server_app
+
+    return server_app.app.test_client()
@@ -0,0 +1,52 @@
+from pathlib import Path
+import io
+import time
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import DecodedStreamObject, NameObject
+
+
+def pdf_bytes(pages: int = 1, label: str = "page", filler: int = 2000) -> bytes:
+    """A PDF whose pages each carry their own content stream of about filler bytes."""
+    writer = PdfWriter()
+    for index in range(pages):
+        page = writer.add_blank_page(width=200, height=200)
+        stream = DecodedStreamObject()
+        text = f"BT 20 100 Td ({label} {index}) Tj ET\n"
+        stream.set_data((text + f"% {label} {index} ".ljust(filler, "x") + "\n").encode("latin-1"))
+        page[NameObject("/Contents")] = writer._add_object(stream)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def write_pdf(path: Path, pages: int = 1, label: str | None = None) -> Path:
+    path.write_bytes(pdf_bytes(pages, label or path.stem))
+    return path
+
+
+def page_labels(data) -> list[str]:
+    """The "(label index)" text of every page, in order."""
+    reader = PdfReader(io.BytesIO(data) if isinstance(data, bytes) else str(data))
+    labels = []
+    for page in reader.pages:
+        content = page.get_contents().get_data().decode("latin-1")
+        labels.append(content[content.index("(") + 1 : content.index(")")])
+    return labels
+
+
+def wait_for_job(client, job_id: str, timeout: float = 30) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/jobs/{job_id}").get_json()
+        if job["status"] in ("done", "failed") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.02)
+
+
+def upload(client, files: dict) -> dict:
+    """POST /upload with {name: pdf bytes}; returns the JSON response."""
+    data = {"files": [(io.BytesIO(content), name) for name, content in files.items()]}
+    response = client.post("/upload", data=data, content_type="multipart/form-data")
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
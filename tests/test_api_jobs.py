@@ -0,0 +1,195 @@
+import io
+import json
+import time
+import zipfile
+
+from tests.helpers import page_labels, pdf_bytes, upload, wait_for_job
+
+CUSTOMS_A = "12345-24-000001M"
+CUSTOMS_B = "12345-24-000002M"
+
+
+def zip_members(data: bytes) -> dict:
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        return {name: archive.read(name) for name in archive.namelist()}
+
+
+def upload_groups(client) -> list[dict]:
+    upload(
+        client,
+        {
+            f"JS_{CUSTOMS_A}.pdf": pdf_bytes(1, "js a"),
+            f"NB_{CUSTOMS_A}.pdf": pdf_bytes(1, "nb a"),
+            f"JS_{CUSTOMS_B}.pdf": pdf_bytes(1, "js b"),
+            f"NB_{CUSTOMS_B}.pdf": pdf_bytes(1, "nb b"),
+        },
+    )
+    return [{"name": group["name"], "names": group["names"]} for group in client.get("/groups").get_json()["groups"]]
+
+
+def test_merge_by_name_returns_the_merged_pdf(client):
+    upload(client, {"a.pdf": pdf_bytes(2, "a"), "b.pdf": pdf_bytes(1, "b")})
+    response = client.post("/merge", json={"names": ["b.pdf", "a.pdf"]})
+    assert response.status_code == 200 and response.mimetype == "application/pdf"
+    assert page_labels(response.data) == ["b 0", "a 0", "a 1"]
+    assert len(client.get("/merged").get_json()["merged"]) == 1
+
+
+def test_merge_of_uploaded_files_with_engine_field(client):
+    data = {
+        "engine": "copy",
+        "files": [(io.BytesIO(pdf_bytes(1, "x")), "x.pdf"), (io.BytesIO(pdf_bytes(1, "y")), "y.pdf")],
+    }
+    response = client.post("/merge", data=data, content_type="multipart/form-data")
+    assert response.status_code == 200
+    assert page_labels(response.data) == ["x 0", "y 0"]
+
+
+def test_merge_request_errors(client):
+    upload(client, {"a.pdf": pdf_bytes(1, "a")})
+    assert client.post("/merge", json={"names": ["a.pdf"]}).status_code == 400
+    missing = client.post("/merge", json={"names": ["a.pdf", "gone.pdf"]})
+    assert missing.status_code == 404 and missing.get_json()["missing"] == ["gone.pdf"]
+    engine = client.post("/merge", json={"names": ["a.pdf", "a.pdf"], "engine": "nope"})
+    assert engine.status_code == 400
+
+
+def test_known_unreadable_upload_is_refused(client, server):
+    upload(client, {"a.pdf": pdf_bytes(1, "a"), "broken.pdf": b"%PDF-1.4 broken"})
+    digest = server.upload_catalog.digest("broken.pdf")
+    server.pdf_info_index.enqueue(server.UPLOAD_DIR / "broken.pdf", digest)
+    deadline = time.monotonic() + 10
+    while server.pdf_info_index.get(digest) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    response = client.post("/merge", json={"names": ["a.pdf", "broken.pdf"]})
+    assert response.status_code == 422
+    assert response.get_json()["invalid"] == [{"name": "broken.pdf", "error": "unreadable"}]
+
+
+def test_merge_job_is_polled_and_downloaded(client):
+    upload(client, {"a.pdf": pdf_bytes(1, "a"), "b.pdf": pdf_bytes(1, "b")})
+    created = client.post("/jobs/merge", json={"names": ["a.pdf", "b.pdf"]})
+    assert created.status_code == 202
+    job = wait_for_job(client, created.get_json()["id"])
+    assert job["status"] == "done" and job["completed"] == 1
+    download = client.get(f"/jobs/{job['id']}/download")
+    assert page_labels(download.data) == ["a 0", "b 0"]
+    assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_batch_zip_holds_one_pdf_per_group(client):
+    groups = upload_groups(client)
+    response = client.post("/merge-batch", json={"groups": groups})
+    assert response.status_code == 200 and response.mimetype == "application/zip"
+    members = zip_members(response.data)
+    assert len(members) == 2
+    assert sorted(page_labels(data)[0] for data in members.values()) == ["js a 0", "js b 0"]
+
+
+def test_batch_failure_is_reported_per_group_and_recorded(client):
+    groups = upload_groups(client)
+    upload(client, {f"VT_{CUSTOMS_B}.pdf": b"%PDF-1.4 broken"})
+    groups[1]["names"].append(f"VT_{CUSTOMS_B}.pdf")
+    created = client.post("/jobs/merge-batch", json={"groups": groups})
+    job = wait_for_job(client, created.get_json()["id"])
+    assert job["status"] == "done" and job["failed"] == 1
+    assert [group["status"] for group in job["groups"]] == ["done", "failed"]
+
+    members = zip_members(client.get(f"/jobs/{job['id']}/download").data)
+    report = members.pop("병합오류.txt").decode("utf-8-sig")
+    assert f"VT_{CUSTOMS_B}.pdf" in report
+    assert [page_labels(data)[0] for data in members.values()] == ["js a 0"]
+
+    record = client.get(f"/batches/{job['batchId']}").get_json()
+    assert record["resumable"] and record["groups"][1]["names"] == groups[1]["names"]
+
+
+def test_batch_is_run_again_by_id(client):
+    groups = upload_groups(client)
+    first = wait_for_job(client, client.post("/jobs/merge-batch", json={"groups": groups}).get_json()["id"])
+    again = client.post("/jobs/merge-batch", json={"batchId": first["batchId"]})
+    assert again.status_code == 202
+    job = wait_for_job(client, again.get_json()["id"])
+    assert job["batchId"] == first["batchId"] and job["completed"] == 2
+    assert all(group["cached"] for group in job["groups"])
+    assert client.post("/jobs/merge-batch", json={"batchId": "0" * 32}).status_code == 404
+    assert client.post("/jobs/merge-batch", json={"batchId": "not-an-id"}).status_code == 400
+
+
+def test_batch_rerun_keeps_done_groups_whose_uploads_were_deleted(client, server):
+    groups = upload_groups(client)
+    upload(client, {f"VT_{CUSTOMS_B}.pdf": b"%PDF-1.4 broken"})
+    groups[1]["names"].append(f"VT_{CUSTOMS_B}.pdf")
+    first = wait_for_job(client, client.post("/jobs/merge-batch", json={"groups": groups}).get_json()["id"])
+    assert [group["status"] for group in first["groups"]] == ["done", "failed"]
+    # The page deletes the uploads of the groups that merged.
+    client.post("/uploads/delete", json={"names": groups[0]["names"]})
+    (server.UPLOAD_DIR / f"VT_{CUSTOMS_B}.pdf").write_bytes(pdf_bytes(1, "vt b"))
+
+    again = client.post("/jobs/merge-batch", json={"batchId": first["batchId"]})
+    assert again.status_code == 202
+    job = wait_for_job(client, again.get_json()["id"])
+    assert [group["status"] for group in job["groups"]] == ["done", "done"]
+    assert job["groups"][0]["output"] == first["groups"][0]["output"] and job["groups"][0]["cached"]
+    assert not job["groups"][1]["cached"]
+    members = zip_members(client.get(f"/jobs/{job['id']}/download").data)
+    assert sorted(members) == sorted(group["output"] for group in job["groups"])
+    assert page_labels(members[job["groups"][1]["output"]]) == ["js b 0", "nb b 0", "vt b 0"]
+    record = client.get(f"/batches/{job['batchId']}").get_json()
+    assert record["resumable"] and record["groups"][0]["names"] == groups[0]["names"]
+
+
+def test_streamed_batch_uses_the_manifest(client):
+    manifest = {
+        "fileIds": ["1", "2", "3"],
+        "groups": [{"name": "G1", "fileIds": ["1", "2"]}, {"name": "G2", "fileIds": ["3"]}],
+    }
+    data = {
+        "manifest": json.dumps(manifest),
+        "files": [
+            (io.BytesIO(pdf_bytes(1, "one")), "one.pdf"),
+            (io.BytesIO(pdf_bytes(1, "two")), "two.pdf"),
+            (io.BytesIO(pdf_bytes(1, "three")), "three.pdf"),
+        ],
+    }
+    created = client.post("/jobs/merge-batch", data=data, content_type="multipart/form-data")
+    assert created.status_code == 202
+    job = wait_for_job(client, created.get_json()["id"])
+    assert job["status"] == "done" and [group["name"] for group in job["groups"]] == ["G1", "G2"]
+    members = zip_members(client.get(f"/jobs/{job['id']}/download").data)
+    assert sorted(page_labels(data) for data in members.values()) == [["one 0", "two 0"], ["three 0"]]
+    assert not client.get(f"/batches/{job['batchId']}").get_json()["resumable"]
+
+
+def test_merged_selection_is_downloaded_as_zip(client):
+    upload(client, {"a.pdf": pdf_bytes(1, "a"), "b.pdf": pdf_bytes(1, "b")})
+    client.post("/merge", json={"names": ["a.pdf", "b.pdf"]})
+    names = client.get("/merged").get_json()["merged"]
+    response = client.post("/merged/download", json={"names": names + ["../settings.json"]})
+    assert list(zip_members(response.data)) == names
+
+
+def test_groups_of_the_same_name_get_their_own_outputs(client):
+    upload(client, {"a.pdf": pdf_bytes(1, "a"), "b.pdf": pdf_bytes(1, "b")})
+    groups = [{"name": CUSTOMS_A, "names": ["a.pdf"]}, {"name": CUSTOMS_A, "names": ["b.pdf"]}]
+    job = wait_for_job(client, client.post("/jobs/merge-batch", json={"groups": groups}).get_json()["id"])
+    outputs = [group["output"] for group in job["groups"]]
+    assert len(set(outputs)) == 2
+    members = zip_members(client.get(f"/jobs/{job['id']}/download").data)
+    assert [page_labels(members[name]) for name in outputs] == [["a 0"], ["b 0"]]
+
+    merges = [client.post("/jobs/merge", json={"names": ["a.pdf", name]}).get_json() for name in ("a.pdf", "b.pdf")]
+    names = [wait_for_job(client, job["id"])["groups"][0]["output"] for job in merges]
+    assert len(set(names + outputs)) == 4
+
+
+def test_cached_groups_are_zipped_under_this_batch_s_names(client):
+    groups = upload_groups(client)
+    first = wait_for_job(client, client.post("/jobs/merge-batch", json={"groups": groups}).get_json()["id"])
+    renamed = [{"name": f"copy of {group['name']}", "names": group["names"]} for group in groups]
+    second = wait_for_job(client, client.post("/jobs/merge-batch", json={"groups": renamed}).get_json()["id"])
+    assert all(group["cached"] for group in second["groups"])
+    outputs = [group["output"] for group in second["groups"]]
+    assert all(output.startswith("copy of ") for output in outputs)
+    assert not set(outputs) & {group["output"] for group in first["groups"]}
+    assert list(zip_members(client.get(f"/jobs/{second['id']}/download").data)) == outputs
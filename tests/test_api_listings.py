@@ -0,0 +1,137 @@
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+import threading
+import time
+
+import file_catalog
+from tests.helpers import page_labels, pdf_bytes, upload, write_pdf
+
+CUSTOMS_A = "12345-24-000001M"
+CUSTOMS_B = "12345-24-000002M"
+
+
+def version_of(url: str) -> str:
+    return parse_qs(urlsplit(url).query)["v"][0]
+
+
+def test_upload_lists_files_with_versioned_urls(client):
+    saved = upload(client, {f"JS_{CUSTOMS_A}.pdf": pdf_bytes(1, "js"), f"NB_{CUSTOMS_A}.pdf": pdf_bytes(1, "nb")})
+    assert saved["new"] == [f"JS_{CUSTOMS_A}.pdf", f"NB_{CUSTOMS_A}.pdf"]
+
+    listing = client.get("/uploads").get_json()
+    assert listing["uploads"] == saved["new"] and listing["total"] == 2
+    item = listing["items"][0]
+    assert item["customs"] == CUSTOMS_A and item["url"].startswith(f"/uploads/JS_{CUSTOMS_A}.pdf?v=")
+    page = client.get("/uploads?offset=1&limit=1").get_json()
+    assert page["uploads"] == [f"NB_{CUSTOMS_A}.pdf"] and page["total"] == 2
+
+
+def test_identical_upload_is_reused(client):
+    content = pdf_bytes(1, "same")
+    upload(client, {f"JS_{CUSTOMS_A}.pdf": content})
+    again = upload(client, {f"JS_{CUSTOMS_A}.pdf": content})
+    assert again["duplicates"] == [f"JS_{CUSTOMS_A}.pdf"] and again["new"] == []
+
+
+def test_truncated_upload_keeps_none_of_its_files(client, server):
+    upload(client, {"kept.pdf": pdf_bytes(1, "kept")})
+    boundary = "----truncated"
+    parts = b""
+    for name, content in (("new.pdf", pdf_bytes(1, "new")), ("kept.pdf", pdf_bytes(1, "kept"))):
+        parts += (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="files"; filename="{name}"\r\n'
+            "Content-Type: application/pdf\r\n\r\n"
+        ).encode() + content + b"\r\n"
+    # The body ends in the middle of a third file.
+    body = parts + f'--{boundary}\r\nContent-Disposition: form-data; name="files"; filename="cut.pdf"\r\n\r\n'.encode()
+    body += b"%PDF"
+    response = client.post("/upload", data=body, content_type=f"multipart/form-data; boundary={boundary}")
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "요청 형식이 올바르지 않습니다."
+    assert sorted(path.name for path in server.UPLOAD_DIR.iterdir()) == ["kept.pdf"]
+    assert client.get("/uploads").get_json()["uploads"] == ["kept.pdf"]
+
+    response = client.post("/upload", data=b"--x\r\nbroken", content_type="multipart/form-data; boundary=x")
+    assert response.status_code == 400 and response.get_json()["error"] == "요청 형식이 올바르지 않습니다."
+
+
+def test_versioned_url_is_immutable_and_stale_versions_redirect(client, server):
+    url = upload(client, {"a.pdf": pdf_bytes(1, "a")})["files"][0]["url"]
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.cache_control.immutable and response.cache_control.max_age > 86400
+
+    time.sleep(0.01)
+    (server.UPLOAD_DIR / "a.pdf").write_bytes(pdf_bytes(2, "changed"))
+    stale = client.get(url)
+    assert stale.status_code == 302
+    assert version_of(stale.headers["Location"]) != version_of(url)
+    assert page_labels(client.get(stale.headers["Location"]).data) == ["changed 0", "changed 1"]
+
+
+def test_listing_unhashed_files_does_not_read_them_on_the_request(client, server, monkeypatch):
+    # Files found on disk at startup have no digest yet. The listing
+    # versions their URLs by stat and leaves hashing to the background.
+    for name in (f"JS_{CUSTOMS_A}.pdf", f"NB_{CUSTOMS_A}.pdf"):
+        write_pdf(server.UPLOAD_DIR / name, 3, f"restart {name}")
+    server.upload_catalog.reconcile()
+    hashed_on_request = []
+    file_sha256 = file_catalog.file_sha256
+
+    def spy(path):
+        if threading.current_thread() is threading.main_thread():
+            hashed_on_request.append(Path(path).name)
+        return file_sha256(path)
+
+    monkeypatch.setattr(file_catalog, "file_sha256", spy)
+    listing = client.get("/uploads").get_json()
+    groups = client.get("/groups").get_json()
+    assert hashed_on_request == []
+    url = listing["items"][0]["url"]
+    assert groups["urls"][f"JS_{CUSTOMS_A}.pdf"] == url
+    assert client.get(url).cache_control.immutable
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        items = client.get("/uploads").get_json()["items"]
+        if all(item["pdf"] for item in items):
+            break
+        time.sleep(0.05)
+    assert [item["pdf"]["pages"] for item in items] == [3, 3]
+    assert hashed_on_request == []
+
+
+def test_groups_follow_the_prefix_order(client):
+    upload(
+        client,
+        {
+            f"NB_{CUSTOMS_A}.pdf": pdf_bytes(1, "nb"),
+            f"JS_{CUSTOMS_A}.pdf": pdf_bytes(1, "js"),
+            f"JS_{CUSTOMS_B}.pdf": pdf_bytes(1, "js b"),
+        },
+    )
+    groups = client.get("/groups").get_json()
+    names = {group["name"]: group["names"] for group in groups["groups"]}
+    assert names[CUSTOMS_A] == [f"JS_{CUSTOMS_A}.pdf", f"NB_{CUSTOMS_A}.pdf"]
+    assert groups["total"] == 3 and set(groups["urls"]) == {*names[CUSTOMS_A], *names[CUSTOMS_B]}
+
+
+def test_preview_serves_the_first_pages(client):
+    url = upload(client, {"long.pdf": pdf_bytes(8, "long")})["files"][0]["url"]
+    response = client.get(f"/preview/long.pdf?v={version_of(url)}")
+    assert response.status_code == 200
+    assert page_labels(response.data) == ["long 0", "long 1"]
+    assert response.cache_control.immutable
+
+
+def test_short_file_preview_redirects_to_the_original(client):
+    upload(client, {"short.pdf": pdf_bytes(1, "short")})
+    response = client.get("/preview/short.pdf")
+    assert response.status_code == 302 and response.headers["Location"].startswith("/uploads/short.pdf")
+
+
+def test_delete_removes_uploads_from_the_listing(client):
+    upload(client, {"a.pdf": pdf_bytes(1, "a"), "b.pdf": pdf_bytes(1, "b")})
+    assert client.post("/uploads/delete", json={"names": ["a.pdf", "../settings.json"]}).get_json() == {"removed": 1}
+    assert client.get("/uploads").get_json()["uploads"] == ["b.pdf"]
+    assert client.get("/uploads/a.pdf").status_code == 404
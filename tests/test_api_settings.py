@@ -0,0 +1,27 @@
+def test_get_settings_is_conditional_on_its_etag(client):
+    response = client.get("/settings")
+    assert response.status_code == 200 and response.headers["ETag"]
+    assert "prefixOrder" in response.get_json()
+    again = client.get("/settings", headers={"If-None-Match": response.headers["ETag"]})
+    assert again.status_code == 304
+
+
+def test_patch_with_current_etag_saves_and_returns_the_new_one(client):
+    etag = client.get("/settings").headers["ETag"]
+    response = client.patch("/settings", json={"feeOrderMap": {"api": ["a", "b"]}}, headers={"If-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert client.get("/settings").get_json()["feeOrderMap"]["api"] == ["a", "b"]
+
+
+def test_write_with_stale_etag_is_refused_with_the_current_one(client):
+    stale = client.get("/settings").headers["ETag"]
+    current = client.patch("/settings", json={"customsOnlyFirst": False}).headers["ETag"]
+    response = client.post("/settings", json={"customsOnlyFirst": True}, headers={"If-Match": stale})
+    assert response.status_code == 412
+    assert response.headers["ETag"] == current
+    assert client.get("/settings").get_json()["customsOnlyFirst"] is False
+
+
+def test_invalid_patch_is_a_bad_request(client):
+    assert client.patch("/settings", json={"feeOrderMap": "x"}).status_code == 400
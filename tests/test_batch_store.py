@@ -0,0 +1,32 @@
+import os
+import time
+
+from batch_store import BATCH_RETENTION_SECONDS, BatchStore
+
+BATCH_ID = "0123456789abcdef0123456789abcdef"
+
+
+def test_saved_record_is_loaded_by_id(tmp_path):
+    store = BatchStore(tmp_path)
+    store.save({"batchId": BATCH_ID, "groups": [{"name": "A", "status": "done"}]})
+    assert BatchStore(tmp_path).load(BATCH_ID)["groups"] == [{"name": "A", "status": "done"}]
+
+
+def test_only_32_hex_digit_ids_are_valid(tmp_path):
+    store = BatchStore(tmp_path)
+    assert store.valid_id(BATCH_ID)
+    assert not store.valid_id("../" + BATCH_ID[3:])
+    assert not store.valid_id(BATCH_ID.upper())
+    assert not store.valid_id(None)
+    assert store.load("../settings") is None
+
+
+def test_records_past_retention_are_dropped_on_save(tmp_path):
+    store = BatchStore(tmp_path)
+    store.save({"batchId": BATCH_ID})
+    expired = time.time() - BATCH_RETENTION_SECONDS - 60
+    os.utime(tmp_path / f"{BATCH_ID}.json", (expired, expired))
+    store.save({"batchId": "f" * 32})
+    assert store.load(BATCH_ID) is None
+    assert store.load("f" * 32) is not None
+
@@ -0,0 +1,85 @@
+from pathlib import Path
+import os
+
+import pytest
+
+from merge_cache import MergeCache
+from tests.helpers import write_pdf
+
+
+@pytest.fixture
+def cache(tmp_path):
+    (tmp_path / "merged").mkdir()
+    return MergeCache(tmp_path / "index.json", tmp_path / "merged", max_bytes=0)
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    return [str(write_pdf(tmp_path / name)) for name in ("a.pdf", "b.pdf")]
+
+
+def test_stored_output_is_found_by_the_same_inputs(cache, inputs, tmp_path):
+    output = write_pdf(tmp_path / "merged" / "out.pdf")
+    cache.store(cache.key(inputs, "pypdf"), output)
+    assert cache.lookup(cache.key(inputs, "pypdf")) == output
+    reloaded = MergeCache(tmp_path / "index.json", tmp_path / "merged", max_bytes=0)
+    assert reloaded.lookup(reloaded.key(inputs, "pypdf")) == output
+
+
+def test_key_depends_on_input_order_content_and_engine(cache, inputs):
+    key = cache.key(inputs, "pypdf")
+    assert cache.key(list(reversed(inputs)), "pypdf") != key
+    assert cache.key(inputs, "copy") != key
+    write_pdf(Path(inputs[0]), label="changed")
+    assert cache.key(inputs, "pypdf") != key
+
+
+def test_replaced_or_removed_output_is_a_miss(cache, inputs, tmp_path):
+    output = write_pdf(tmp_path / "merged" / "out.pdf")
+    key = cache.key(inputs, "pypdf")
+    cache.store(key, output)
+    write_pdf(output, pages=2)
+    assert cache.lookup(key) is None
+    cache.store(key, output)
+    output.unlink()
+    assert cache.lookup(key) is None
+
+
+def test_least_recently_used_outputs_are_evicted_past_max_bytes(tmp_path, inputs):
+    merged = tmp_path / "merged"
+    merged.mkdir()
+    evicted = []
+    cache = MergeCache(tmp_path / "index.json", merged, max_bytes=1, on_evict=evicted.append)
+    old = write_pdf(merged / "old.pdf")
+    os.utime(old, (1, 1))
+    new = write_pdf(merged / "new.pdf")
+    cache.store(cache.key(inputs, "pypdf"), new)
+    assert evicted == [old]
+    assert new.exists() and not old.exists()
+
+
+def test_hard_linked_outputs_count_once_towards_max_bytes(tmp_path, inputs):
+    merged = tmp_path / "merged"
+    merged.mkdir()
+    first = write_pdf(merged / "first.pdf")
+    os.link(first, merged / "linked.pdf")
+    cache = MergeCache(tmp_path / "index.json", merged, max_bytes=first.stat().st_size + 10)
+    cache.store(cache.key(inputs, "pypdf"), first)
+    assert (merged / "linked.pdf").exists() and cache.stats()["evicted"] == 0
+
+
+def test_sizes_are_tracked_without_rescanning_the_directory(tmp_path, inputs, monkeypatch):
+    merged = tmp_path / "merged"
+    merged.mkdir()
+    scans = []
+    iterdir = Path.iterdir
+    monkeypatch.setattr(Path, "iterdir", lambda self: scans.append(self) or iterdir(self))
+    size = write_pdf(merged / "probe.pdf").stat().st_size
+    cache = MergeCache(tmp_path / "index.json", merged, max_bytes=size * 3 + 10, in_use=lambda: {"kept.pdf"})
+    kept = write_pdf(merged / "kept.pdf")
+    os.utime(kept, (1, 1))
+    for number in range(6):
+        output = write_pdf(merged / f"{number}.pdf")
+        cache.store(cache.key(inputs, f"engine{number}"), output)
+    assert scans == [merged]
+    assert kept.exists() and sorted(path.name for path in merged.iterdir()) == ["4.pdf", "5.pdf", "kept.pdf"]
@@ -0,0 +1,133 @@
+import pytest
+
+from merge_cache import MergeCache
+from merge_jobs import JobManager, MergeJobError, MergeTask
+from pdf_merge import merge_to_file
+from tests.helpers import page_labels, write_pdf
+
+
+@pytest.fixture
+def files(tmp_path):
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    return {
+        "a": str(write_pdf(tmp_path / "a.pdf")),
+        "b": str(write_pdf(tmp_path / "b.pdf")),
+        "broken": str(broken),
+    }
+
+
+@pytest.fixture
+def out(tmp_path):
+    directory = tmp_path / "merged"
+    directory.mkdir()
+    return directory
+
+
+def test_job_merges_every_task(files, out):
+    outputs = []
+    manager = JobManager(runners=1, on_output=lambda task: outputs.append(task.target))
+    tasks = [
+        MergeTask("one", [files["a"], files["b"]], out / "one.pdf"),
+        MergeTask("two", [files["b"], files["a"]], out / "two.pdf"),
+    ]
+    job = manager.submit("batch", tasks, "batch.zip")
+    assert job.wait(30)
+    assert job.status == "done"
+    assert list(job.iter_outputs()) == [out / "one.pdf", out / "two.pdf"]
+    assert page_labels(out / "two.pdf") == ["b 0", "a 0"]
+    assert sorted(outputs) == sorted(job.outputs())
+    assert manager.get(job.id) is job
+
+
+def test_failed_group_is_isolated(files, out):
+    manager = JobManager(runners=1)
+    tasks = [
+        MergeTask("good", [files["a"], files["b"]], out / "good.pdf"),
+        MergeTask("bad", [files["a"], files["broken"]], out / "bad.pdf"),
+        MergeTask("known", [files["a"]], out / "known.pdf", error="known bad"),
+    ]
+    job = manager.submit("batch", tasks, "batch.zip", isolate_failures=True)
+    assert job.wait(30)
+    status = job.to_dict()
+    assert status["status"] == "done"
+    assert [group["status"] for group in status["groups"]] == ["done", "failed", "failed"]
+    assert status["groups"][1]["error"] and status["groups"][2]["error"] == "known bad"
+    assert list(job.iter_outputs()) == [out / "good.pdf"]
+    assert [task.name for task in job.failures()] == ["bad", "known"]
+
+
+def test_failure_without_isolation_fails_the_job(files, out):
+    manager = JobManager(runners=1)
+    job = manager.submit("merge", [MergeTask("bad", [files["broken"], files["a"]], out / "bad.pdf")], "bad.pdf")
+    assert job.wait(30)
+    assert job.status == "failed" and job.error
+    with pytest.raises(MergeJobError):
+        list(job.iter_outputs())
+
+
+def test_receiving_job_runs_tasks_added_while_it_is_open(files, out):
+    cleaned = []
+    manager = JobManager(runners=1)
+    job = manager.submit("batch", [], "batch.zip", receiving=True, on_cleanup=lambda: cleaned.append(True))
+    job.add_task(MergeTask("one", [files["a"]], out / "one.pdf"))
+    outputs = job.iter_outputs()
+    assert next(outputs) == out / "one.pdf"
+    assert not job.finished
+    job.add_task(MergeTask("two", [files["b"]], out / "two.pdf"))
+    job.close()
+    assert list(outputs) == [out / "two.pdf"]
+    assert job.wait(30) and job.status == "done" and cleaned == [True]
+    with pytest.raises(MergeJobError):
+        job.add_task(MergeTask("late", [files["a"]], out / "late.pdf"))
+
+
+def test_closing_with_an_error_fails_a_receiving_job(files, out):
+    manager = JobManager(runners=1)
+    job = manager.submit("batch", [], "batch.zip", receiving=True)
+    job.close("request aborted")
+    assert job.wait(30) and job.status == "failed" and job.error == "request aborted"
+
+
+def test_same_inputs_are_served_from_the_merge_cache(files, out, tmp_path):
+    cache = MergeCache(tmp_path / "index.json", out, max_bytes=0)
+    manager = JobManager(runners=1, cache=cache)
+    first = manager.submit("merge", [MergeTask("one", [files["a"], files["b"]], out / "one.pdf")], "one.pdf")
+    assert first.wait(30) and first.status == "done"
+    second = manager.submit("merge", [MergeTask("one", [files["a"], files["b"]], out / "again.pdf")], "again.pdf")
+    assert second.wait(30) and second.status == "done"
+    assert second.tasks[0].cached
+    assert cache.stats()["hits"] == 1
+    assert second.outputs() == [out / "again.pdf"]
+    assert (out / "again.pdf").read_bytes() == (out / "one.pdf").read_bytes()
+
+
+def test_eviction_spares_the_outputs_of_jobs_not_downloaded(files, out, tmp_path):
+    merge_to_file([files["a"], files["b"]], str(tmp_path / "sample.pdf"))
+    size = (tmp_path / "sample.pdf").stat().st_size
+    cache = MergeCache(tmp_path / "index.json", out, max_bytes=int(size * 1.2), in_use=lambda: manager.outputs_in_use())
+    manager = JobManager(runners=1, cache=cache)
+    first = manager.submit("batch", [MergeTask("g1", [files["a"], files["b"]], out / "g1_run1.pdf")], "run1.zip")
+    assert first.wait(30) and first.status == "done"
+    first.downloaded = True
+    tasks = [
+        MergeTask("g1", [files["a"], files["b"]], out / "g1_run2.pdf"),
+        MergeTask("g2", [files["b"], files["a"]], out / "g2_run2.pdf"),
+    ]
+    second = manager.submit("batch", tasks, "run2.zip")
+    assert second.wait(30) and second.status == "done"
+    assert second.tasks[0].cached
+    # The hit is a fresh name of the oldest file; it must outlive run1's.
+    assert (out / "g1_run2.pdf").exists() and (out / "g2_run2.pdf").exists()
+    assert not (out / "g1_run1.pdf").exists()
+
+
+def test_receiving_jobs_do_not_hold_up_other_jobs(files, out):
+    manager = JobManager(runners=1)
+    uploading = [manager.submit("batch", [], "batch.zip", receiving=True) for _ in range(2)]
+    job = manager.submit("merge", [MergeTask("one", [files["a"], files["b"]], out / "one.pdf")], "one.pdf")
+    assert job.wait(10) and job.status == "done"
+    for receiving in uploading:
+        receiving.add_task(MergeTask("late", [files["a"]], out / f"{receiving.id}.pdf"))
+        receiving.close()
+        assert receiving.wait(30) and receiving.status == "done"
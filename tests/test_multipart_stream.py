@@ -0,0 +1,105 @@
+import io
+import threading
+
+import pytest
+
+import multipart_stream
+from multipart_stream import FilePart, FormField, InflightBudget, MultipartReader, RequestSpool
+
+BOUNDARY = "testboundary"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+
+
+def body(*parts) -> bytes:
+    out = b""
+    for name, filename, data in parts:
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        out += f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + data + b"\r\n"
+    return out + f"--{BOUNDARY}--\r\n".encode()
+
+
+class CountingStream(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+def test_parts_are_yielded_in_body_order_while_the_body_is_read(monkeypatch):
+    monkeypatch.setattr(multipart_stream, "READ_SIZE", 16)
+    first = b"%PDF-first" * 20
+    stream = CountingStream(
+        body(("manifest", None, b'{"a": 1}'), ("files", "a.pdf", first), ("files", "b.pdf", b"%PDF-second"))
+    )
+    parts = iter(MultipartReader(stream, CONTENT_TYPE))
+
+    field = next(parts)
+    assert field == FormField("manifest", '{"a": 1}')
+    part = next(parts)
+    assert isinstance(part, FilePart) and part.filename == "a.pdf"
+    reads_before = stream.reads
+    assert part.read() == first
+    assert stream.reads > reads_before
+    assert len(stream.getvalue()) - stream.tell() > 0
+    second = next(parts)
+    assert second.read(5) == b"%PDF-" and second.read() == b"second"
+    assert list(parts) == []
+
+
+def test_unread_file_content_is_skipped():
+    stream = io.BytesIO(body(("files", "a.pdf", b"x" * 1000), ("engine", None, b"copy")))
+    parts = list(MultipartReader(stream, CONTENT_TYPE))
+    assert parts[1] == FormField("engine", "copy")
+
+
+def test_truncated_body_raises_value_error():
+    data = body(("files", "a.pdf", b"x" * 1000))[:500]
+    with pytest.raises(ValueError):
+        for part in MultipartReader(io.BytesIO(data), CONTENT_TYPE):
+            part.read()
+
+
+def test_non_multipart_content_type_is_rejected():
+    with pytest.raises(ValueError):
+        MultipartReader(io.BytesIO(b"{}"), "application/json")
+
+
+def test_spool_writes_parts_to_its_own_directory_and_discard_releases():
+    released = []
+    spool = RequestSpool(lambda: released.append(True))
+    part = next(iter(MultipartReader(io.BytesIO(body(("files", "a.pdf", b"%PDF-data"))), CONTENT_TYPE)))
+    path = spool.add(part)
+    assert path.read_bytes() == b"%PDF-data"
+    spool.discard()
+    assert not path.exists() and released == [True]
+
+
+def test_budget_admits_a_request_once_earlier_ones_release():
+    budget = InflightBudget(max_bytes=100, wait_seconds=5)
+    release = budget.reserve(80)
+    admitted = threading.Event()
+
+    def second():
+        budget.reserve(50)
+        admitted.set()
+
+    thread = threading.Thread(target=second)
+    thread.start()
+    assert not admitted.wait(0.1)
+    release()
+    assert admitted.wait(5)
+    thread.join()
+
+
+def test_budget_gives_up_after_waiting_and_admits_oversized_requests_alone():
+    budget = InflightBudget(max_bytes=100, wait_seconds=0.05)
+    release = budget.reserve(500)
+    assert release is not None
+    assert budget.reserve(10) is None
+    release()
+    assert budget.stats()["usedBytes"] == 0
@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import time
+
+from pypdf import PdfWriter
+
+from pdf_info import PdfInfoIndex, inspect_pdf
+import pdf_info
+from tests.helpers import write_pdf
+
+
+def wait_for(index: PdfInfoIndex, digest: str, timeout: float = 10) -> dict | None:
+    deadline = time.monotonic() + timeout
+    while index.get(digest) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return index.get(digest)
+
+
+def test_inspect_reports_pages_and_version(tmp_path):
+    info = inspect_pdf(write_pdf(tmp_path / "a.pdf", pages=3))
+    assert info["pages"] == 3 and info["version"] and info["error"] is None
+
+
+def test_inspect_flags_unreadable_and_encrypted_files(tmp_path):
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"%PDF-1.4\nnot really")
+    assert inspect_pdf(broken)["error"] == "unreadable"
+
+    writer = PdfWriter()
+    writer.add_blank_page(width=100, height=100)
+    writer.encrypt("secret")
+    locked = tmp_path / "locked.pdf"
+    with locked.open("wb") as f:
+        writer.write(f)
+    info = inspect_pdf(locked)
+    assert info["error"] == "encrypted" and info["encrypted"]
+
+
+def test_index_inspects_in_the_background_and_persists_by_digest(tmp_path):
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        index = PdfInfoIndex(tmp_path / "pdf_info.json", lambda path: executor.submit(inspect_pdf, path))
+        index.enqueue(write_pdf(tmp_path / "a.pdf", pages=2), "a" * 64)
+        assert wait_for(index, "a" * 64)["pages"] == 2
+    deadline = time.monotonic() + 5
+    while not (tmp_path / "pdf_info.json").exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    reloaded = PdfInfoIndex(tmp_path / "pdf_info.json", None)
+    assert reloaded.get("a" * 64)["pages"] == 2
+    reloaded.discard("a" * 64)
+    reloaded.flush()
+    assert "a" * 64 not in json.loads((tmp_path / "pdf_info.json").read_text(encoding="utf-8"))
+
+
+def test_index_hashes_files_queued_without_a_digest(tmp_path):
+    hashed = []
+
+    def digest_of(path):
+        hashed.append(path.name)
+        return "b" * 64
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        index = PdfInfoIndex(
+            tmp_path / "pdf_info.json", lambda path: executor.submit(inspect_pdf, path), digest_of=digest_of
+        )
+        index.enqueue(write_pdf(tmp_path / "b.pdf", pages=4))
+        assert wait_for(index, "b" * 64)["pages"] == 4
+    assert hashed == ["b.pdf"]
+
+
+def test_index_batches_saves_during_a_burst(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_info, "SAVE_INTERVAL_SECONDS", 0.3)
+    saves = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        index = PdfInfoIndex(tmp_path / "pdf_info.json", lambda path: executor.submit(lambda: {"pages": 1}))
+        save = index._save
+        monkeypatch.setattr(index, "_save", lambda entries: saves.append(len(entries)) or save(entries))
+        for number in range(50):
+            index.enqueue(tmp_path / f"{number}.pdf", f"{number:064x}")
+        for number in range(50):
+            assert wait_for(index, f"{number:064x}") == {"pages": 1}
+    deadline = time.monotonic() + 5
+    while (not saves or saves[-1] < 50) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert saves[-1] == 50 and len(saves) <= 5
+    assert len(json.loads((tmp_path / "pdf_info.json").read_text(encoding="utf-8"))) == 50
@@ -0,0 +1,85 @@
+import io
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import ArrayObject, DictionaryObject, NameObject, NumberObject, TextStringObject
+import pytest
+
+from pdf_copy import copy_merge_to_file
+from pdf_merge import merge_to_file
+from tests.helpers import page_labels, pdf_bytes, write_pdf
+
+
+@pytest.mark.parametrize("engine", ["pypdf", "copy"])
+def test_merge_keeps_every_page_in_input_order(tmp_path, engine):
+    sources = [str(write_pdf(tmp_path / "a.pdf", pages=2)), str(write_pdf(tmp_path / "b.pdf", pages=1))]
+    target = tmp_path / "out.pdf"
+    merge_to_file(sources, str(target), engine)
+    assert page_labels(target) == ["a 0", "a 1", "b 0"]
+
+
+def test_copy_engine_writes_identical_inputs_once(tmp_path):
+    source = write_pdf(tmp_path / "a.pdf", pages=3)
+    target = tmp_path / "out.pdf"
+    copy_merge_to_file([str(source), str(source)], str(target))
+    assert page_labels(target) == ["a 0", "a 1", "a 2"] * 2
+    assert target.stat().st_size < source.stat().st_size * 1.5
+
+
+def test_copy_engine_accepts_raw_bytes(tmp_path):
+    target = tmp_path / "out.pdf"
+    copy_merge_to_file([pdf_bytes(1, "x"), pdf_bytes(1, "y")], str(target))
+    assert page_labels(target) == ["x 0", "y 0"]
+
+
+def radio_group_pdf(widgets: int) -> bytes:
+    # A radio field whose /Kids widgets point back at it through /Parent,
+    # the reference cycle every multi-widget form field has.
+    writer = PdfWriter()
+    writer.append(PdfReader(io.BytesIO(pdf_bytes(1, "form"))))
+    page = writer.pages[0]
+    field = DictionaryObject(
+        {
+            NameObject("/FT"): NameObject("/Btn"),
+            NameObject("/T"): TextStringObject("choice"),
+            NameObject("/Ff"): NumberObject(49152),
+        }
+    )
+    field_ref = writer._add_object(field)
+    kids = ArrayObject()
+    for index in range(widgets):
+        widget = DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Annot"),
+                NameObject("/Subtype"): NameObject("/Widget"),
+                NameObject("/Rect"): ArrayObject(
+                    [NumberObject(value) for value in (10 + 30 * index, 10, 30 + 30 * index, 30)]
+                ),
+                NameObject("/Parent"): field_ref,
+                NameObject("/P"): page.indirect_reference,
+            }
+        )
+        kids.append(writer._add_object(widget))
+    field[NameObject("/Kids")] = kids
+    page[NameObject("/Annots")] = ArrayObject(kids)
+    writer._root_object[NameObject("/AcroForm")] = DictionaryObject(
+        {NameObject("/Fields"): ArrayObject([field_ref])}
+    )
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def test_copy_engine_copies_multi_widget_form_fields(tmp_path):
+    target = tmp_path / "out.pdf"
+    copy_merge_to_file([radio_group_pdf(3), pdf_bytes(1, "plain")], str(target))
+    assert page_labels(target) == ["form 0", "plain 0"]
+    annots = [annot.get_object() for annot in PdfReader(str(target)).pages[0]["/Annots"]]
+    assert len(annots) == 3
+    assert len({id(annot["/Parent"].get_object()) for annot in annots}) == 1
+
+
+def test_unreadable_input_fails_the_merge(tmp_path):
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    with pytest.raises(Exception):
+        merge_to_file([str(write_pdf(tmp_path / "a.pdf")), str(broken)], str(tmp_path / "out.pdf"), "copy")
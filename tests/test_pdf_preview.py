@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pdf_preview import PreviewCache, build_preview
+from tests.helpers import page_labels, write_pdf
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+def test_preview_holds_the_first_pages(tmp_path):
+    source = write_pdf(tmp_path / "a.pdf", pages=10)
+    target = tmp_path / "preview.pdf"
+    assert build_preview(str(source), str(target), 2) == 10
+    assert page_labels(target) == ["a 0", "a 1"]
+
+
+def test_short_file_is_its_own_preview(tmp_path):
+    source = write_pdf(tmp_path / "a.pdf", pages=2)
+    target = tmp_path / "preview.pdf"
+    assert build_preview(str(source), str(target), 2) == 2
+    assert not target.exists()
+
+
+def test_cache_builds_once_per_content(tmp_path, executor):
+    cache = PreviewCache(tmp_path / "preview", executor.submit, pages=2)
+    source = write_pdf(tmp_path / "a.pdf", pages=6)
+    preview = cache.get(source, "d" * 64)
+    assert preview != source and page_labels(preview) == ["a 0", "a 1"]
+    copy = tmp_path / "copy.pdf"
+    copy.write_bytes(source.read_bytes())
+    assert cache.get(copy, "d" * 64) == preview
+    assert cache.stats()["builds"] == 1
+
+
+def test_cache_returns_the_source_when_no_preview_is_needed(tmp_path, executor):
+    cache = PreviewCache(tmp_path / "preview", executor.submit, pages=2)
+    source = write_pdf(tmp_path / "a.pdf", pages=1)
+    assert cache.get(source, "e" * 64) == source
+    assert cache.get(source, "e" * 64) == source
+    assert cache.stats()["builds"] == 1
+
+
+def test_failed_build_returns_none(tmp_path, executor):
+    cache = PreviewCache(tmp_path / "preview", executor.submit, pages=2)
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    assert cache.get(broken, "f" * 64) is None
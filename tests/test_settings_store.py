@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from settings_store import SettingsConflict, SettingsError, SettingsStore
+
+DEFAULTS = {"prefixOrder": [], "customsOnlyFirst": True, "feeOrderMap": {}}
+
+
+@pytest.fixture
+def settings_path(tmp_path):
+    return tmp_path / "settings.json"
+
+
+def test_patch_appends_a_delta_that_a_new_store_replays(settings_path):
+    store = SettingsStore(settings_path, DEFAULTS)
+    store.patch({"feeOrderMap": {"A": [1, 2]}, "customsOnlyFirst": False})
+
+    journal = settings_path.with_suffix(".journal").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["feeOrderMap"] for line in journal] == [{"A": [1, 2]}]
+    reloaded = SettingsStore(settings_path, DEFAULTS).as_dict()
+    assert reloaded["feeOrderMap"] == {"A": [1, 2]}
+    assert reloaded["customsOnlyFirst"] is False
+
+
+def test_null_map_entry_removes_only_that_entry(settings_path):
+    store = SettingsStore(settings_path, DEFAULTS)
+    store.patch({"feeOrderMap": {"A": [1], "B": [2]}})
+    store.patch({"feeOrderMap": {"A": None}})
+    assert store.get("feeOrderMap") == {"B": [2]}
+
+
+def test_invalid_delta_is_rejected_without_writing(settings_path):
+    store = SettingsStore(settings_path, DEFAULTS)
+    with pytest.raises(SettingsError):
+        store.patch({"feeOrderMap": ["not", "a", "map"]})
+    assert not settings_path.with_suffix(".journal").exists()
+
+
+def test_journal_is_compacted_into_the_snapshot_past_its_limit(settings_path):
+    store = SettingsStore(settings_path, DEFAULTS, compact_bytes=200)
+    for index in range(20):
+        store.patch({"feeOrderMap": {f"key{index}": [index]}})
+    journal = settings_path.with_suffix(".journal")
+    assert not journal.exists() or journal.stat().st_size <= 200
+    assert len(json.loads(settings_path.read_text(encoding="utf-8"))["feeOrderMap"]) >= 10
+    assert len(SettingsStore(settings_path, DEFAULTS).get("feeOrderMap")) == 20
+
+
+def test_etag_changes_with_every_write(settings_path):
+    store = SettingsStore(settings_path, DEFAULTS)
+    seen = {store.etag}
+    seen.add(store.patch({"customsOnlyFirst": False}))
+    _, etag = store.replace({"prefixOrder": [{"prefix": "JS"}]})
+    seen.add(etag)
+    assert len(seen) == 3
+
+
+def test_write_with_a_stale_etag_is_refused(settings_path):
+    store = SettingsStore(settings_path, DEFAULTS)
+    stale = store.etag
+    store.patch({"customsOnlyFirst": False})
+    with pytest.raises(SettingsConflict):
+        store.patch({"feeOrderMap": {"A": [1]}}, lambda etag: etag == stale)
+    assert store.get("feeOrderMap") == {}
+
+
+def test_hand_edit_of_the_snapshot_is_picked_up(settings_path):
+    store = SettingsStore(settings_path, DEFAULTS)
+    store.replace({"customsOnlyFirst": True})
+    etag = store.etag
+    settings_path.write_text(json.dumps({"customsOnlyFirst": False, "prefixOrder": [1, 2]}), encoding="utf-8")
+    assert store.get("customsOnlyFirst") is False
+    assert store.etag != etag
+
+
+class CoarseClockStore(SettingsStore):
+    # Every write lands in the same filesystem timestamp tick.
+    def _disk_state(self):
+        (_, size), journal_size = super()._disk_state()
+        return (0, size), journal_size
+
+
+def test_same_size_writes_within_one_timestamp_tick_get_new_etags(settings_path):
+    store = CoarseClockStore(settings_path, DEFAULTS)
+    _, stale = store.replace({"prefixOrder": [{"prefix": "AA"}]})
+    _, current = store.replace({"prefixOrder": [{"prefix": "BB"}]})
+    assert current != stale
+    with pytest.raises(SettingsConflict):
+        store.replace({"prefixOrder": [{"prefix": "CC"}]}, lambda etag: etag == stale)
+    assert store.get("prefixOrder") == [{"prefix": "BB"}]
+
+
+def test_revision_survives_a_restart(settings_path):
+    store = CoarseClockStore(settings_path, DEFAULTS, compact_bytes=0)
+    seen = {store.patch({"feeOrderMap": {"A": [index]}}) for index in range(3)}
+    reopened = CoarseClockStore(settings_path, DEFAULTS)
+    assert reopened.get("feeOrderMap") == {"A": [2]}
+    _, etag = reopened.replace({"feeOrderMap": {"A": [0]}})
+    assert etag not in seen
+    assert "_revision" not in json.loads(reopened.read()[0])